@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Dekodierung der Abfahrten
+
+Vergleicht den bisherigen Parser (response.json() + Dictionary pro Abfahrt,
+zweimal fromisoformat) mit parse_departures() direkt aus den Antwort-Bytes.
+Gemessen werden Laufzeit, Speicherbedarf des Ergebnisses und die Anzahl
+der ausgelösten GC-Läufe. Es werden keine Anfragen an die API gesendet.
+
+Aufruf: python bench_parse.py [--departures 60] [--rounds 500]
+"""
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List
+
+from bvg_api import minutes_until, parse_departures
+
+LINES = [
+    ('U5', 'subway', 'S+U Hauptbahnhof'), ('U5', 'subway', 'U Hönow'),
+    ('M5', 'tram', 'S Hackescher Markt'), ('M5', 'tram', 'Zingster Str.'),
+    ('142', 'bus', 'S+U Pankow'), ('S7', 'suburban', 'S Ahrensfelde'),
+]
+
+
+def build_response(count: int) -> bytes:
+    """Erzeugt eine Antwort im Format von /stops/{id}/departures"""
+    now = datetime.now().replace(microsecond=0)
+    departures = []
+    for i in range(count):
+        name, product, direction = LINES[i % len(LINES)]
+        planned = now + timedelta(minutes=1 + i // 2)
+        delay = 60 * (i % 4) if i % 3 == 0 else 0
+        departures.append({
+            'tripId': f'1|{10000 + i}|0|86|{now:%d%m%Y}',
+            'stop': {'type': 'stop', 'id': '900100003', 'name': 'S+U Alexanderplatz'},
+            'when': (planned + timedelta(seconds=delay)).isoformat() + '+02:00',
+            'plannedWhen': planned.isoformat() + '+02:00',
+            'delay': delay or None,
+            'platform': None,
+            'plannedPlatform': None,
+            'direction': direction,
+            'line': {
+                'type': 'line', 'id': name.lower(), 'fahrtNr': str(20000 + i),
+                'name': name, 'public': True, 'mode': 'train', 'product': product,
+                'operator': {'type': 'operator', 'id': 'berliner-verkehrsbetriebe', 'name': 'BVG'},
+            },
+            'remarks': [{'type': 'hint', 'code': 'bf', 'text': 'barrierefrei'}],
+        })
+    return json.dumps({'departures': departures}).encode('utf-8')
+
+
+def legacy_parse(body: bytes) -> List[Dict]:
+    """Bisheriger Pfad (Stand vor Departure-Tupeln), zum Vergleich"""
+    # requests: response.json() dekodiert zuerst den Text
+    departures = json.loads(body.decode('utf-8')).get('departures', [])
+    parsed = []
+    now = datetime.now()
+    
+    for dep in departures:
+        try:
+            when_str = dep.get('when')
+            planned_when_str = dep.get('plannedWhen')
+            
+            if not when_str:
+                continue
+            
+            when = datetime.fromisoformat(when_str.replace('Z', '+00:00'))
+            planned_when = datetime.fromisoformat(planned_when_str.replace('Z', '+00:00')) if planned_when_str else when
+            
+            when = when.replace(tzinfo=None)
+            planned_when = planned_when.replace(tzinfo=None)
+            
+            delay = int((when - planned_when).total_seconds() / 60)
+            minutes = minutes_until(when, now)
+            
+            if minutes < 0:
+                continue
+            
+            line = dep.get('line', {})
+            
+            parsed.append({
+                'line': line.get('name', '?'),
+                'direction': dep.get('direction', 'Unbekannt'),
+                'minutes': minutes,
+                'delay': delay,
+                'when': when,
+                'product': line.get('product', 'unknown')
+            })
+        
+        except Exception:
+            continue
+    
+    parsed.sort(key=lambda x: x['when'])
+    return parsed
+
+
+def typed_parse(body: bytes) -> List:
+    """Neuer Pfad wie in BVGClient.get_station_board"""
+    return parse_departures(json.loads(body).get('departures', []))
+
+
+def measure(name: str, parse: Callable[[bytes], List], body: bytes, rounds: int) -> Dict:
+    """Misst Laufzeit, GC-Läufe und Speicher des Ergebnisses"""
+    parse(body)  # Aufwärmen
+    
+    gc.collect()
+    collections_before = sum(stat['collections'] for stat in gc.get_stats())
+    start = time.perf_counter()
+    for _ in range(rounds):
+        parse(body)
+    elapsed = time.perf_counter() - start
+    collections = sum(stat['collections'] for stat in gc.get_stats()) - collections_before
+    
+    # Speicher, den das Ergebnis dauerhaft belegt (so lange es angezeigt wird)
+    tracemalloc.start()
+    result = parse(body)
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    
+    return {
+        'name': name,
+        'ms_per_call': elapsed / rounds * 1000,
+        'gc_runs': collections,
+        'retained_bytes': retained,
+        'departures': len(result),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Abfahrts-Dekodierung')
+    parser.add_argument('--departures', type=int, default=60, help='Abfahrten pro Antwort')
+    parser.add_argument('--rounds', type=int, default=500, help='Wiederholungen')
+    args = parser.parse_args()
+    
+    body = build_response(args.departures)
+    print(f"Antwort: {len(body)} Bytes, {args.departures} Abfahrten, {args.rounds} Runden")
+    print(f"Python {sys.version.split()[0]}")
+    print()
+    
+    results = [
+        measure('bisher (dict)', legacy_parse, body, args.rounds),
+        measure('Departure', typed_parse, body, args.rounds),
+    ]
+    
+    print(f"{'Parser':<16}{'ms/Aufruf':>12}{'GC-Läufe':>10}{'Speicher':>12}{'Abfahrten':>11}")
+    for r in results:
+        print(
+            f"{r['name']:<16}{r['ms_per_call']:>12.3f}{r['gc_runs']:>10}"
+            f"{r['retained_bytes']:>11}B{r['departures']:>11}"
+        )
+    
+    speedup = results[0]['ms_per_call'] / results[1]['ms_per_call']
+    print()
+    print(f"Faktor: {speedup:.2f}x schneller")
+
+
+if __name__ == '__main__':
+    main()
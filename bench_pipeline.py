@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ein kompletter Aktualisierungszyklus
+
+Misst die Stufen eines Zyklus einzeln, mit dem echten Code und gegen
+einen lokalen Stub-Server (stub_server.py, im selben Prozess):
+
+- fetch:  HTTP-Anfrage (BVGClient ohne Cache, gemeldet über on_request)
+- decode: JSON-Dekodierung und Linienfilter (DepartureFilter) - der Rest
+          von BVGClient.fetch_board
+- parse:  parse_departures() und Störungen aus den Remarks (on_parse)
+- board:  fetch_board insgesamt (fetch + decode + parse); Speicher wird
+          nur hier gemessen, die Teilstufen kennen nur ihre Dauer
+- render: erster Frame mit den neuen Daten (DisplayManager ohne Display)
+
+Abgefragt wird über BVGClient.fetch_board, also mit denselben Schritten
+und Query-Parametern wie get_station_board im Betrieb.
+
+Die Stationen werden nacheinander abgefragt, damit sich die Stufen nicht
+überlagern. Variiert werden Anzahl der Stationen, Ergebnisse pro Station
+und Länge der Richtungsangaben. Pro Stufe gibt es Latenz-Perzentile,
+Speicher-Spitze und Netto-Änderung (tracemalloc, in eigenen Durchläufen) und den
+höchsten RSS des Prozesses. Das Ergebnis wird als JSON gespeichert und
+kann mit einem früheren Lauf verglichen werden.
+
+Aufruf:
+    python bench_pipeline.py [--stations 1,2,4] [--results 20,60] [--direction-length 0,80]
+                             [--cycles 30] [--output result.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import logging
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import product
+from typing import Dict, List, Optional
+
+from bvg_api import BVGClient, DepartureFilter
+from headless import HeadlessRenderer
+from rate_limit import RequestGovernor
+from stub_server import STOPS, BoardSynthesizer, StubServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Konstanten
+STAGES = ['fetch', 'decode', 'parse', 'board', 'render', 'cycle']
+DEFAULT_DISPLAY_LINES = ['U5', 'S7', 'M10', '142', 'RE1']
+DEFAULT_RESULTS_DIR = 'bench_results'
+DURATION = 60  # Minuten Zeitfenster wie im Betrieb
+
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(',') if part]
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Höchster RSS des Prozesses bisher (None, wenn nicht verfügbar)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def percentiles(timings: List[float]) -> Dict[str, float]:
+    """p50, p90, p99, Mittelwert und Maximum in Millisekunden"""
+    ordered = sorted(timings)
+    
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+    
+    return {
+        'p50_ms': statistics.median(ordered),
+        'p90_ms': pick(0.90),
+        'p99_ms': pick(0.99),
+        'mean_ms': statistics.mean(ordered),
+        'max_ms': ordered[-1],
+    }
+
+
+class Pipeline:
+    """Ein Aktualisierungszyklus, Stufe für Stufe gemessen"""
+    
+    def __init__(self, base_url: str, station_ids: List[str], results: int, display_lines: List[str]):
+        governor = RequestGovernor(requests_per_minute=10 ** 9, burst=10 ** 6, state_file=None)
+        self.client = BVGClient(
+            governor, cache=None, base_url=base_url,
+            on_request=self._on_request, on_parse=self._on_parse
+        )
+        self.station_ids = station_ids
+        # Fordert mindestens 'results' an, der Stub liefert dann genau so viele
+        self.departure_filter = DepartureFilter(lines=display_lines, rows=results, duration=DURATION)
+        self._request_seconds = 0.0
+        self._parse_seconds = 0.0
+        self.renderer = HeadlessRenderer(start=datetime.now())
+    
+    def run_cycle(self, measure) -> None:
+        """
+        Führt einen Zyklus aus
+        
+        Args:
+            measure: Kontext-Fabrik measure(stage) für jede Stufe;
+                measure.add(stage, Sekunden) für über Callbacks gemeldete Teilstufen
+        """
+        stations = []
+        with measure('cycle'):
+            for i, station_id in enumerate(self.station_ids):
+                self._request_seconds = self._parse_seconds = 0.0
+                start = time.perf_counter()
+                with measure('board'):
+                    board = self.client.fetch_board(station_id, departure_filter=self.departure_filter)
+                total = time.perf_counter() - start
+                measure.add('fetch', self._request_seconds)
+                measure.add('parse', self._parse_seconds)
+                measure.add('decode', total - self._request_seconds - self._parse_seconds)
+                stations.append({
+                    'id': station_id,
+                    'name': STOPS.get(station_id, f'Haltestelle {station_id}'),
+                    'walkingTime': 3 + i,
+                    'departures': board['departures'],
+                    'disruptions': board['disruptions'],
+                    'stale': False,
+                })
+            with measure('render'):
+                self.renderer.clock.now = time.time()
+                self.renderer.render(stations)
+    
+    def close(self):
+        self.renderer.close()
+    
+    def _on_request(self, url: str, status: str, seconds: Optional[float]):
+        self._request_seconds += seconds or 0.0
+    
+    def _on_parse(self, seconds: float):
+        self._parse_seconds += seconds
+
+
+class TimingRecorder:
+    """Summiert die Zeit pro Stufe innerhalb eines Zyklus"""
+    
+    def __init__(self):
+        self.totals: Dict[str, float] = {}
+    
+    @contextmanager
+    def __call__(self, stage: str):
+        start = time.perf_counter()
+        yield
+        self.add(stage, time.perf_counter() - start)
+    
+    def add(self, stage: str, seconds: float):
+        self.totals[stage] = self.totals.get(stage, 0.0) + seconds * 1000
+
+
+class AllocationRecorder:
+    """
+    Speicher-Spitze und Netto-Änderung pro Stufe (tracemalloc)
+    
+    Die Spitze von 'cycle' ist die größte Spitze einer Stufe, da die Stufen
+    die Spitze beim Start zurücksetzen.
+    """
+    
+    def __init__(self):
+        self.peak: Dict[str, int] = {}
+        self.net: Dict[str, int] = {}
+    
+    @contextmanager
+    def __call__(self, stage: str):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        yield
+        current, peak = tracemalloc.get_traced_memory()
+        if stage == 'cycle':
+            peak = before + max(self.peak.values(), default=0)
+        self.peak[stage] = max(self.peak.get(stage, 0), peak - before)
+        self.net[stage] = self.net.get(stage, 0) + current - before
+    
+    def add(self, stage: str, seconds: float):
+        """Teilstufen ohne eigenen Abschnitt: kein Speicher messbar"""
+
+
+def run_config(server: StubServer, synthesizer: BoardSynthesizer, num_stations: int, results: int,
+               direction_length: int, cycles: int, alloc_cycles: int, display_lines: List[str]) -> Dict:
+    """Misst eine Kombination aus Stationen, Ergebnissen und Richtungslänge"""
+    synthesizer.board_size = results
+    synthesizer.direction_length = direction_length
+    station_ids = (list(STOPS) + [str(900200000 + i) for i in range(num_stations)])[:num_stations]
+    
+    pipeline = Pipeline(server.url, station_ids, results, display_lines)
+    
+    # Aufwärmen (Caches, Atlas, Verbindung)
+    for _ in range(3):
+        pipeline.run_cycle(TimingRecorder())
+    
+    timings: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    for _ in range(cycles):
+        recorder = TimingRecorder()
+        pipeline.run_cycle(recorder)
+        for stage in STAGES:
+            timings[stage].append(recorder.totals.get(stage, 0.0))
+    
+    allocations = AllocationRecorder()
+    tracemalloc.start()
+    for _ in range(alloc_cycles):
+        pipeline.run_cycle(allocations)
+    tracemalloc.stop()
+    
+    pipeline.close()
+    
+    stages = {}
+    for stage in STAGES:
+        stages[stage] = percentiles(timings[stage])
+        if stage in allocations.peak:
+            stages[stage]['alloc_peak_kb'] = allocations.peak[stage] / 1024
+            stages[stage]['net_kb'] = allocations.net[stage] / 1024 / max(1, alloc_cycles)
+        else:
+            stages[stage]['alloc_peak_kb'] = stages[stage]['net_kb'] = None
+    
+    return {
+        'stations': num_stations,
+        'results': results,
+        'direction_length': direction_length,
+        'cycles': cycles,
+        'stages': stages,
+        'peak_rss_kb': peak_rss_kb(),
+    }
+
+
+def config_name(result: Dict) -> str:
+    return f"{result['stations']}st/{result['results']}res/dir{result['direction_length']}"
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def print_results(results: List[Dict]):
+    print(f"{'Konfiguration':<22}{'Stufe':<8}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}"
+          f"{'Alloc KiB':>11}{'Netto KiB':>11}")
+    for result in results:
+        for stage in STAGES:
+            s = result['stages'][stage]
+            if s['alloc_peak_kb'] is None:
+                memory = f"{'-':>11}{'-':>11}"
+            else:
+                memory = f"{s['alloc_peak_kb']:>11.1f}{s['net_kb']:>11.1f}"
+            print(
+                f"{config_name(result):<22}{stage:<8}{s['p50_ms']:>9.2f}{s['p90_ms']:>9.2f}"
+                f"{s['p99_ms']:>9.2f}{memory}"
+            )
+        if result['peak_rss_kb'] is not None:
+            print(f"{'':<22}Peak RSS bisher: {result['peak_rss_kb'] / 1024:.1f} MiB")
+
+
+def print_comparison(results: List[Dict], previous_path: str):
+    """Vergleicht p50/p99 mit einem früheren Lauf (Faktor > 1 = langsamer)"""
+    try:
+        with open(previous_path, 'r', encoding='utf-8') as f:
+            previous = {config_name(r): r for r in json.load(f)['results']}
+    except (OSError, ValueError, KeyError) as e:
+        print(f"❌ Vergleich mit {previous_path} nicht möglich: {e}")
+        return
+    
+    print()
+    print(f"Vergleich mit {previous_path} (Faktor > 1 = langsamer)")
+    print(f"{'Konfiguration':<22}{'Stufe':<8}{'p50':>8}{'p99':>8}")
+    for result in results:
+        old = previous.get(config_name(result))
+        if old is None:
+            continue
+        for stage in STAGES:
+            new_stage, old_stage = result['stages'][stage], old['stages'].get(stage)
+            if not old_stage or not old_stage['p50_ms'] or not old_stage['p99_ms']:
+                continue
+            print(
+                f"{config_name(result):<22}{stage:<8}"
+                f"{new_stage['p50_ms'] / old_stage['p50_ms']:>7.2f}x"
+                f"{new_stage['p99_ms'] / old_stage['p99_ms']:>7.2f}x"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark eines kompletten Aktualisierungszyklus')
+    parser.add_argument('--stations', type=parse_int_list, default=[1, 2, 4], help='z.B. 1,2,4')
+    parser.add_argument('--results', type=parse_int_list, default=[20, 60], help='z.B. 20,60')
+    parser.add_argument('--direction-length', type=parse_int_list, default=[0, 80],
+                        help='Mindestlänge der Richtungen, z.B. 0,80')
+    parser.add_argument('--cycles', type=int, default=30, help='Gemessene Zyklen pro Konfiguration')
+    parser.add_argument('--alloc-cycles', type=int, default=5, help='Zyklen mit tracemalloc')
+    parser.add_argument('--lines', default=','.join(DEFAULT_DISPLAY_LINES),
+                        help='Linienfilter (leer = alle Linien)')
+    parser.add_argument('--output', help='JSON-Datei (Standard: bench_results/pipeline-<Zeit>.json)')
+    parser.add_argument('--compare', help='Früheres Ergebnis zum Vergleichen')
+    args = parser.parse_args()
+    
+    logging.getLogger().setLevel(logging.WARNING)
+    
+    display_lines = [line for line in args.lines.split(',') if line]
+    synthesizer = BoardSynthesizer()
+    server = StubServer(('127.0.0.1', 0), synthesizer).start()
+    
+    results = []
+    try:
+        for num_stations, results_per_station, direction_length in product(
+                args.stations, args.results, args.direction_length):
+            results.append(run_config(
+                server, synthesizer, num_stations, results_per_station, direction_length,
+                args.cycles, args.alloc_cycles, display_lines
+            ))
+    finally:
+        server.stop()
+    
+    print(f"Python {sys.version.split()[0]}, {platform.machine()}, {args.cycles} Zyklen pro Konfiguration")
+    print_results(results)
+    
+    output = args.output or os.path.join(
+        DEFAULT_RESULTS_DIR, f"pipeline-{datetime.now():%Y%m%d-%H%M%S}.json"
+    )
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': sys.version.split()[0],
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'display_lines': display_lines,
+            'results': results,
+        }, f, indent=2)
+    print(f"\nErgebnis gespeichert: {output}")
+    
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
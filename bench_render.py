@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Renderzeit pro Frame
+
+Zeichnet die Szenarien aus headless.py (eine Station, zwei Stationen,
+lange Richtungen) mit dem echten DisplayManager ohne Display und misst
+die Zeit pro Frame, einmal mit komplettem Neuzeichnen in jedem Frame und
+einmal im normalen Betrieb (nur geänderte Bereiche). Die Uhr läuft pro
+Frame um 1/MAX_FPS Sekunden weiter, damit Scrollen, Blinken und Uhrzeit
+wie im Betrieb ablaufen. Es werden keine Anfragen gesendet.
+
+Mit --budget-ms endet das Script mit Exit-Code 1, wenn ein p99 über dem
+Budget liegt (z.B. für CI).
+
+Aufruf: python bench_render.py [--frames 300] [--scenario two] [--json result.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from typing import Dict, List
+
+from headless import DEFAULT_TIME, SCENARIOS, HeadlessRenderer
+from display import MAX_FPS
+
+
+def measure(renderer: HeadlessRenderer, stations: List[Dict], frames: int, full: bool) -> List[float]:
+    """Zeit pro Frame in Millisekunden"""
+    display = renderer.display
+    timings = []
+    for _ in range(frames):
+        renderer.advance(1.0 / MAX_FPS)
+        if full:
+            display.damage.invalidate()
+        start = time.perf_counter()
+        display.draw_departures(stations)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Median, p99 und Mittelwert"""
+    ordered = sorted(timings)
+    return {
+        'p50_ms': statistics.median(ordered),
+        'p99_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))],
+        'mean_ms': statistics.mean(ordered),
+    }
+
+
+def run_scenario(name: str, frames: int, width: int, height: int) -> Dict:
+    """Misst ein Szenario in beiden Modi"""
+    renderer = HeadlessRenderer(width, height, DEFAULT_TIME)
+    stations = SCENARIOS[name](DEFAULT_TIME)
+    
+    # Aufwärmen (Caches, Atlas, statische Ebene)
+    measure(renderer, stations, 10, full=False)
+    
+    # Inkrementell zuerst, damit die Flächen-Statistik nur den Normalbetrieb zeigt
+    incremental = summarize(measure(renderer, stations, frames, full=False))
+    damaged_ratio = renderer.display.damage.stats()['avg_damaged_ratio']
+    result = {
+        'scenario': name,
+        'full': summarize(measure(renderer, stations, frames, full=True)),
+        'incremental': incremental,
+        'avg_damaged_ratio': damaged_ratio,
+    }
+    renderer.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark der Renderzeit pro Frame')
+    parser.add_argument('--frames', type=int, default=300, help='Frames pro Messung')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), action='append',
+                        help='Nur diese Szenarien (mehrfach möglich)')
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--json', help='Ergebnis zusätzlich als JSON speichern')
+    parser.add_argument('--budget-ms', type=float, help='Höchstens erlaubtes p99 (inkrementell)')
+    args = parser.parse_args()
+    
+    scenarios = args.scenario or list(SCENARIOS)
+    results = [run_scenario(name, args.frames, args.width, args.height) for name in scenarios]
+    
+    print(f"{args.frames} Frames, {args.width}x{args.height}, SDL-Treiber {os.environ['SDL_VIDEODRIVER']}")
+    print(f"{'Szenario':<10}{'Modus':<14}{'p50 ms':>10}{'p99 ms':>10}{'Ø ms':>10}")
+    for result in results:
+        for mode in ('full', 'incremental'):
+            timings = result[mode]
+            label = 'komplett' if mode == 'full' else 'inkrementell'
+            print(
+                f"{result['scenario']:<10}{label:<14}"
+                f"{timings['p50_ms']:>10.2f}{timings['p99_ms']:>10.2f}{timings['mean_ms']:>10.2f}"
+            )
+        print(f"{'':<10}Ausgegebene Fläche: Ø {result['avg_damaged_ratio']:.1%} des Bildschirms pro Frame")
+    
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'frames': args.frames, 'width': args.width, 'height': args.height,
+                       'results': results}, f, indent=2)
+    
+    if args.budget_ms is not None:
+        over = [r['scenario'] for r in results if r['incremental']['p99_ms'] > args.budget_ms]
+        if over:
+            print(f"❌ p99 über {args.budget_ms} ms: {', '.join(over)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,60 +2,508 @@
 BVG API Client
 
 Wrapper für die BVG REST API v6 (https://v6.bvg.transport.rest)
-Holt Abfahrtszeiten und Störungsmeldungen.
+Holt Abfahrtszeiten und Störungsmeldungen. Alle Anfragen laufen über
+den gemeinsamen RequestGovernor (siehe rate_limit.py) und optional
+über den ResponseCache (siehe http_cache.py).
 """
+import json
+import os
+import random
+import sys
+import threading
+import time
 import requests
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, NamedTuple, Optional
 import logging
 
+from http_cache import ResponseCache
+from rate_limit import RequestGovernor, PRIORITY_DEPARTURES, PRIORITY_SEARCH
+from tracing import span
+
 logger = logging.getLogger(__name__)
 
 # API Konstanten
 API_BASE_URL = "https://v6.bvg.transport.rest"
+API_BASE_URL_ENV = 'BVG_API_BASE_URL'  # Überschreibt API_BASE_URL (z.B. für stub_server.py)
 API_TIMEOUT = 10  # Sekunden
 DEFAULT_RESULTS = 20  # Anzahl Ergebnisse pro Anfrage
 DEFAULT_DURATION = 60  # Minuten Zeitfenster
+RESULTS_MARGIN = 3  # Zusätzliche Abfahrten für Züge, die bis zum nächsten Abruf abfahren
+PRODUCTS = ('suburban', 'subway', 'tram', 'bus', 'ferry', 'express', 'regional')  # Produkt-Parameter der API
+SEARCH_BUDGET_TIMEOUT = 2  # Sekunden, die eine Suche auf freies Budget wartet
+DEFAULT_RETRY_AFTER = 60  # Sekunden Pause nach 429 ohne Retry-After
+DISRUPTION_TYPES = ['warning', 'status', 'hint']  # Nach Schwere sortiert
+
+# Circuit Breaker
+BREAKER_FAILURE_THRESHOLD = 3  # Fehler in Folge bis zum Öffnen
+BREAKER_BASE_BACKOFF = 5  # Sekunden bis zum ersten Probe-Request
+BREAKER_MAX_BACKOFF = 300  # Sekunden (Obergrenze)
+BREAKER_JITTER = 0.5  # Zufälliger Aufschlag bis zu 50%
+
+
+class Departure(NamedTuple):
+    """
+    Eine Abfahrt (kompakt und unveränderlich)
+    
+    Als Tupel ohne eigenes __dict__ deutlich kleiner als ein Dictionary;
+    Linie, Richtung und Produkt sind internierte Strings, die sich alle
+    Abfahrten (auch über mehrere Abrufe hinweg) teilen.
+    """
+    line: str  # Liniennummer
+    direction: str  # Zielrichtung
+    product: str  # Produkttyp (subway, bus, etc.)
+    when: datetime  # Abfahrtszeit inkl. Verspätung (naive, lokale Zeit)
+    delay: int  # Verspätung in Minuten
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parst einen Zeitstempel der API (z.B. "2024-05-01T12:34:00+02:00")
+    
+    Das feste Format der API wird per Slicing gelesen, andere Formate
+    gehen über datetime.fromisoformat. Die Zeitzone wird verworfen, die
+    API liefert Berliner Ortszeit.
+    
+    Raises:
+        ValueError: Bei ungültigem Zeitstempel
+    """
+    if len(value) >= 19 and value[4] == '-' and value[10] == 'T' and value[16] == ':':
+        return datetime(
+            int(value[0:4]), int(value[5:7]), int(value[8:10]),
+            int(value[11:13]), int(value[14:16]), int(value[17:19])
+        )
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+
+
+def parse_departures(departures: List[Dict], now: Optional[datetime] = None) -> List[Departure]:
+    """
+    Wandelt rohe Abfahrten der API in Departure-Tupel um
+    
+    Gelesen werden nur die benötigten Felder; die Verspätung kommt direkt
+    aus 'delay' (Sekunden), plannedWhen muss nicht geparst werden.
+    Bereits abgefahrene (minutes_until < 0) und ausgefallene (ohne 'when')
+    Verbindungen werden verworfen.
+    
+    Args:
+        departures: Rohe Abfahrten aus /stops/{id}/departures
+        now: Aktuelle Zeit (Standard: datetime.now())
+        
+    Returns:
+        Abfahrten sortiert nach Abfahrtszeit
+    """
+    if now is None:
+        now = datetime.now()
+    # minutes_until rundet zur Null hin: bis 59 s nach 'when' gilt "jetzt"
+    departed = now - timedelta(minutes=1)
+    
+    parsed = []
+    timestamps: Dict[str, datetime] = {}  # Gleiche Zeiten nur einmal parsen
+    intern = sys.intern
+    
+    for dep in departures:
+        try:
+            when_str = dep.get('when')
+            if not when_str:
+                continue
+            
+            when = timestamps.get(when_str)
+            if when is None:
+                when = timestamps[when_str] = parse_timestamp(when_str)
+            
+            if when <= departed:  # Bereits abgefahren
+                continue
+            
+            delay = dep.get('delay')
+            line = dep.get('line') or {}
+            
+            parsed.append(Departure(
+                intern(line.get('name') or '?'),
+                intern(dep.get('direction') or 'Unbekannt'),
+                intern(line.get('product') or 'unknown'),
+                when,
+                int(delay / 60) if delay else 0
+            ))
+            
+        except (AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Fehler beim Parsen einer Abfahrt: {e}")
+            continue
+    
+    parsed.sort(key=lambda d: d.when)
+    return parsed
+
+
+def minutes_until(when: datetime, now: Optional[datetime] = None) -> int:
+    """
+    Berechnet die ganzen Minuten bis zur Abfahrt
+    
+    Args:
+        when: Abfahrtszeit (naive, lokale Zeit)
+        now: Aktuelle Zeit (Standard: datetime.now())
+        
+    Returns:
+        Minuten bis Abfahrt, zur Null hin gerundet (bis 59 s nach der
+        Abfahrt 0 = "jetzt", negativ = bereits abgefahren)
+    """
+    if now is None:
+        now = datetime.now()
+    return int((when - now).total_seconds() / 60)
+
+
+def walking_state(minutes: int, walking_time: int) -> str:
+    """
+    Bewertet eine Abfahrt relativ zum Fußweg
+    
+    Returns:
+        'red' (weniger als Fußweg), 'yellow' (genau Fußweg)
+        oder 'green' (mehr als Fußweg)
+    """
+    if minutes < walking_time:
+        return 'red'
+    if minutes == walking_time:
+        return 'yellow'
+    return 'green'
+
+
+def _known_products(products: Optional[List[str]]) -> frozenset:
+    """
+    Erlaubte Produkte ohne unbekannte Namen
+    
+    Ein Tippfehler ("ubahn") würde sonst alle Produkt-Parameter auf false
+    setzen und die Tafel bliebe leer. Unbekannte Namen werden daher mit
+    Warnung ignoriert; bleibt keiner übrig, gelten alle Produkte.
+    """
+    if not products:
+        return frozenset(PRODUCTS)
+    unknown = set(products) - set(PRODUCTS)
+    if unknown:
+        logger.warning(f"Unbekannte Produkte ignoriert: {', '.join(sorted(map(str, unknown)))} "
+                       f"(erlaubt: {', '.join(PRODUCTS)})")
+    known = frozenset(products) & frozenset(PRODUCTS)
+    return known or frozenset(PRODUCTS)
+
+
+class DepartureFilter:
+    """
+    Abfahrts-Filter einer Station
+    
+    Produkte, Anzahl und Zeitfenster gehen als Query-Parameter an die API,
+    die Antwort wird dadurch kleiner. Linien und Richtungen kann die API
+    nicht filtern; dafür wird einmalig ein Prädikat erzeugt, das die rohen
+    Abfahrten vor dem Parsen aussortiert.
+    """
+    
+    def __init__(self, products: Optional[List[str]] = None,
+                 lines: Optional[List[str]] = None,
+                 directions: Optional[List[str]] = None,
+                 rows: Optional[int] = None,
+                 duration: int = DEFAULT_DURATION):
+        """
+        Args:
+            products: Erlaubte Produkte (siehe PRODUCTS, leer = alle;
+                unbekannte Namen werden ignoriert)
+            lines: Erlaubte Linien (leer = alle)
+            directions: Teile der Zielrichtung, z.B. "Spandau" (leer = alle)
+            rows: Anzahl angezeigter Abfahrten (None = DEFAULT_RESULTS anfragen)
+            duration: Zeitfenster in Minuten
+        """
+        self.products = _known_products(products)
+        self.lines = frozenset(lines or ())
+        self.directions = tuple(direction.casefold() for direction in directions or ())
+        self.matches = self._compile()
+        
+        # 'results' zählt bei der API vor dem Linien-/Richtungsfilter,
+        # dann lieber die übliche Menge anfragen als zu wenig anzuzeigen
+        if rows is None:
+            results = DEFAULT_RESULTS
+        elif self.lines or self.directions:
+            results = max(DEFAULT_RESULTS, rows + RESULTS_MARGIN)
+        else:
+            results = rows + RESULTS_MARGIN
+        
+        self.params: Dict[str, object] = {'duration': duration, 'results': results}
+        for product in PRODUCTS:
+            if product not in self.products:
+                self.params[product] = 'false'
+    
+    @classmethod
+    def from_config(cls, station: Dict, config: Dict, rows: Optional[int] = None) -> 'DepartureFilter':
+        """
+        Erzeugt den Filter aus der Stations-Konfiguration
+        
+        Args:
+            station: Stations-Konfiguration (products, lines, directions,
+                results, duration - alle optional)
+            config: Gesamte Konfiguration (displayLines gilt für Stationen
+                ohne eigene 'lines')
+            rows: Anzahl angezeigter Abfahrten, falls 'results' fehlt
+        """
+        return cls(
+            products=station.get('products'),
+            lines=station.get('lines', config.get('displayLines')),
+            directions=station.get('directions'),
+            rows=station.get('results', rows),
+            duration=station.get('duration', DEFAULT_DURATION)
+        )
+    
+    def apply(self, departures: List[Dict]) -> List[Dict]:
+        """Sortiert rohe Abfahrten aus (vor parse_departures)"""
+        if self.matches is None:
+            return departures
+        return list(filter(self.matches, departures))
+    
+    def select(self, departures: List[Departure]) -> List[Departure]:
+        """Wendet den Filter auf bereits geparste Abfahrten an (z.B. von fetch_daemon.py)"""
+        any_product = self.products == frozenset(PRODUCTS)
+        return [
+            dep for dep in departures
+            if (any_product or dep.product in self.products)
+            and (not self.lines or dep.line in self.lines)
+            and (not self.directions or any(part in dep.direction.casefold() for part in self.directions))
+        ]
+    
+    def _compile(self) -> Optional[Callable[[Dict], bool]]:
+        """Prädikat für rohe Abfahrten (None = alle passen)"""
+        checks = []
+        if self.products != frozenset(PRODUCTS):
+            # Eigentlich schon von der API gefiltert - aber nicht von
+            # älteren Cache-Einträgen oder stub_server.py
+            products = self.products
+            checks.append(lambda dep: (dep.get('line') or {}).get('product') in products)
+        if self.lines:
+            lines = self.lines
+            checks.append(lambda dep: (dep.get('line') or {}).get('name') in lines)
+        if self.directions:
+            directions = self.directions
+            checks.append(lambda dep: any(
+                part in (dep.get('direction') or '').casefold() for part in directions
+            ))
+        
+        if not checks:
+            return None
+        if len(checks) == 1:
+            return checks[0]
+        return lambda dep: all(check(dep) for check in checks)
+
+
+class CircuitOpenError(requests.RequestException):
+    """Anfrage wurde nicht gesendet, weil der Circuit Breaker offen ist"""
+
+
+class CircuitBreaker:
+    """
+    Circuit Breaker für API-Ausfälle
+    
+    Nach mehreren Fehlern in Folge werden Anfragen sofort abgelehnt statt
+    jeweils den vollen Timeout abzuwarten. Nach einer Wartezeit mit
+    exponentiellem Backoff und Jitter darf ein einzelner Probe-Request
+    durch (half-open); gelingt er, schließt der Breaker wieder.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    def __init__(self, failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+                 base_backoff: float = BREAKER_BASE_BACKOFF,
+                 max_backoff: float = BREAKER_MAX_BACKOFF):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.state = self.CLOSED
+        self.failures = 0
+        self.open_count = 0  # Wie oft in Folge geöffnet (für Backoff)
+        self.next_probe_at = 0.0
+        self._lock = threading.Lock()
+    
+    def allow_request(self) -> bool:
+        """Prüft ob eine Anfrage gesendet werden darf"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() >= self.next_probe_at:
+                # Genau ein Probe-Request, alle anderen warten weiter
+                self.state = self.HALF_OPEN
+                return True
+            return False
+    
+    def record_success(self):
+        """Anfrage erfolgreich - Breaker schließen"""
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("API wieder erreichbar, Circuit Breaker geschlossen")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.open_count = 0
+    
+    def cancel_probe(self):
+        """Probe-Request wurde doch nicht gesendet - nächster Versuch darf sofort"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+    
+    def record_failure(self):
+        """Anfrage fehlgeschlagen - ggf. Breaker öffnen"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self._open()
+    
+    def _open(self):
+        """Öffnet den Breaker mit exponentiellem Backoff und Jitter"""
+        backoff = min(self.max_backoff, self.base_backoff * (2 ** self.open_count))
+        backoff *= 1.0 + random.uniform(0, BREAKER_JITTER)
+        self.state = self.OPEN
+        self.open_count += 1
+        self.next_probe_at = time.monotonic() + backoff
+        logger.warning(f"API nicht erreichbar, Circuit Breaker offen für {backoff:.0f}s")
 
 
 class BVGClient:
     """Client für die BVG REST API"""
     
-    def __init__(self):
+    def __init__(self, governor: Optional[RequestGovernor] = None,
+                 cache: Optional[ResponseCache] = None,
+                 base_url: Optional[str] = None,
+                 on_request: Optional[Callable[[str, str, Optional[float]], None]] = None,
+                 on_parse: Optional[Callable[[float], None]] = None):
+        """
+        Args:
+            governor: Request-Budget (Standard: prozessübergreifendes Budget)
+            cache: Optionaler Antwort-Cache (None = kein Caching)
+            base_url: API-Adresse (Standard: $BVG_API_BASE_URL bzw. API_BASE_URL)
+            on_request: Wird nach jeder Anfrage mit (URL, Status, Dauer in s)
+                aufgerufen; Status ist der HTTP-Code oder timeout, error,
+                cached, circuit_open bzw. no_budget (Dauer dann None)
+            on_parse: Wird mit der Dauer der Dekodierung einer Tafel aufgerufen
+        """
+        self.base_url = (base_url or os.environ.get(API_BASE_URL_ENV) or API_BASE_URL).rstrip('/')
+        self.governor = governor or RequestGovernor()
+        self.cache = cache
+        self.breaker = CircuitBreaker()
+        self.on_request = on_request
+        self.on_parse = on_parse
+        
+        # Letztes erfolgreiches Ergebnis pro Station (für stale-while-revalidate)
+        self._last_good: Dict[str, Dict] = {}
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'BVG-Abfahrt-Monitor/1.0'
         })
     
-    def get_departures(self, station_id: str, duration: int = DEFAULT_DURATION) -> List[Dict]:
+    def get_station_board(self, station_id: str, duration: int = DEFAULT_DURATION,
+                          departure_filter: Optional[DepartureFilter] = None) -> Dict:
         """
-        Holt Abfahrten für eine Station
+        Holt Abfahrten und Störungen einer Station mit einer einzigen Anfrage
+        
+        Die Störungsmeldungen werden aus den Remarks der Abfahrten abgeleitet
+        (remarks=true), ein zusätzlicher Aufruf von /stops/{id} entfällt.
+        Schlägt die Anfrage fehl (oder ist der Circuit Breaker offen), wird
+        das letzte erfolgreiche Ergebnis der Station als veraltet geliefert.
         
         Args:
-            station_id: BVG Stations-ID (z.B. "900000100001")
+            station_id: BVG Stations-ID
             duration: Zeitfenster in Minuten
+            departure_filter: Filter der Station (überschreibt duration)
             
         Returns:
-            Liste von Abfahrts-Dictionaries mit Feldern:
-            - line: Liniennummer
-            - direction: Zielrichtung
-            - minutes: Minuten bis Abfahrt
-            - delay: Verspätung in Minuten
-            - product: Produkttyp (subway, bus, etc.)
+            Dictionary mit:
+            - departures: Liste von Abfahrten (siehe get_departures)
+            - disruptions: Liste von Störungen (siehe get_disruptions)
+            - stale: True wenn die Daten aus einem früheren Abruf stammen
+            - fetchedAt: Zeitpunkt des Abrufs (time.time())
         """
         try:
-            url = f"{API_BASE_URL}/stops/{station_id}/departures"
-            params = {
-                'duration': duration,
-                'results': DEFAULT_RESULTS,
-                'remarks': 'true'
-            }
+            board = self.fetch_board(station_id, duration, departure_filter)
+            self._last_good[station_id] = board
+            return board
             
-            response = self.session.get(url, params=params, timeout=API_TIMEOUT)
-            response.raise_for_status()
+        except CircuitOpenError:
+            logger.debug(f"Circuit Breaker offen, überspringe {station_id}")
+        except requests.RequestException as e:
+            logger.error(f"API-Fehler beim Abrufen der Abfahrten: {e}")
+        except Exception as e:
+            logger.error(f"Unerwarteter Fehler beim Abrufen der Abfahrten: {e}")
+        
+        # Letztes gutes Ergebnis als veraltet ausliefern
+        last_good = self._last_good.get(station_id)
+        if last_good is not None:
+            return dict(last_good, stale=True)
+        return {'departures': [], 'disruptions': [], 'stale': True, 'fetchedAt': 0.0}
+    
+    def fetch_board(self, station_id: str, duration: int = DEFAULT_DURATION,
+                    departure_filter: Optional[DepartureFilter] = None) -> Dict:
+        """
+        Ein Abruf einer Tafel ohne Rückfall auf ältere Daten
+        
+        Anfrage, Filter, Parsen und Störungen aus den Remarks - genau die
+        Schritte von get_station_board (z.B. für bench_pipeline.py). Die
+        Dauer der Anfrage meldet on_request, die des Parsens on_parse.
+        
+        Args:
+            station_id: BVG Stations-ID
+            duration: Zeitfenster in Minuten
+            departure_filter: Filter der Station (überschreibt duration)
+        
+        Returns:
+            Tafel wie bei get_station_board (stale ist immer False)
+        
+        Raises:
+            CircuitOpenError: Wenn der Circuit Breaker offen ist
+            requests.RequestException: Bei Netzwerk- oder HTTP-Fehlern
+        """
+        with span('fetch', 'fetch', station=station_id):
+            departures = self._fetch_departures_raw(station_id, duration, departure_filter=departure_filter)
+        
+        # Vor dem Parsen - auch Remarks aussortierter Linien entfallen
+        if departure_filter is not None:
+            with span('filter', 'filter', station=station_id):
+                departures = departure_filter.apply(departures)
+        
+        parse_start = time.perf_counter()
+        with span('parse', 'parse', station=station_id, departures=len(departures)):
+            # Remarks aller Abfahrten einsammeln (Duplikate filtert _parse_remarks).
+            # Hinweise mit Code sind Fahrt-Attribute ("barrierefrei",
+            # Fahrradmitnahme) und stehen an fast jeder Abfahrt - keine Störung
+            remarks = [
+                remark
+                for dep in departures
+                for remark in (dep.get('remarks') or [])
+                if not (remark.get('type') == 'hint' and remark.get('code'))
+            ]
+            
+            board = {
+                'departures': parse_departures(departures),
+                'disruptions': self._parse_remarks(remarks),
+                'stale': False,
+                'fetchedAt': time.time()
+            }
+        if self.on_parse:
+            self.on_parse(time.perf_counter() - parse_start)
+        return board
+    
+    def get_departures(self, station_id: str, duration: int = DEFAULT_DURATION,
+                       departure_filter: Optional[DepartureFilter] = None) -> List[Departure]:
+        """
+        Holt Abfahrten für eine Station
+        
+        Args:
+            station_id: BVG Stations-ID (z.B. "900000100001")
+            duration: Zeitfenster in Minuten
+            departure_filter: Filter der Station (überschreibt duration)
             
-            departures = response.json().get('departures', [])
-            return self._parse_departures(departures)
+        Returns:
+            Liste von Departure-Tupeln (line, direction, product, when, delay),
+            sortiert nach Abfahrtszeit; die Minuten bis zur Abfahrt berechnet
+            die Anzeige selbst aus 'when'
+        """
+        try:
+            with span('fetch', 'fetch', station=station_id):
+                departures = self._fetch_departures_raw(station_id, duration, departure_filter=departure_filter)
+            if departure_filter is not None:
+                departures = departure_filter.apply(departures)
+            with span('parse', 'parse', station=station_id, departures=len(departures)):
+                return parse_departures(departures)
             
         except requests.RequestException as e:
             logger.error(f"API-Fehler beim Abrufen der Abfahrten: {e}")
@@ -78,27 +526,11 @@ class BVGClient:
             - text: Volltext
         """
         try:
-            url = f"{API_BASE_URL}/stops/{station_id}"
+            url = f"{self.base_url}/stops/{station_id}"
             params = {'remarks': 'true'}
             
-            response = self.session.get(url, params=params, timeout=API_TIMEOUT)
-            response.raise_for_status()
-            
-            data = response.json()
-            remarks = data.get('remarks', [])
-            
-            # Filtere relevante Störungen
-            disruptions = []
-            for remark in remarks:
-                remark_type = remark.get('type', '')
-                if remark_type in ['warning', 'status', 'hint']:
-                    disruptions.append({
-                        'type': remark_type,
-                        'summary': remark.get('summary', remark.get('text', 'Störung')),
-                        'text': remark.get('text', '')
-                    })
-            
-            return disruptions
+            data = self._get_json(url, params)
+            return self._parse_remarks(data.get('remarks', []))
             
         except requests.RequestException as e:
             logger.error(f"API-Fehler beim Abrufen der Störungen: {e}")
@@ -107,52 +539,153 @@ class BVGClient:
             logger.error(f"Unerwarteter Fehler beim Abrufen der Störungen: {e}")
             return []
     
-    def _parse_departures(self, departures: List[Dict]) -> List[Dict]:
-        """Parst und filtert Abfahrtsdaten"""
-        parsed = []
-        now = datetime.now()
+    def _fetch_departures_raw(self, station_id: str, duration: int,
+                              results: int = DEFAULT_RESULTS,
+                              departure_filter: Optional[DepartureFilter] = None) -> List[Dict]:
+        """Holt die ungeparsten Abfahrten (inkl. Remarks) einer Station"""
+        url = f"{self.base_url}/stops/{station_id}/departures"
+        params = {
+            'duration': duration,
+            'results': results,
+            'remarks': 'true',
+            'pretty': 'false'  # Ohne Einrückung: weniger Bytes zu übertragen und zu dekodieren
+        }
+        if departure_filter is not None:
+            # Zeitfenster, Anzahl und Produkte der Station
+            params.update(departure_filter.params)
+        
+        return self._get_json(url, params).get('departures', [])
+    
+    def search_locations(self, query: str, results: int = 10) -> List[Dict]:
+        """
+        Sucht Stationen/Haltestellen über /locations
+        
+        Suchen haben eine niedrigere Priorität als Abfahrten und warten
+        nur kurz auf freies Budget.
+        
+        Args:
+            query: Suchbegriff (z.B. "Alexanderplatz")
+            results: Maximale Anzahl Ergebnisse
+            
+        Returns:
+            Liste der gefundenen Orte (rohe API-Daten)
+            
+        Raises:
+            requests.RequestException: Bei Netzwerk-/API-Fehlern
+        """
+        url = f"{self.base_url}/locations"
+        params = {
+            'query': query,
+            'results': results
+        }
+        
+        return self._get_json(url, params, priority=PRIORITY_SEARCH, budget_timeout=SEARCH_BUDGET_TIMEOUT)
+    
+    def _get_json(self, url: str, params: Dict, priority: int = PRIORITY_DEPARTURES,
+                  budget_timeout: float = API_TIMEOUT):
+        """
+        Sendet eine GET-Anfrage unter Beachtung von Cache und Request-Budget
+        
+        Frische Cache-Einträge werden ohne Anfrage zurückgegeben, abgelaufene
+        nach Möglichkeit per If-None-Match/If-Modified-Since revalidiert.
+        
+        Returns:
+            Dekodierte JSON-Antwort
+            
+        Raises:
+            requests.RequestException: Bei Netzwerkfehlern, HTTP-Fehlern
+                oder erschöpftem Budget
+        """
+        headers = {}
+        entry = None
+        
+        if self.cache is not None:
+            key = self.cache.make_key(url, params)
+            ttl = self.cache.ttl_for(url)
+            entry, fresh = self.cache.lookup(key, ttl)
+            if fresh:
+                self._report(url, 'cached')
+                return json.loads(entry.body)
+            if entry is not None:
+                headers = self.cache.conditional_headers(entry)
+        
+        if not self.breaker.allow_request():
+            self._report(url, 'circuit_open')
+            raise CircuitOpenError("Circuit Breaker offen")
         
-        for dep in departures:
+        if not self.governor.acquire(priority, timeout=budget_timeout):
+            self.breaker.cancel_probe()
+            self._report(url, 'no_budget')
+            raise requests.RequestException("Request-Budget erschöpft")
+        
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=API_TIMEOUT)
+        except requests.RequestException as e:
+            # Timeout, Verbindungsfehler, ...
+            self.breaker.record_failure()
+            self._report(url, 'timeout' if isinstance(e, requests.Timeout) else 'error',
+                         time.perf_counter() - start)
+            raise
+        self._report(url, str(response.status_code), time.perf_counter() - start)
+        
+        if response.status_code == 429 or response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        
+        if response.status_code == 304 and entry is not None:
+            # Unverändert: gespeicherten Body weiterverwenden
+            self.cache.touch(key)
+            return json.loads(entry.body)
+        
+        if response.status_code == 429:
+            # Rate-Limit: alle Prozesse auf diesem Rechner bremsen
             try:
-                # Geplante und tatsächliche Abfahrtszeit
-                when_str = dep.get('when')
-                planned_when_str = dep.get('plannedWhen')
-                
-                if not when_str:
-                    continue
-                
-                # Parse ISO 8601 datetime
-                when = datetime.fromisoformat(when_str.replace('Z', '+00:00'))
-                planned_when = datetime.fromisoformat(planned_when_str.replace('Z', '+00:00')) if planned_when_str else when
-                
-                # Konvertiere zu lokaler Zeit (naive datetime für Vergleich)
-                when = when.replace(tzinfo=None)
-                planned_when = planned_when.replace(tzinfo=None)
-                
-                # Verspätung berechnen
-                delay = int((when - planned_when).total_seconds() / 60)
-                
-                # Minuten bis Abfahrt
-                minutes_until = int((when - now).total_seconds() / 60)
-                
-                if minutes_until < 0:
-                    continue
-                
-                line = dep.get('line', {})
-                
-                parsed.append({
-                    'line': line.get('name', '?'),
-                    'direction': dep.get('direction', 'Unbekannt'),
-                    'minutes': minutes_until,
-                    'delay': delay,
-                    'when': when,
-                    'product': line.get('product', 'unknown')
-                })
-                
-            except Exception as e:
-                logger.warning(f"Fehler beim Parsen einer Abfahrt: {e}")
+                retry_after = float(response.headers.get('Retry-After', DEFAULT_RETRY_AFTER))
+            except ValueError:
+                retry_after = DEFAULT_RETRY_AFTER
+            self.governor.penalize(retry_after)
+        
+        response.raise_for_status()
+        
+        if self.cache is not None:
+            self.cache.store(key, response.content, response.headers)
+        
+        # Direkt aus den Bytes dekodieren (kein Umweg über response.text)
+        return json.loads(response.content)
+    
+    def _report(self, url: str, status: str, seconds: Optional[float] = None):
+        """Meldet eine Anfrage an on_request (für Metriken)"""
+        if self.on_request:
+            self.on_request(url, status, seconds)
+    
+    def _parse_remarks(self, remarks: List[Dict]) -> List[Dict]:
+        """
+        Filtert relevante Störungen aus einer Liste von Remarks
+        
+        Duplikate (gleiche ID bzw. gleicher Text) werden entfernt, die
+        Reihenfolge ist warning vor status vor hint.
+        """
+        disruptions = []
+        seen = set()
+        
+        for remark in remarks:
+            remark_type = remark.get('type', '')
+            if remark_type not in DISRUPTION_TYPES:
+                continue
+            
+            key = remark.get('id') or (remark.get('summary'), remark.get('text'))
+            if key in seen:
                 continue
+            seen.add(key)
+            
+            disruptions.append({
+                'type': remark_type,
+                'summary': remark.get('summary') or remark.get('text') or 'Störung',
+                'text': remark.get('text', '')
+            })
         
-        # Sortiere nach Zeit
-        parsed.sort(key=lambda x: x['minutes'])
-        return parsed
+        # Schwerwiegendste Meldung zuerst (Display zeigt nur die erste)
+        disruptions.sort(key=lambda d: DISRUPTION_TYPES.index(d['type']))
+        return disruptions
@@ -2,14 +2,21 @@
 Display Manager mit pygame
 Minimalistisches Interface für Abfahrtszeiten - Zweispalten-Layout
 """
+import os
 import pygame
 import sys
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from datetime import datetime
 import logging
 import time
 import math
 
+from bvg_api import Departure, minutes_until, walking_state
+from framebuffer import FramebufferOutput, DEFAULT_FRAMEBUFFER
+from sprite_atlas import SpriteAtlas
+from surface_cache import SurfaceCache, surface_bytes
+from tracing import span
+
 logger = logging.getLogger(__name__)
 
 # Konstanten für Layout
@@ -17,11 +24,121 @@ HEADER_HEIGHT = 40
 LEGEND_HEIGHT = 25
 BADGE_SIZE = 45
 ICON_SIZE = 20
-TARGET_FPS = 5  # Frames pro Sekunde
-SCROLL_SPEED = 3  # Pixel pro Frame (angepasst für 5 FPS)
-SCROLL_PAUSE_FRAMES = 15  # 3 Sekunden bei 5 FPS
+IDLE_FPS = 1  # Mindestens ein Frame pro Sekunde (Uhr, Offline-Prüfung)
+MAX_FPS = 15  # Obergrenze, wird nur beim Scrollen erreicht
+SCROLL_SPEED = 15  # Pixel pro Sekunde
+SCROLL_PAUSE = 3.0  # Sekunden Pause vor jedem Durchlauf
 BLINK_INTERVAL = 0.5  # Sekunden
-WIFI_ANIMATION_SPEED = 1  # Frames pro Animation-Frame (angepasst für 5 FPS)
+WIFI_FRAME_DURATION = 0.5  # Sekunden pro Animations-Frame (falls das PNG keine Angabe hat)
+NEW_DATA_EVENT = pygame.USEREVENT + 1  # Weckt die Render-Schleife bei neuen Daten
+VISIBLE_STATIONS = 2  # Maximal angezeigte Stationen
+ROW_HEIGHT = 60  # Höhe einer Abfahrtszeile
+ROWS_SINGLE = 8  # Abfahrten bei nur einer Station (volle Breite)
+ROWS_COLUMNS = 5  # Abfahrten pro Station im Zweispalten-Layout
+STATUS_WIDTH = 140  # Breite des Status-Bereichs oben rechts (Uhr, WiFi, Alter)
+STATS_LOG_INTERVAL = 300  # Sekunden zwischen zwei Render-Statistiken im Log
+TEXT_CACHE_BYTES = 1024 * 1024  # Obergrenze für gerenderte Texte
+SCROLL_CACHE_BYTES = 4 * 1024 * 1024  # Obergrenze für Scrolling-Texte
+
+
+def rows_per_station(num_stations: int) -> int:
+    """Anzahl angezeigter Abfahrten pro Station (bestimmt auch die Abfrage-Menge)"""
+    return ROWS_SINGLE if num_stations == 1 else ROWS_COLUMNS
+
+
+class DamageTracker:
+    """
+    Merkt sich, welche Bildschirmbereiche sich geändert haben
+    
+    Jeder Bereich wird mit einem Zustands-Schlüssel registriert; nur wenn
+    sich dieser gegenüber dem letzten Frame ändert, wird der Bereich neu
+    gezeichnet und per pygame.display.update(rects) ausgegeben statt den
+    kompletten Bildschirm zu flippen.
+    """
+    
+    def __init__(self, size: Tuple[int, int],
+                 output: Optional[Callable[[Optional[List[pygame.Rect]]], None]] = None):
+        """
+        Args:
+            size: Bildschirmgröße
+            output: Gibt Bereiche aus (None = alles); Standard ist SDL
+        """
+        self.screen_rect = pygame.Rect((0, 0), size)
+        self.output = output
+        self.full_redraw = True  # Erster Frame zeichnet alles
+        self._keys: Dict[object, object] = {}
+        self._rects: List[pygame.Rect] = []
+        
+        # Statistik
+        self.frames = 0
+        self.full_frames = 0
+        self.last_damaged = 0  # Ausgegebene Pixel im letzten Frame
+        self.total_damaged = 0
+    
+    def invalidate(self):
+        """Erzwingt ein komplettes Neuzeichnen (z.B. nach Layout-Wechsel)"""
+        self.full_redraw = True
+        self._keys.clear()
+        self._rects.clear()
+    
+    def changed(self, region: object, key: object) -> bool:
+        """
+        Prüft ob ein Bereich neu gezeichnet werden muss
+        
+        Args:
+            region: Eindeutige Kennung des Bereichs
+            key: Alles, was den Inhalt des Bereichs bestimmt (vergleichbar)
+            
+        Returns:
+            True wenn sich der Inhalt geändert hat (Schlüssel wird übernommen)
+        """
+        if region in self._keys and self._keys[region] == key:
+            return False
+        self._keys[region] = key
+        return True
+    
+    def add(self, rect: pygame.Rect):
+        """Markiert einen neu gezeichneten Bereich zur Ausgabe"""
+        if not self.full_redraw:
+            rect = rect.clip(self.screen_rect)
+            if rect.width and rect.height:
+                self._rects.append(rect)
+    
+    def present(self):
+        """Gibt die geänderten Bereiche aus und setzt den Frame zurück"""
+        if self.full_redraw:
+            if self.output is not None:
+                self.output(None)
+            else:
+                pygame.display.flip()
+            damaged = self.screen_rect.width * self.screen_rect.height
+            self.full_frames += 1
+        elif self._rects:
+            if self.output is not None:
+                self.output(self._rects)
+            else:
+                pygame.display.update(self._rects)
+            damaged = sum(rect.width * rect.height for rect in self._rects)
+        else:
+            damaged = 0
+        
+        self.frames += 1
+        self.last_damaged = damaged
+        self.total_damaged += damaged
+        self.full_redraw = False
+        self._rects = []
+    
+    def stats(self) -> Dict[str, float]:
+        """Ausgegebene Fläche pro Frame (Pixel und Anteil am Bildschirm)"""
+        screen_area = self.screen_rect.width * self.screen_rect.height
+        average = self.total_damaged / self.frames if self.frames else 0.0
+        return {
+            'frames': self.frames,
+            'full_frames': self.full_frames,
+            'last_damaged_pixels': self.last_damaged,
+            'avg_damaged_pixels': average,
+            'avg_damaged_ratio': average / screen_area if screen_area else 0.0,
+        }
 
 
 class ScrollingText:
@@ -29,9 +146,11 @@ class ScrollingText:
     Klasse für horizontal scrollenden Text
     
     Scrollt automatisch wenn der Text breiter als max_width ist.
-    Nach jedem Durchlauf gibt es eine Pause.
+    Nach jedem Durchlauf gibt es eine Pause. Die Position hängt nur von
+    der Zeit ab, nicht von der Anzahl der Frames.
     """
-    def __init__(self, text: str, font: pygame.font.Font, max_width: int, color: Tuple[int, int, int]):
+    def __init__(self, text: str, font: pygame.font.Font, max_width: int, color: Tuple[int, int, int],
+                 now: Optional[float] = None):
         self.text = text
         self.font = font
         self.max_width = max_width
@@ -41,28 +160,40 @@ class ScrollingText:
         self.offset = 0
         self.needs_scroll = self.text_width > max_width
         self.scroll_speed = SCROLL_SPEED
-        self.pause_frames = SCROLL_PAUSE_FRAMES
-        self.pause_counter = self.pause_frames
-        self.scroll_offset_float = 0.0  # Float für sanfteres Scrolling
+        self.pause = SCROLL_PAUSE
+        self.cycle_start = time.time() if now is None else now  # Beginn der aktuellen Pause
         
-    def update(self):
-        """Aktualisiert die Scroll-Position für den nächsten Frame"""
+    def update(self, now: Optional[float] = None):
+        """Berechnet die Scroll-Position für den Zeitpunkt now"""
         if not self.needs_scroll:
             return
-            
-        if self.pause_counter > 0:
-            self.pause_counter -= 1
+        if now is None:
+            now = time.time()
+        
+        scrolled = now - self.cycle_start - self.pause
+        if scrolled <= 0:
+            self.offset = 0
             return
         
-        # Sanftes Scrolling mit Float-Präzision
-        self.scroll_offset_float += self.scroll_speed
-        self.offset = int(self.scroll_offset_float)
+        self.offset = int(scrolled * self.scroll_speed)
         
         # Am Ende angekommen? Zurücksetzen mit Pause
         if self.offset > self.text_width - self.max_width + 20:
             self.offset = 0
-            self.scroll_offset_float = 0.0
-            self.pause_counter = self.pause_frames
+            self.cycle_start = now
+    
+    def next_change(self, now: float) -> float:
+        """Zeitpunkt, an dem sich die Scroll-Position das nächste Mal ändert"""
+        if not self.needs_scroll:
+            return math.inf
+        
+        scroll_start = self.cycle_start + self.pause
+        if now < scroll_start:
+            return scroll_start
+        
+        # Nächster ganzer Pixel
+        next_pixel = math.floor((now - scroll_start) * self.scroll_speed) + 1
+        return scroll_start + next_pixel / self.scroll_speed
     
     def draw(self, screen: pygame.Surface, x: int, y: int):
         """
@@ -75,11 +206,12 @@ class ScrollingText:
         if not self.needs_scroll:
             screen.blit(self.surface, (x, y))
         else:
-            # Clipping für Scroll-Effekt
+            # Clipping für Scroll-Effekt (innerhalb eines bestehenden Clips)
+            previous_clip = screen.get_clip()
             clip_rect = pygame.Rect(x, y, self.max_width, self.surface.get_height())
-            screen.set_clip(clip_rect)
+            screen.set_clip(clip_rect.clip(previous_clip))
             screen.blit(self.surface, (x - self.offset, y))
-            screen.set_clip(None)
+            screen.set_clip(previous_clip)
 
 
 class DisplayManager:
@@ -95,6 +227,13 @@ class DisplayManager:
     BLUE = (100, 150, 255)
     ORANGE = (255, 165, 80)
     
+    # Farben für den Fußweg-Status (siehe bvg_api.walking_state)
+    STATE_COLORS = {
+        'red': RED,
+        'yellow': YELLOW,
+        'green': GREEN,
+    }
+    
     # Produkt-Farben (BVG-Style)
     PRODUCT_COLORS = {
         'subway': (0, 84, 159),      # U-Bahn Blau
@@ -106,7 +245,10 @@ class DisplayManager:
         'regional': (204, 0, 0),      # Regional Rot
     }
     
-    def __init__(self, width: int = 800, height: int = 480, fullscreen: bool = False, test_mode: bool = False):
+    def __init__(self, width: int = 800, height: int = 480, fullscreen: bool = False, test_mode: bool = False,
+                 output_backend: str = 'sdl', framebuffer_device: str = DEFAULT_FRAMEBUFFER,
+                 clock: Callable[[], float] = time.time,
+                 on_frame: Optional[Callable[[float], None]] = None):
         """
         Initialisiert das Display
         
@@ -115,7 +257,23 @@ class DisplayManager:
             height: Bildschirmhöhe
             fullscreen: Vollbildmodus
             test_mode: Test-Modus aktiviert
+            output_backend: 'sdl' (pygame-Fenster/fbcon), 'framebuffer'
+                (direkt per mmap, siehe framebuffer.py) oder 'headless'
+                (ohne Ausgabe, zum Profilen und für Tests)
+            framebuffer_device: Ziel für das Framebuffer-Backend
+            clock: Zeitquelle (Sekunden wie time.time), für reproduzierbare
+                Frames ohne Display (siehe headless.py)
+            on_frame: Wird nach jedem Frame mit der Renderzeit in Sekunden
+                aufgerufen (für Metriken)
         """
+        if output_backend in ('framebuffer', 'headless'):
+            # pygame zeichnet nur noch, ausgegeben wird direkt bzw. gar nicht
+            os.environ['SDL_VIDEODRIVER'] = 'dummy'
+            fullscreen = False
+        
+        self.clock = clock
+        self.on_frame = on_frame
+        
         pygame.init()
         
         self.width = width
@@ -140,29 +298,72 @@ class DisplayManager:
             self.font_small = pygame.font.Font(None, 18)
             self.font_tiny = pygame.font.Font(None, 14)
         
-        self.clock = pygame.time.Clock()
+        # Vorgerenderte Badges, Minutenangaben und Uhrziffern
+        self.atlas = SpriteAtlas(
+            fonts={
+                'numeral': self.font_large,
+                'badge_line': self.font_medium,
+                'badge_icon': self.font_tiny,
+                'delay': self.font_small,
+                'clock': self.font_small,
+                'age': self.font_tiny,
+            },
+            numeral_colors=[*self.STATE_COLORS.values(), self.DARK_GRAY],
+            text_color=self.WHITE,
+            clock_color=self.LIGHT_GRAY,
+            age_color=self.GRAY,
+            product_icon=self._get_product_icon
+        )
         
         # WiFi-Animation Setup
         self.wifi_frames = []
         self.wifi_icon_offline = None
         self.wifi_frame_index = 0
-        self.wifi_animation_counter = 0
-        self.wifi_animation_speed = WIFI_ANIMATION_SPEED
+        self.wifi_frame_duration = WIFI_FRAME_DURATION
+        self.wifi_next_frame = 0.0
         self._load_wifi_icon()
         
-        # Scrolling-Text Cache
-        self.scrolling_texts = {}
+        # Scrolling-Text Cache (begrenzt, siehe SurfaceCache)
+        self.scrolling_texts = SurfaceCache(
+            'scrolling_texts', SCROLL_CACHE_BYTES, size_of=lambda text: surface_bytes(text.surface)
+        )
         
         # Text-Rendering Cache (für statische Texte)
-        self.text_cache = {}
+        self.text_cache = SurfaceCache('text_cache', TEXT_CACHE_BYTES)
+        self._cached_stations = None  # Datenstand, für den die Caches zuletzt bereinigt wurden
         
         # Blink-State für "jetzt"-Abfahrten
         self.blink_state = True
-        self.last_blink = time.time()
+        self.last_blink = self.clock()
         
         # Online-Status
         self.is_live = True
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
+        
+        # Zeitpunkt der nächsten sichtbaren Änderung (siehe wait_for_next_frame)
+        self.next_change = 0.0
+        self._last_frame = 0.0
+        self._pending_events: List[pygame.event.Event] = []
+        
+        # Direkte Framebuffer-Ausgabe (optional)
+        self.framebuffer: Optional[FramebufferOutput] = None
+        if output_backend == 'framebuffer':
+            self.framebuffer = FramebufferOutput(self.screen, framebuffer_device)
+        
+        # Nur geänderte Bereiche ausgeben (Dirty Rectangles)
+        self.damage = DamageTracker(
+            (width, height), output=self.framebuffer.present if self.framebuffer else None
+        )
+        self._layout_key = None
+        
+        # Vorgerenderter Hintergrund (Header, Legende, Stationsköpfe)
+        self.static_layer: Optional[pygame.Surface] = None
+        self._panel_cache: Dict[Tuple, pygame.Surface] = {}
+        self._last_stats_log = self.clock()
+        
+        # Bereich zwischen Header und Legende (für Abfahrtszeilen)
+        content_top = HEADER_HEIGHT + 2
+        self.content_rect = pygame.Rect(0, content_top, width, height - LEGEND_HEIGHT - 5 - content_top)
     
     def _load_wifi_icon(self):
         """Lädt das WiFi-Icon (animiert wenn möglich mit PIL, sonst statisch)"""
@@ -192,6 +393,10 @@ class DisplayManager:
                     wifi_scaled = pygame.transform.smoothscale(wifi_surface, (ICON_SIZE, ICON_SIZE))
                     self.wifi_frames.append(wifi_scaled)
                     
+                    # Frame-Dauer aus dem PNG übernehmen (Millisekunden)
+                    if frame_count == 0 and pil_image.info.get('duration'):
+                        self.wifi_frame_duration = pil_image.info['duration'] / 1000
+                    
                     frame_count += 1
             except EOFError:
                 logger.info(f"WiFi-Icon: {frame_count} Frames geladen")
@@ -233,9 +438,7 @@ class DisplayManager:
             Gerenderte Text-Surface
         """
         cache_key = (text, id(font), color)
-        if cache_key not in self.text_cache:
-            self.text_cache[cache_key] = font.render(text, True, color)
-        return self.text_cache[cache_key]
+        return self.text_cache.get_or_create(cache_key, lambda: font.render(text, True, color))
     
     def _get_product_icon(self, product: str) -> Tuple[str, Tuple[int, int, int]]:
         """
@@ -266,21 +469,7 @@ class DisplayManager:
             line: Liniennummer
             size: Größe des Badges
         """
-        icon_text, color = self._get_product_icon(product)
-        
-        # Badge-Hintergrund
-        badge_rect = pygame.Rect(x, y, size, size)
-        pygame.draw.rect(screen, color, badge_rect, border_radius=8)
-        
-        # Icon (oben im Badge)
-        icon_surface = self.font_tiny.render(icon_text, True, self.WHITE)
-        icon_rect = icon_surface.get_rect(centerx=x + size // 2, top=y + 4)
-        screen.blit(icon_surface, icon_rect)
-        
-        # Liniennummer (unten im Badge)
-        line_surface = self.font_medium.render(line, True, self.WHITE)
-        line_rect = line_surface.get_rect(centerx=x + size // 2, bottom=y + size - 4)
-        screen.blit(line_surface, line_rect)
+        screen.blit(self.atlas.badge(product, line, size), (x, y))
     
     def _draw_warning_icon(self, screen: pygame.Surface, x: int, y: int, disruption: Dict):
         """
@@ -309,12 +498,12 @@ class DisplayManager:
         disruption_text = self.font_tiny.render(summary_short, True, self.ORANGE)
         screen.blit(disruption_text, (x + icon_size + 5, y + 2))
     
-    def _draw_legend(self):
+    def _draw_legend(self, surface: pygame.Surface):
         """Zeichnet die Farblegende am unteren Rand"""
         legend_y = self.height - 25
         
         # Trennlinie über der Legende
-        pygame.draw.line(self.screen, self.DARK_GRAY, (0, legend_y - 5), (self.width, legend_y - 5), 1)
+        pygame.draw.line(surface, self.DARK_GRAY, (0, legend_y - 5), (self.width, legend_y - 5), 1)
         
         # Legende-Items
         legend_items = [
@@ -331,164 +520,376 @@ class DisplayManager:
             x = i * item_width + 10
             
             # Farbiger Punkt
-            pygame.draw.circle(self.screen, color, (x, legend_y + 7), 5)
+            pygame.draw.circle(surface, color, (x, legend_y + 7), 5)
             
             # Text (cached)
             legend_text = self._render_text_cached(text[2:], self.font_tiny, self.LIGHT_GRAY)
-            self.screen.blit(legend_text, (x + 10, legend_y))
+            surface.blit(legend_text, (x + 10, legend_y))
         
         # Delay-Hinweis rechts (erweitert für +/-)
         delay_hint = self._render_text_cached("Zeiten inkl. Delays (+/-)", self.font_tiny, self.GRAY)
         delay_x = self.width - delay_hint.get_width() - 10
-        self.screen.blit(delay_hint, (delay_x, legend_y))
+        surface.blit(delay_hint, (delay_x, legend_y))
     
     def draw_departures(self, stations_data: List[Dict]):
         """
         Zeichnet Abfahrtszeiten im Zweispalten-Layout
         
+        Statische Teile (Titel, Stationsköpfe, Legende) liegen vorgerendert
+        in self.static_layer, der nur bei geändertem Layout neu aufgebaut
+        wird. Uhrzeit und Abfahrtszeilen werden nur gezeichnet, wenn sich
+        ihr Inhalt geändert hat; ausgegeben werden nur die geänderten
+        Bereiche (siehe DamageTracker).
+        
         Args:
             stations_data: Liste von Stations-Daten mit Abfahrten
         """
-        self.screen.fill(self.BLACK)
+        frame_start = time.perf_counter()
         
+        with span('frame', 'render'):
+            self._draw_frame(stations_data)
+        
+        if self.on_frame:
+            self.on_frame(time.perf_counter() - frame_start)
+    
+    def _draw_frame(self, stations_data: List[Dict]):
+        """Ein Frame, in Phasen aufgeteilt (siehe tracing.py)"""
         # Blink-Update für "JETZT"
-        current_time = time.time()
-        if current_time - self.last_blink > 0.5:  # Alle 0.5 Sekunden
+        current_time = self.clock()
+        self._last_frame = current_time
+        self.next_change = current_time + 1.0 / IDLE_FPS
+        if current_time - self.last_blink >= BLINK_INTERVAL:
             self.blink_state = not self.blink_state
             self.last_blink = current_time
         
+        # Neuer Datenstand: was dieser Frame nicht benutzt, fliegt danach aus den Caches
+        new_data = stations_data is not self._cached_stations
+        if new_data:
+            self._cached_stations = stations_data
+            self.text_cache.next_generation()
+            self.scrolling_texts.next_generation()
+        
+        # Layout geändert (andere Stationen, neue Störung, ...)? Dann alles neu
+        layout_key = self._get_layout_key(stations_data)
+        if layout_key != self._layout_key or self.static_layer is None:
+            self._layout_key = layout_key
+            with span('static_layer', 'render'):
+                self.static_layer = self._build_static_layer(stations_data)
+            self.damage.invalidate()
+        
+        if self.damage.full_redraw:
+            self.screen.blit(self.static_layer, (0, 0))
+        
+        # Uhrzeit und WiFi-Status Icon (oben rechts)
+        now = datetime.fromtimestamp(current_time)
+        with span('status', 'render'):
+            self._draw_status(now)
+        
+        with span('rows', 'render'):
+            self._draw_rows(stations_data, now)
+        
+        with span('present', 'render'):
+            self.damage.present()
+        
+        if new_data:
+            with span('evict', 'render'):
+                self.text_cache.evict_unused()
+                self.scrolling_texts.evict_unused()
+        
+        self._log_frame_stats(current_time)
+    
+    def _draw_rows(self, stations_data: List[Dict], now: datetime):
+        """Zeichnet die Abfahrtszeilen aller sichtbaren Stationen (nur geänderte)"""
+        column_width, max_departures = self._get_columns(len(stations_data))
+        
+        # Abfahrten nur zwischen Header und Legende zeichnen
+        self.screen.set_clip(self.content_rect)
+        
+        for i, station in enumerate(stations_data[:VISIBLE_STATIONS]):
+            x = i * column_width + 10
+            row_width = column_width - 20
+            rows_top = self._get_rows_top(station)
+            walking_time = station.get('walkingTime', 0)
+            
+            # Abfahrten (abhängig von Anzahl der Stationen), Minuten werden
+            # in jedem Frame aus 'when' berechnet - abgefahrene fallen heraus
+            departures = self._upcoming_departures(station.get('departures', []), now, max_departures)
+            
+            for slot in range(max_departures):
+                y = rows_top + slot * ROW_HEIGHT
+                if slot < len(departures):
+                    dep, minutes = departures[slot]
+                    self._draw_departure_compact(
+                        dep, walking_time, x, y, row_width,
+                        f"station_{i}_dep_{dep.line}_{dep.direction[:10]}", minutes
+                    )
+                    continue
+                
+                # Leere Zeile (bzw. Hinweis, wenn es gar keine Abfahrten gibt)
+                is_empty_station = not departures and slot == 0
+                if self.damage.changed(('row', x, y), is_empty_station):
+                    row_rect = pygame.Rect(x, y, row_width, ROW_HEIGHT)
+                    self._restore_background(row_rect)
+                    if is_empty_station:
+                        no_data = self._render_text_cached('Keine Abfahrten', self.font_small, self.GRAY)
+                        self.screen.blit(no_data, (x + 10, y))
+                    self.damage.add(row_rect.clip(self.content_rect))
+        
+        self.screen.set_clip(None)
+    
+    def _get_layout_key(self, stations_data: List[Dict]) -> Tuple:
+        """Alles, was die statischen Teile des Bildschirms bestimmt"""
+        stations = tuple(self._get_panel_key(station) for station in stations_data[:VISIBLE_STATIONS])
+        return (self.screen.get_size(), len(stations_data) == 1, stations)
+    
+    def _get_panel_key(self, station: Dict) -> Tuple:
+        """Alles, was den Kopf einer Station bestimmt"""
+        disruptions = station.get('disruptions', [])
+        return (
+            station['name'],
+            station.get('walkingTime', 0),
+            disruptions[0].get('summary', 'Störung') if disruptions else None,
+        )
+    
+    def _get_columns(self, num_stations: int) -> Tuple[int, int]:
+        """
+        Dynamisches Layout: 1 Spalte (volle Breite) oder 2 Spalten
+        
+        Returns:
+            (Spaltenbreite, maximale Anzahl Abfahrten)
+        """
+        if num_stations == 1:
+            # Eine Station: volle Breite nutzen, mehr Platz für Abfahrten
+            return self.width, rows_per_station(num_stations)
+        # Mehrere Stationen: Zweispalten-Layout
+        return self.width // 2, rows_per_station(num_stations)
+    
+    def _get_rows_top(self, station: Dict) -> int:
+        """Y-Position der ersten Abfahrtszeile einer Station"""
+        y_offset = 50
+        if station.get('disruptions'):
+            y_offset += 25  # Extra Platz für Warnung
+        return y_offset + 60 + 18  # Stationskopf + "Abfahrt in:"
+    
+    def _restore_background(self, rect: pygame.Rect):
+        """Stellt den statischen Hintergrund in einem Bereich wieder her"""
+        self.screen.blit(self.static_layer, rect, rect)
+    
+    def _build_static_layer(self, stations_data: List[Dict]) -> pygame.Surface:
+        """
+        Rendert Header, Stationsköpfe und Legende in eine Surface
+        
+        Die Surface hat das Pixelformat des Displays (convert()), damit das
+        Zurückkopieren pro Frame ohne Konvertierung auskommt. Stationsköpfe
+        werden pro Station zwischengespeichert und nur bei Änderung neu
+        gerendert.
+        
+        Args:
+            stations_data: Liste von Stations-Daten
+            
+        Returns:
+            Hintergrund in Bildschirmgröße
+        """
+        layer = pygame.Surface(self.screen.get_size()).convert()
+        layer.fill(self.BLACK)
+        
         # Header
         title = self._render_text_cached('BVG Abfahrten', self.font_small, self.LIGHT_GRAY)
-        self.screen.blit(title, (20, 10))
+        layer.blit(title, (20, 10))
         
         # Test-Modus Indikator (neben dem Titel)
         if self.test_mode:
             test_text = self._render_text_cached('testMode=ON', self.font_small, self.ORANGE)
             title_width = title.get_width()
-            self.screen.blit(test_text, (30 + title_width, 10))
+            layer.blit(test_text, (30 + title_width, 10))
         
-        # Uhrzeit und WiFi-Status Icon (oben rechts)
-        now_str = datetime.now().strftime('%H:%M:%S')
-        time_text = self.font_small.render(now_str, True, self.LIGHT_GRAY)
-        time_width = time_text.get_width()
+        # Trennlinie unter Header
+        pygame.draw.line(layer, self.DARK_GRAY, (0, 40), (self.width, 40), 2)
+        
+        num_stations = len(stations_data)
+        column_width, _ = self._get_columns(num_stations)
+        
+        # Stationsköpfe (unveränderte aus dem Cache übernehmen)
+        panels = {}
+        for i, station in enumerate(stations_data[:VISIBLE_STATIONS]):
+            key = (self._get_panel_key(station), column_width)
+            panel = self._panel_cache.get(key) or self._build_station_panel(station, column_width)
+            panels[key] = panel
+            layer.blit(panel, (i * column_width, self.content_rect.top))
+        self._panel_cache = panels
+        
+        # Vertikale Trennlinie zwischen Spalten (nur bei 2 Stationen)
+        if num_stations > 1:
+            pygame.draw.line(layer, self.DARK_GRAY, 
+                           (column_width, 40), (column_width, self.height), 2)
+        
+        # Farblegende am unteren Rand
+        self._draw_legend(layer)
+        
+        return layer
+    
+    def _build_station_panel(self, station: Dict, column_width: int) -> pygame.Surface:
+        """Rendert den Kopf einer Station (Name, Fußweg, Störung, "Abfahrt in:")"""
+        top = self.content_rect.top
+        panel = pygame.Surface((column_width, self._get_rows_top(station) - top)).convert()
+        panel.fill(self.BLACK)
+        
+        # Station Header (kompakter)
+        station_name = station['name']
+        walking_time = station.get('walkingTime', 0)
+        disruptions = station.get('disruptions', [])
+        y_offset = 50 - top
+        
+        # Stationsname (länger - bis 40 Zeichen)
+        station_short = station_name[:40] + '...' if len(station_name) > 40 else station_name
+        header_text = self.font_medium.render(station_short, True, self.WHITE)
+        panel.blit(header_text, (15, y_offset))
+        
+        # Fußweg-Info (klein und grau)
+        walk_text = self.font_tiny.render(f'🚶 {walking_time} min', True, self.GRAY)
+        panel.blit(walk_text, (15, y_offset + 28))
+        
+        # Warnsymbol bei Störungen (unter dem Namen)
+        if disruptions:
+            self._draw_warning_icon(panel, 15, y_offset + 45, disruptions[0])
+        
+        # "Abfahrt in:" Label (rechtsbündig über den Zeitangaben, etwas nach links verschoben)
+        abfahrt_label = self._render_text_cached('Abfahrt in:', self.font_tiny, self.GRAY)
+        label_x = column_width - 80  # Mehr nach links (vorher -65)
+        panel.blit(abfahrt_label, (label_x, panel.get_height() - 18))
+        
+        return panel
+    
+    def _draw_status(self, now: datetime):
+        """Zeichnet Uhrzeit, Alter der Daten und WiFi-Icon (nur bei Änderung)"""
+        now_str = now.strftime('%H:%M:%S')
         
-        # Aktualisierung vor X Sekunden (in 5s-Schritten, darunter)
-        seconds_ago = int(time.time() - self.last_update_time)
+        # Aktualisierung vor X Sekunden (in 5s-Schritten)
+        seconds_ago = int(now.timestamp() - self.last_update_time)
         seconds_rounded = (seconds_ago // 5) * 5  # Runde auf 5er-Schritte
-        update_text = self.font_tiny.render(f'vor {seconds_rounded}s', True, self.GRAY)
-        update_width = update_text.get_width()
         
-        # Zeit oben rechts
-        self.screen.blit(time_text, (self.width - time_width - 10, 10))
-        # Aktualisierung darunter (rechtsbündig, etwas höher damit nichts abgeschnitten wird)
-        self.screen.blit(update_text, (self.width - update_width - 10, 26))  # Von 28 auf 26
+        # Nächste volle Sekunde (Uhr und "vor Ns")
+        current_time = now.timestamp()
+        self._schedule(math.floor(current_time) + 1)
         
-        # WiFi-Icon Animation (links neben der Zeit)
+        # WiFi-Icon Animation
+        icon = None
+        icon_index = None
         if self.wifi_frames:
             if self.is_live:
                 # Animation abspielen
-                self.wifi_animation_counter += 1
-                if self.wifi_animation_counter >= self.wifi_animation_speed:
-                    self.wifi_animation_counter = 0
-                    self.wifi_frame_index = (self.wifi_frame_index + 1) % len(self.wifi_frames)
-                icon = self.wifi_frames[self.wifi_frame_index]
+                if len(self.wifi_frames) > 1:
+                    if current_time >= self.wifi_next_frame:
+                        self.wifi_frame_index = (self.wifi_frame_index + 1) % len(self.wifi_frames)
+                        self.wifi_next_frame = current_time + self.wifi_frame_duration
+                    self._schedule(self.wifi_next_frame)
+                icon_index = self.wifi_frame_index
+                icon = self.wifi_frames[icon_index]
             else:
                 # Offline: statisches graues Icon
                 icon = self.wifi_icon_offline
-            
-            icon_x = self.width - time_width - 35  # Links neben der Zeit
-            if icon:
-                self.screen.blit(icon, (icon_x, 10))
         
-        # Trennlinie unter Header
-        pygame.draw.line(self.screen, self.DARK_GRAY, (0, 40), (self.width, 40), 2)
+        if not self.damage.changed('status', (now_str, seconds_rounded, self.is_live, icon_index)):
+            return
         
-        # Dynamisches Layout: 1 Spalte (volle Breite) oder 2 Spalten
-        num_stations = len(stations_data)
-        if num_stations == 1:
-            # Eine Station: volle Breite nutzen
-            column_width = self.width
-            max_departures = 8  # Mehr Platz für Abfahrten
-        else:
-            # Mehrere Stationen: Zweispalten-Layout
-            column_width = self.width // 2
-            max_departures = 5
-        
-        for i, station in enumerate(stations_data[:2]):  # Max 2 Stationen
-            # Spaltenposition
-            x_offset = i * column_width
-            y_offset = 50
-            
-            # Vertikale Trennlinie zwischen Spalten (nur bei 2 Stationen)
-            if i == 1 and num_stations > 1:
-                pygame.draw.line(self.screen, self.DARK_GRAY, 
-                               (column_width, 40), (column_width, self.height), 2)
-            
-            # Station Header (kompakter)
-            station_name = station['name']
-            walking_time = station.get('walkingTime', 0)
-            disruptions = station.get('disruptions', [])
-            
-            # Stationsname (länger - bis 40 Zeichen)
-            station_short = station_name[:40] + '...' if len(station_name) > 40 else station_name
-            header_text = self.font_medium.render(station_short, True, self.WHITE)
-            self.screen.blit(header_text, (x_offset + 15, y_offset))
-            
-            # Fußweg-Info (klein und grau)
-            walk_text = self.font_tiny.render(f'🚶 {walking_time} min', True, self.GRAY)
-            self.screen.blit(walk_text, (x_offset + 15, y_offset + 28))
-            
-            # Warnsymbol bei Störungen (unter dem Namen)
-            if disruptions:
-                self._draw_warning_icon(self.screen, x_offset + 15, y_offset + 45, disruptions[0])
-                y_offset += 25  # Extra Platz für Warnung
-            
-            y_offset += 60
-            
-            # "Abfahrt in:" Label (rechtsbündig über den Zeitangaben, etwas nach links verschoben)
-            abfahrt_label = self._render_text_cached('Abfahrt in:', self.font_tiny, self.GRAY)
-            label_x = x_offset + column_width - 80  # Mehr nach links (vorher -65)
-            self.screen.blit(abfahrt_label, (label_x, y_offset))
-            y_offset += 18
-            
-            # Abfahrten (abhängig von Anzahl der Stationen)
-            departures = station.get('departures', [])[:max_departures]
-            
-            if not departures:
-                no_data = self._render_text_cached('Keine Abfahrten', self.font_small, self.GRAY)
-                self.screen.blit(no_data, (x_offset + 20, y_offset))
-            else:
-                for dep in departures:
-                    y_offset = self._draw_departure_compact(
-                        dep, walking_time, x_offset + 10, y_offset, 
-                        column_width - 20, f"station_{i}_dep_{dep['line']}_{dep['direction'][:10]}"
-                    )
+        # Bereich oben rechts leeren (oberhalb der Trennlinie)
+        status_rect = pygame.Rect(self.width - STATUS_WIDTH, 0, STATUS_WIDTH, HEADER_HEIGHT - 2)
+        self._restore_background(status_rect)
+        self.screen.set_clip(status_rect)
         
-        # Farblegende am unteren Rand
-        self._draw_legend()
+        # Aus vorgerenderten Ziffern zusammensetzen (siehe SpriteAtlas)
+        update_str = f'vor {seconds_rounded}s'
+        time_width = self.atlas.clock.width(now_str)
+        update_width = self.atlas.age.width(update_str)
+        
+        # Zeit oben rechts
+        self.atlas.clock.blit(self.screen, now_str, (self.width - time_width - 10, 10))
+        # Aktualisierung darunter (rechtsbündig, etwas höher damit nichts abgeschnitten wird)
+        self.atlas.age.blit(self.screen, update_str, (self.width - update_width - 10, 26))  # Von 28 auf 26
+        
+        # WiFi-Icon links neben der Zeit
+        if icon:
+            self.screen.blit(icon, (self.width - time_width - 35, 10))
         
-        pygame.display.flip()
+        self.screen.set_clip(None)
+        self.damage.add(status_rect)
     
-    def _draw_departure_compact(self, departure: Dict, walking_time: int, 
-                               x: int, y: int, max_width: int, scroll_id: str) -> int:
+    def _log_frame_stats(self, current_time: float):
+        """Schreibt regelmäßig die ausgegebene Fläche pro Frame ins Log"""
+        if current_time - self._last_stats_log < STATS_LOG_INTERVAL:
+            return
+        self._last_stats_log = current_time
+        
+        stats = self.damage.stats()
+        logger.info(
+            f"Rendering: Ø {stats['avg_damaged_pixels']:.0f} Pixel/Frame "
+            f"({stats['avg_damaged_ratio']:.1%} des Bildschirms), "
+            f"{stats['full_frames']}/{stats['frames']} Frames komplett"
+        )
+        
+        for name, cache_stats in self.cache_stats().items():
+            logger.info(
+                f"Cache {name}: {cache_stats['entries']} Einträge, "
+                f"{cache_stats['bytes'] / 1024:.0f}/{cache_stats['max_bytes'] / 1024:.0f} KiB, "
+                f"{cache_stats['hits']} Treffer, {cache_stats['misses']} Fehlschläge, "
+                f"{cache_stats['evictions']} verdrängt"
+            )
+    
+    def cache_stats(self) -> Dict[str, Dict[str, int]]:
+        """Statistik der Surface-Caches (Treffer, Verdrängungen, Bytes)"""
+        return {
+            cache.name: cache.stats()
+            for cache in (self.text_cache, self.scrolling_texts)
+        }
+    
+    def _upcoming_departures(self, departures: List[Departure], now: datetime,
+                             limit: int) -> List[Tuple[Departure, int]]:
+        """
+        Berechnet die aktuellen Minuten bis Abfahrt
+        
+        Args:
+            departures: Abfahrten (sortiert nach 'when')
+            now: Aktuelle Uhrzeit des Frames
+            limit: Maximale Anzahl
+            
+        Returns:
+            Liste von (Abfahrt, Minuten) ohne bereits abgefahrene Züge
+        """
+        upcoming = []
+        for dep in departures:
+            minutes = minutes_until(dep.when, now)
+            if minutes < 0:
+                continue
+            upcoming.append((dep, minutes))
+            if len(upcoming) >= limit:
+                break
+        return upcoming
+    
+    def _draw_departure_compact(self, departure: Departure, walking_time: int, 
+                               x: int, y: int, max_width: int, scroll_id: str,
+                               minutes: int) -> int:
         """
         Zeichnet eine einzelne Abfahrt (kompakt, zweispaltig)
         
+        Die Zeile wird nur neu gezeichnet, wenn sich Abfahrt, Minuten oder
+        Blink-Zustand geändert haben; scrollt nur die Richtung, wird auch
+        nur diese ausgegeben.
+        
         Args:
             departure: Abfahrtsdaten
             walking_time: Fußweg in Minuten
             x, y: Position
             max_width: Maximale Breite
             scroll_id: ID für Scrolling-Text Cache
+            minutes: Minuten bis Abfahrt (aktuell berechnet)
             
         Returns:
             Neue Y-Position
         """
-        line = departure['line']
-        direction = departure['direction']
-        minutes = departure['minutes']
-        delay = departure.get('delay', 0)
-        product = departure.get('product', 'bus')
+        line = departure.line
+        direction = departure.direction
+        delay = departure.delay
+        product = departure.product
         has_delay = delay > 0
         
         # Farbcodierung nach Fußweg (Fußweg = garantierte Schaffbarkeit)
@@ -496,18 +897,8 @@ class DisplayManager:
         # Gelb = Genau Fußweg (auf den Punkt)
         # Rot = Weniger als Fußweg (zu knapp/zu spät)
         is_jetzt = False
-        if minutes < walking_time:
-            # Weniger als Fußweg - zu knapp!
-            time_color = self.RED
-            time_str = f"{minutes}'"
-        elif minutes == walking_time:
-            # Genau Fußweg - auf den Punkt!
-            time_color = self.YELLOW
-            time_str = f"{minutes}'"
-        else:
-            # Mehr als Fußweg - locker schaffbar!
-            time_color = self.GREEN
-            time_str = f"{minutes}'"
+        time_color = self.STATE_COLORS[walking_state(minutes, walking_time)]
+        time_str = f"{minutes}'"
         
         # Spezialfall: "jetzt" für 0 Minuten
         if minutes == 0:
@@ -515,45 +906,107 @@ class DisplayManager:
             time_str = "jetzt"
             is_jetzt = True
         
-        # Produkt-Badge (links) - blinkt bei "jetzt"
         badge_size = 45
-        if not is_jetzt or self.blink_state:
-            self._draw_product_badge(self.screen, x, y, product, line, badge_size)
-        
-        # Richtung (scrollend wenn nötig) - blinkt bei "jetzt"
         direction_x = x + badge_size + 10
         direction_max_width = max_width - badge_size - 105  # Weniger Platz für bessere Trennung (vorher 80)
         
         # Scrolling-Text verwalten
         scroll_key = f"{scroll_id}_{direction}"
-        if scroll_key not in self.scrolling_texts or self.scrolling_texts[scroll_key].text != direction:
-            self.scrolling_texts[scroll_key] = ScrollingText(
-                direction, self.font_small, direction_max_width, self.LIGHT_GRAY
+        scrolling_text = self.scrolling_texts.get(scroll_key)
+        if scrolling_text is None or scrolling_text.text != direction:
+            scrolling_text = ScrollingText(
+                direction, self.font_small, direction_max_width, self.LIGHT_GRAY, self._last_frame
             )
-        
-        scrolling_text = self.scrolling_texts[scroll_key]
+            self.scrolling_texts.put(scroll_key, scrolling_text)
         # Farbe immer aktualisieren: bei "jetzt" blinken, sonst normal
         if is_jetzt:
             scrolling_text.color = self.LIGHT_GRAY if self.blink_state else self.DARK_GRAY
         else:
             scrolling_text.color = self.LIGHT_GRAY
-        scrolling_text.update()
-        scrolling_text.draw(self.screen, direction_x, y + 5)
+        scrolling_text.update(self._last_frame)
+        self._schedule(scrolling_text.next_change(self._last_frame))
+        if is_jetzt:
+            self._schedule(self.last_blink + BLINK_INTERVAL)
         
-        # Zeit (rechts, groß und fett)
-        time_text = self.font_large.render(time_str, True, time_color)
-        time_width = time_text.get_width()
-        self.screen.blit(time_text, (x + max_width - time_width - 5, y + 5))  # Weniger Abstand rechts
+        row_rect = pygame.Rect(x, y, max_width, ROW_HEIGHT).clip(self.content_rect)
+        row_key = (departure, time_str, time_color, is_jetzt and self.blink_state)
+        scroll_state = (scrolling_text.offset, scrolling_text.color)
         
-        # Verspätung/Verfrühung (klein daneben, falls vorhanden)
-        if has_delay:
-            delay_sign = '+' if delay > 0 else ''  # + bei Verspätung, - ist automatisch bei negativem delay
-            delay_color = self.RED if delay > 0 else self.GREEN  # Rot bei Verspätung, Grün bei Verfrühung
-            delay_text = self.font_small.render(f'({delay_sign}{delay})', True, delay_color)
-            self.screen.blit(delay_text, (x + max_width - time_width - 5, y + 43))
+        if self.damage.changed(('row', x, y), row_key):
+            self.damage.changed(('scroll', x, y), scroll_state)
+            self._restore_background(row_rect)
+            self.screen.set_clip(row_rect)
+            
+            # Produkt-Badge (links) - blinkt bei "jetzt"
+            if not is_jetzt or self.blink_state:
+                self._draw_product_badge(self.screen, x, y, product, line, badge_size)
+            
+            # Richtung (scrollend wenn nötig) - blinkt bei "jetzt"
+            scrolling_text.draw(self.screen, direction_x, y + 5)
+            
+            # Zeit (rechts, groß und fett)
+            time_text = self.atlas.countdown(time_str, time_color)
+            time_width = time_text.get_width()
+            self.screen.blit(time_text, (x + max_width - time_width - 5, y + 5))  # Weniger Abstand rechts
+            
+            # Verspätung/Verfrühung (klein daneben, falls vorhanden)
+            if has_delay:
+                delay_sign = '+' if delay > 0 else ''  # + bei Verspätung, - ist automatisch bei negativem delay
+                delay_color = self.RED if delay > 0 else self.GREEN  # Rot bei Verspätung, Grün bei Verfrühung
+                delay_text = self.atlas.delay(f'({delay_sign}{delay})', delay_color)
+                # Innerhalb der Zeile bleiben, sonst löscht die nächste Zeile den unteren Rand
+                delay_y = min(y + 43, y + ROW_HEIGHT - delay_text.get_height())
+                self.screen.blit(delay_text, (x + max_width - time_width - 5, delay_y))
+            
+            self.screen.set_clip(self.content_rect)
+            self.damage.add(row_rect)
+        
+        elif self.damage.changed(('scroll', x, y), scroll_state):
+            # Nur die Richtung hat sich bewegt
+            direction_rect = pygame.Rect(
+                direction_x, y + 5, direction_max_width, scrolling_text.surface.get_height()
+            ).clip(row_rect)
+            self._restore_background(direction_rect)
+            scrolling_text.draw(self.screen, direction_x, y + 5)
+            self.damage.add(direction_rect)
         
         return y + 60
     
+    def _schedule(self, when: float):
+        """Merkt einen Zeitpunkt vor, an dem sich etwas Sichtbares ändert"""
+        if when < self.next_change:
+            self.next_change = when
+    
+    def notify_new_data(self):
+        """
+        Weckt die Render-Schleife (z.B. bei neuem Snapshot)
+        
+        Darf aus anderen Threads aufgerufen werden.
+        """
+        if pygame.display.get_init():
+            pygame.event.post(pygame.event.Event(NEW_DATA_EVENT))
+    
+    def wait_for_next_frame(self):
+        """
+        Schläft bis zur nächsten sichtbaren Änderung
+        
+        Statt fester FPS wird bis zum nächsten Sekundenwechsel, Blinken,
+        Scroll-Schritt oder WiFi-Frame gewartet (mindestens IDLE_FPS,
+        höchstens MAX_FPS). Eingaben und neue Daten wecken sofort.
+        """
+        now = self.clock()
+        wake_at = max(self.next_change, self._last_frame + 1.0 / MAX_FPS)
+        wake_at = min(wake_at, now + 1.0 / IDLE_FPS)
+        
+        # Ohne neuen Frame gilt die alte Planung nicht mehr
+        self.next_change = now + 1.0 / IDLE_FPS
+        
+        timeout_ms = math.ceil((wake_at - now) * 1000)
+        if timeout_ms > 0:
+            event = pygame.event.wait(timeout_ms)
+            if event.type != pygame.NOEVENT:
+                self._pending_events.append(event)
+    
     def handle_events(self) -> bool:
         """
         Verarbeitet Events
@@ -561,18 +1014,21 @@ class DisplayManager:
         Returns:
             True wenn fortfahren, False zum Beenden
         """
-        for event in pygame.event.get():
+        events = self._pending_events + pygame.event.get()
+        self._pending_events = []
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
+            if event.type in (pygame.VIDEOEXPOSE, getattr(pygame, 'WINDOWEXPOSED', pygame.VIDEOEXPOSE)):
+                # Fensterinhalt verloren (z.B. verdeckt) - alles neu ausgeben
+                self.damage.invalidate()
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE or event.key == pygame.K_q:
                     return False
         return True
     
-    def tick(self, fps: int = 5):
-        """Limitiert FPS (erhöht für flüssiges Scrolling)"""
-        self.clock.tick(fps)
-    
     def quit(self):
         """Beendet pygame"""
+        if self.framebuffer:
+            self.framebuffer.close()
         pygame.quit()
@@ -0,0 +1,631 @@
+#!/usr/bin/env python3
+"""
+Gemeinsamer Abruf-Dienst für mehrere Anzeigen
+
+Laufen Monitor (main.py) und TUI (textual_bvg.py) auf demselben Rechner,
+fragt sonst jede Anzeige die API selbst ab. Der Dienst besitzt einen
+einzigen BVGClient, fragt jede Station nur einmal ab und verteilt die
+Snapshots über einen Unix-Socket an alle angemeldeten Anzeigen:
+    
+    python fetch_daemon.py [config.json] [--socket PFAD]
+
+In der Konfiguration der Anzeigen: "fetchDaemon": true (Standard-Socket)
+oder ein eigener Pfad.
+
+Protokoll: Rahmen aus Typ (1 Byte), Länge (uint32) und Inhalt. Die
+Anzeige schickt einmal ein Hallo (JSON mit ihren Stationen, Linien-Filter
+und Zeilenzahl), danach sendet der Dienst nur noch Snapshots (Live-Flag
+und Binärformat aus snapshot_store.py). Ändern sich die Stationen einer
+Anzeige, meldet sie sich neu an. Abgefragt wird die Vereinigung aller
+Wünsche; jede Anzeige filtert danach selbst auf ihre Linien.
+"""
+import argparse
+import json
+import os
+import select
+import signal
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from bvg_api import BVGClient, DepartureFilter, DEFAULT_DURATION
+from fetcher import FetchWorker, RefreshScheduler, Snapshot, DEFAULT_MAX_INTERVAL, STOP_TIMEOUT
+from http_cache import open_cache, DEFAULT_CACHE_PATH
+from log_setup import setup_logging, shutdown_logging
+from rate_limit import RequestGovernor, DEFAULT_REQUESTS_PER_MINUTE
+from snapshot_store import SnapshotStore, SNAPSHOT_DIR, encode_snapshot, decode_snapshot
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_SOCKET_PATH = os.path.join(SNAPSHOT_DIR, 'fetchd.sock')
+DEFAULT_REFRESH_INTERVAL = 15  # Sekunden
+MAX_FETCH_WORKERS = 8  # Parallele API-Anfragen beim Aktualisieren
+FRAME = struct.Struct('<cI')  # Typ, Länge
+FRAME_HELLO = b'H'  # Anzeige -> Dienst: Stationen (JSON)
+FRAME_SNAPSHOT = b'S'  # Dienst -> Anzeige: Live-Flag + Snapshot
+MAX_FRAME_BYTES = 16 * 1024 * 1024
+SEND_TIMEOUT = 5.0  # Sekunden, danach gilt eine Anzeige als hängend
+RECONNECT_INTERVAL = 5.0  # Sekunden zwischen Verbindungsversuchen der Anzeige
+PEER_CHECK_INTERVAL = 1.0  # Sekunden, nach denen geprüft wird, ob die Anzeige noch da ist
+QUERY_KEYS = ('products', 'lines', 'directions', 'results', 'duration')  # Bestimmen die API-Anfrage
+
+
+def resolve_socket_path(value: Union[bool, str]) -> str:
+    """Pfad aus dem Config-Wert "fetchDaemon" (true = DEFAULT_SOCKET_PATH)"""
+    if value is True:
+        return DEFAULT_SOCKET_PATH
+    return os.path.expanduser(value)
+
+
+def send_frame(sock: socket.socket, kind: bytes, payload: bytes):
+    """Sendet einen Rahmen (blockierend)"""
+    sock.sendall(FRAME.pack(kind, len(payload)) + payload)
+
+
+def recv_frame(sock: socket.socket) -> Optional[Tuple[bytes, bytes]]:
+    """
+    Empfängt einen Rahmen
+    
+    Returns:
+        (Typ, Inhalt) oder None, wenn die Gegenseite die Verbindung beendet hat
+    
+    Raises:
+        ValueError: Bei zu großen Rahmen
+    """
+    header = _recv_exactly(sock, FRAME.size)
+    if header is None:
+        return None
+    kind, length = FRAME.unpack(header)
+    if length > MAX_FRAME_BYTES:
+        raise ValueError(f"Rahmen zu groß ({length} Bytes)")
+    payload = _recv_exactly(sock, length)
+    if payload is None:
+        return None
+    return kind, payload
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> Optional[bytes]:
+    buffer = bytearray()
+    while len(buffer) < size:
+        chunk = sock.recv(size - len(buffer))
+        if not chunk:
+            return None
+        buffer += chunk
+    return bytes(buffer)
+
+
+def encode_update(snapshot: Snapshot) -> bytes:
+    """Snapshot als Rahmen-Inhalt (Live-Flag + encode_snapshot)"""
+    return bytes([snapshot.is_live]) + encode_snapshot(list(snapshot.stations), snapshot.updated_at)
+
+
+def decode_update(payload: bytes) -> Tuple[List[Dict], float, bool]:
+    """
+    Gegenstück zu encode_update
+    
+    Returns:
+        (Stations-Daten, updated_at, is_live)
+    """
+    stations, updated_at = decode_snapshot(payload[1:])
+    return stations, updated_at, bool(payload[0])
+
+
+def merge_station_configs(configs: List[Dict]) -> Dict:
+    """
+    Fasst die Wünsche mehrerer Anzeigen an eine Station zusammen
+    
+    Produkte, Linien und Richtungen werden vereinigt (schränkt eine Anzeige
+    nicht ein, entfällt der Filter), Anzahl und Zeitfenster maximiert.
+    """
+    merged = {'id': configs[0]['id'], 'name': configs[0].get('name', configs[0]['id'])}
+    merged['walkingTime'] = min(config.get('walkingTime', 0) for config in configs)
+    for key in ('products', 'lines', 'directions'):
+        values = [config.get(key) for config in configs]
+        if all(values):
+            merged[key] = sorted(set().union(*values))
+    results = [config.get('results') for config in configs]
+    if all(results):
+        merged['results'] = max(results)
+    merged['duration'] = max(config.get('duration', DEFAULT_DURATION) for config in configs)
+    return merged
+
+
+class _Subscription:
+    """Eine angemeldete Anzeige; hält nur den jeweils neuesten Snapshot vor"""
+    
+    def __init__(self, stations: List[Dict]):
+        self.stations = stations
+        self._frame: Optional[bytes] = None
+        self.closed = False
+        self._condition = threading.Condition()
+    
+    def push(self, frame: bytes):
+        """Ersetzt einen noch nicht gesendeten Snapshot (langsame Anzeigen verpassen Zwischenstände)"""
+        with self._condition:
+            self._frame = frame
+            self._condition.notify()
+    
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify()
+    
+    def next_frame(self, timeout: float) -> Optional[bytes]:
+        """Wartet bis zu timeout Sekunden auf den nächsten Snapshot"""
+        with self._condition:
+            if self._frame is None and not self.closed:
+                self._condition.wait(timeout)
+            frame, self._frame = self._frame, None
+            return frame
+
+
+class _SubscriberHandler(socketserver.BaseRequestHandler):
+    """Eine Verbindung: Hallo lesen, dann Snapshots senden"""
+    
+    def handle(self):
+        daemon: 'FetchDaemon' = self.server.fetch_daemon
+        try:
+            received = recv_frame(self.request)
+            if received is None or received[0] != FRAME_HELLO:
+                return
+            stations = _parse_hello(received[1])
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ungültige Anmeldung: {e}")
+            return
+        
+        subscription = _Subscription(stations)
+        daemon.subscribe(subscription)
+        self.request.settimeout(SEND_TIMEOUT)
+        try:
+            while not subscription.closed:
+                frame = subscription.next_frame(PEER_CHECK_INTERVAL)
+                if frame is not None:
+                    send_frame(self.request, FRAME_SNAPSHOT, frame)
+                elif _peer_closed(self.request):
+                    break
+        except OSError as e:
+            logger.info(f"Anzeige getrennt: {e}")
+        finally:
+            daemon.unsubscribe(subscription)
+
+
+def _peer_closed(sock: socket.socket) -> bool:
+    """True, wenn die Anzeige die Verbindung beendet hat (ohne zu blockieren)"""
+    readable, _, _ = select.select([sock], [], [], 0)
+    return bool(readable) and not sock.recv(1, socket.MSG_PEEK)
+
+
+def _parse_hello(payload: bytes) -> List[Dict]:
+    """
+    Stationen aus dem Hallo einer Anzeige
+    
+    Ohne eigene 'lines' gilt displayLines der Anzeige, ohne eigenes
+    'results' ihre Zeilenzahl.
+    
+    Raises:
+        ValueError: Bei ungültigem Inhalt
+    """
+    hello = json.loads(payload)
+    stations = hello.get('stations')
+    if not isinstance(stations, list) or not all(isinstance(s, dict) and 'id' in s for s in stations):
+        raise ValueError("'stations' fehlt oder ist ungültig")
+    display_lines = hello.get('displayLines') or []
+    rows = hello.get('rows')
+    normalized = []
+    for station in stations:
+        station = dict(station)
+        if display_lines:
+            station.setdefault('lines', display_lines)
+        if rows:
+            station.setdefault('results', rows)
+        normalized.append(station)
+    return normalized
+
+
+def _query(station: Dict) -> Dict:
+    """Die Angaben einer Station, die die API-Anfrage bestimmen"""
+    return {key: station[key] for key in QUERY_KEYS if key in station}
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FetchDaemon:
+    """
+    Fragt die Stationen aller angemeldeten Anzeigen ab und verteilt Snapshots
+    
+    Ändert sich die Menge der gewünschten Stationen, wird der FetchWorker
+    neu aufgebaut; vorhandene Daten und geplante Abfragezeitpunkte werden
+    übernommen, damit eine neue Anzeige keine zusätzlichen Anfragen auslöst.
+    """
+    
+    def __init__(self, config: Dict, socket_path: str = DEFAULT_SOCKET_PATH):
+        """
+        Args:
+            config: Konfiguration (wie config.json; 'stations' wird ignoriert,
+                abgefragt wird, was die Anzeigen anfordern)
+            socket_path: Pfad des Unix-Sockets
+        """
+        self.config = config
+        self.socket_path = socket_path
+        
+        cache = None
+        if config.get('httpCache', True):
+            cache = open_cache(config.get('httpCachePath', DEFAULT_CACHE_PATH))
+        self.client = BVGClient(
+            RequestGovernor(
+                requests_per_minute=config.get('requestsPerMinute', DEFAULT_REQUESTS_PER_MINUTE)
+            ),
+            cache,
+            base_url=config.get('apiBaseUrl')
+        )
+        self.executor = ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS, thread_name_prefix='bvg-fetch')
+        self.snapshot_store = SnapshotStore(
+            os.path.join(SNAPSHOT_DIR, 'snapshot_daemon.bin'),
+            config.get('snapshotInterval', 60)
+        )
+        
+        self.worker: Optional[FetchWorker] = None
+        self.stations: List[Dict] = []
+        self._subscriptions: List[_Subscription] = []
+        self._lock = threading.RLock()  # _rebuild veröffentlicht, on_change sperrt erneut
+        self._stopping = False
+        self._server: Optional[_UnixServer] = None
+        
+        # Daten und Fälligkeiten über Neuaufbauten hinweg (nach Stations-ID)
+        self._carry: Dict[str, Dict] = {}
+        self._carry_updated_at = 0.0
+        self._carry_live = False  # False = Stand aus der Datei (offline)
+        self._due: Dict[str, float] = {}
+        restored = self.snapshot_store.load()
+        if restored:
+            stations, self._carry_updated_at = restored
+            self._carry = {station['id']: station for station in stations}
+    
+    def start(self):
+        """
+        Öffnet den Socket und nimmt Anmeldungen an (eigener Thread)
+        
+        Raises:
+            OSError: Wenn der Socket nicht angelegt werden kann oder bereits
+                ein Dienst läuft
+        """
+        os.makedirs(os.path.dirname(self.socket_path) or '.', exist_ok=True)
+        if os.path.exists(self.socket_path):
+            # Übrig gebliebener Socket oder laufender Dienst?
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                os.unlink(self.socket_path)
+            else:
+                raise OSError(f"Abruf-Dienst läuft bereits ({self.socket_path})")
+            finally:
+                probe.close()
+        
+        self._server = _UnixServer(self.socket_path, _SubscriberHandler)
+        self._server.fetch_daemon = self
+        os.chmod(self.socket_path, 0o600)  # Nur der eigene Benutzer
+        threading.Thread(target=self._server.serve_forever, name='fetchd-server', daemon=True).start()
+        logger.info(f"Abruf-Dienst bereit: {self.socket_path}")
+    
+    def stop(self):
+        """Beendet Dienst, Anzeigen-Verbindungen und Abruf"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            try:
+                os.unlink(self.socket_path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self._stopping = True
+            for subscription in self._subscriptions:
+                subscription.close()
+            worker = self.worker
+        # Außerhalb des Locks warten - on_change des Workers sperrt ihn ebenfalls
+        if worker is not None:
+            worker.stop(STOP_TIMEOUT)
+            self._save_snapshot(worker.latest(), force=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+    
+    def subscribe(self, subscription: _Subscription):
+        """Meldet eine Anzeige an und schickt ihr sofort den aktuellen Stand"""
+        with self._lock:
+            self._subscriptions.append(subscription)
+            rebuilt = self._rebuild()
+            worker = self.worker
+        logger.info(f"Anzeige angemeldet ({len(subscription.stations)} Stationen, "
+                    f"{len(self._subscriptions)} Anzeigen)")
+        if not rebuilt and worker is not None and worker.latest().version:
+            subscription.push(encode_update(worker.latest()))
+    
+    def unsubscribe(self, subscription: _Subscription):
+        """Meldet eine Anzeige ab; nicht mehr gewünschte Stationen entfallen"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+                self._rebuild()
+        logger.info(f"Anzeige abgemeldet ({len(self._subscriptions)} Anzeigen)")
+    
+    def _wanted_stations(self) -> List[Dict]:
+        """Vereinigung der Stationen aller Anzeigen (Reihenfolge der Anmeldung)"""
+        by_id: Dict[str, List[Dict]] = {}
+        for subscription in self._subscriptions:
+            for station in subscription.stations:
+                by_id.setdefault(station['id'], []).append(station)
+        return [merge_station_configs(configs) for configs in by_id.values()]
+    
+    def _rebuild(self) -> bool:
+        """
+        Baut den FetchWorker für geänderte Stationen neu auf (mit self._lock)
+        
+        Returns:
+            True wenn neu aufgebaut wurde
+        """
+        stations = self._wanted_stations()
+        if self._stopping or stations == self.stations:
+            return False
+        
+        # Stand des bisherigen Workers merken
+        if self.worker is not None:
+            self.worker.stop()
+            snapshot = self.worker.latest()
+            self._carry.update({station['id']: station for station in snapshot.stations})
+            self._carry_updated_at = max(self._carry_updated_at, snapshot.updated_at)
+            self._carry_live = snapshot.is_live
+            now = time.time()
+            for index, due in self.worker.scheduler.due_times().items():
+                self._due[self.stations[index]['id']] = due
+            self._due = {station_id: due for station_id, due in self._due.items() if due > now}
+        self.stations = stations
+        self.worker = None
+        if not stations:
+            logger.info("Keine Anzeige angemeldet, Abruf pausiert")
+            return True
+        
+        refresh_interval = self.config.get('refreshInterval', DEFAULT_REFRESH_INTERVAL)
+        scheduler = RefreshScheduler(
+            [station.get('walkingTime', 0) for station in stations],
+            refresh_interval,
+            adaptive=self.config.get('adaptiveRefresh', True),
+            min_interval=self.config.get('minRefreshInterval', refresh_interval),
+            max_interval=self.config.get('maxRefreshInterval', DEFAULT_MAX_INTERVAL)
+        )
+        filters = [DepartureFilter.from_config(station, {}) for station in stations]
+        worker = FetchWorker(
+            lambda indices: self._fetch(stations, filters, indices),
+            scheduler, len(stations),
+            on_publish=self._save_snapshot, on_change=self._broadcast
+        )
+        
+        # Vorhandene Daten übernehmen; nur Stationen mit geänderten Filtern
+        # oder ohne Daten werden sofort abgefragt
+        carried = {}
+        for index, station in enumerate(stations):
+            data = self._carry.get(station['id'])
+            if data is None:
+                continue
+            carried[index] = dict(data, name=station['name'], walkingTime=station['walkingTime'])
+            if station['id'] in self._due and data.get('filter') == _query(station):
+                scheduler.schedule_at(index, self._due[station['id']])
+        self.worker = worker
+        if carried and self._carry_live:
+            worker.publish(carried, self._carry_updated_at)
+        elif carried:
+            worker.restore(carried, self._carry_updated_at)
+        worker.start()
+        logger.info(f"Frage {len(stations)} Stationen für {len(self._subscriptions)} Anzeigen ab")
+        return True
+    
+    def _fetch(self, stations: List[Dict], filters: List[DepartureFilter],
+               indices: List[int]) -> Dict[int, Optional[Dict]]:
+        """Holt die fälligen Stationen parallel (fetch_fn des FetchWorker)"""
+        pending = {
+            i: self.executor.submit(self.client.get_station_board, stations[i]['id'],
+                                    departure_filter=filters[i])
+            for i in indices
+        }
+        results = {}
+        for i, future in pending.items():
+            station = stations[i]
+            try:
+                board = future.result()
+            except Exception as e:
+                logger.error(f"Fehler beim Abrufen von {station['name']}: {e}")
+                results[i] = None
+                continue
+            results[i] = {
+                'id': station['id'],
+                'name': station['name'],
+                'walkingTime': station['walkingTime'],
+                'departures': board['departures'],
+                'disruptions': board['disruptions'],
+                'stale': board.get('stale', False),
+                'filter': _query(station),  # Womit abgefragt wurde (für den Neuaufbau)
+            }
+        return results
+    
+    def _broadcast(self):
+        """Verteilt den neuesten Snapshot an alle Anzeigen (on_change)"""
+        with self._lock:
+            worker = self.worker
+            subscriptions = list(self._subscriptions)
+        if worker is None or not subscriptions:
+            return
+        frame = encode_update(worker.latest())
+        for subscription in subscriptions:
+            subscription.push(frame)
+    
+    def _save_snapshot(self, snapshot: Snapshot, force: bool = False):
+        """Warmstart-Stand des Dienstes (gedrosselt)"""
+        if snapshot.is_live:
+            self.snapshot_store.save(list(snapshot.stations), snapshot.updated_at, force=force)
+
+
+class DaemonSubscriber(FetchWorker):
+    """
+    Bezieht die Daten vom Abruf-Dienst statt selbst abzufragen
+    
+    Verhält sich für die Anzeige wie ein FetchWorker (latest(), restore(),
+    stop()); ist der Dienst nicht erreichbar, wird alle RECONNECT_INTERVAL
+    Sekunden ein neuer Versuch gemacht.
+    """
+    
+    def __init__(self, socket_path: str, stations: List[Dict], config: Dict,
+                 rows: Optional[int] = None,
+                 on_publish: Optional[Callable[[Snapshot], None]] = None,
+                 on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            socket_path: Socket des Dienstes
+            stations: Stations-Konfiguration der Anzeige
+            config: Konfiguration der Anzeige (displayLines)
+            rows: Angezeigte Abfahrten pro Station (None = Standard-Anzahl)
+            on_publish: Wie bei FetchWorker (z.B. eigener Warmstart-Snapshot)
+            on_change: Wird nach jedem neuen Snapshot aufgerufen (im Hintergrund-Thread)
+        """
+        super().__init__(None, None, len(stations), on_publish=on_publish, on_change=on_change)
+        self.name = 'bvg-subscriber'
+        self.socket_path = socket_path
+        self.config = config
+        self.rows = rows
+        self.stations: List[Dict] = []
+        self.filters: List[DepartureFilter] = []
+        self._socket: Optional[socket.socket] = None
+        self._reconnect = False  # Neu anmelden ohne Wartezeit
+        self._set_stations(stations)
+    
+    def set_stations(self, stations: List[Dict]):
+        """Übernimmt geänderte Stationen und meldet sich beim Dienst neu an"""
+        self._set_stations(stations)
+        self._reconnect = True
+        self._disconnect()
+    
+    def _set_stations(self, stations: List[Dict]):
+        stations = [dict(station) for station in stations]
+        filters = [DepartureFilter.from_config(station, self.config, self.rows) for station in stations]
+        with self._lock:
+            self.stations = stations
+            self.filters = filters
+            self._stations = [None] * len(stations)
+            self._fetched_at = [0.0] * len(stations)
+    
+    def run(self):
+        """Empfangs-Schleife (läuft bis stop() aufgerufen wird)"""
+        reachable = True  # Nur den ersten Fehlschlag in Folge melden
+        while not self._stop_event.is_set():
+            self._reconnect = False
+            try:
+                self._receive()
+                reachable = True
+                logger.warning("Verbindung zum Abruf-Dienst beendet")
+            except (OSError, ValueError) as e:
+                if reachable and not self._reconnect and not self._stop_event.is_set():
+                    logger.warning(f"Abruf-Dienst nicht erreichbar ({self.socket_path}): {e}")
+                    reachable = False
+            finally:
+                self._disconnect()
+            if not self._reconnect:
+                self._stop_event.wait(RECONNECT_INTERVAL)
+    
+    def _receive(self):
+        """Meldet die Stationen an und übernimmt Snapshots bis zum Verbindungsende"""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket = sock
+        sock.connect(self.socket_path)
+        send_frame(sock, FRAME_HELLO, json.dumps({
+            'stations': self.stations,
+            'displayLines': self.config.get('displayLines', []),
+            'rows': self.rows,
+        }).encode('utf-8'))
+        logger.info(f"Mit Abruf-Dienst verbunden: {self.socket_path}")
+        while True:
+            received = recv_frame(sock)
+            if received is None:
+                return
+            if received[0] == FRAME_SNAPSHOT:
+                self._apply(received[1])
+    
+    def stop(self, timeout: Optional[float] = None):
+        """Beendet die Verbindung und den Thread (siehe FetchWorker.stop)"""
+        super().stop()
+        self._disconnect()
+        self._join(timeout)
+    
+    def _disconnect(self):
+        sock, self._socket = self._socket, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+    
+    def _apply(self, payload: bytes):
+        """
+        Übernimmt einen Snapshot des Dienstes für die eigenen Stationen
+        
+        Live/Offline ergibt sich aus den eigenen Stationen ('stale' pro
+        Station), nicht aus dem Gesamtstand des Dienstes.
+        """
+        stations, updated_at, _ = decode_update(payload)
+        by_id = {station['id']: station for station in stations}
+        results = {}
+        for index, (station, departure_filter) in enumerate(zip(self.stations, self.filters)):
+            data = by_id.get(station['id'])
+            if data is None:
+                continue
+            data.pop('filter', None)
+            results[index] = dict(
+                data,
+                name=station.get('name', data['name']),
+                walkingTime=station.get('walkingTime', 0),
+                departures=departure_filter.select(data['departures'])
+            )
+        self.publish(results, updated_at)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Gemeinsamer Abruf-Dienst für Monitor und TUI')
+    parser.add_argument('config', nargs='?', default='./config/config.json',
+                        help='Konfiguration (API, Budget, Intervalle)')
+    parser.add_argument('--socket', help=f'Unix-Socket (Standard: fetchDaemon bzw. {DEFAULT_SOCKET_PATH})')
+    args = parser.parse_args()
+    
+    setup_logging()
+    try:
+        with open(args.config, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.error(f"Konfiguration nicht lesbar: {e}")
+        shutdown_logging()
+        sys.exit(1)
+    
+    socket_path = args.socket or resolve_socket_path(config.get('fetchDaemon') or True)
+    daemon = FetchDaemon(config, socket_path)
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    try:
+        daemon.start()
+        stop_event.wait()
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        logger.error(f"Abruf-Dienst konnte nicht starten: {e}")
+    finally:
+        daemon.stop()
+        shutdown_logging()
+
+
+if __name__ == '__main__':
+    main()
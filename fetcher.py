@@ -0,0 +1,312 @@
+"""
+Hintergrund-Abruf der Abfahrtsdaten
+
+Holt die Daten in einem eigenen Thread und veröffentlicht unveränderliche
+Snapshots, die die Render-Schleife ohne Blockieren übernehmen kann.
+Wann welche Station abgefragt wird, entscheidet der RefreshScheduler.
+"""
+import heapq
+import threading
+import time
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from bvg_api import Departure, minutes_until
+
+logger = logging.getLogger(__name__)
+
+# Konstanten für die adaptive Aktualisierung
+DEFAULT_MIN_INTERVAL = 15  # Sekunden (kürzester Abstand pro Station)
+DEFAULT_MAX_INTERVAL = 300  # Sekunden (längster Abstand pro Station)
+URGENT_SLACK = 2  # Minuten Puffer zum Fußweg, ab dem mit min_interval gefragt wird
+SLACK_INTERVAL_FACTOR = 15  # Sekunden Intervall pro Minute Puffer
+HIDDEN_FACTOR = 4  # Nicht sichtbare Stationen seltener abfragen
+VOLATILITY_SMOOTHING = 0.5  # Gewicht der neuesten Messung (gleitender Mittelwert)
+STOP_TIMEOUT = 5.0  # Sekunden, die beim Beenden auf den laufenden Abruf gewartet wird
+
+
+class Snapshot(NamedTuple):
+    """
+    Unveränderlicher Stand der Abfahrtsdaten
+    
+    Die enthaltenen Stations-Dictionaries werden nach dem Veröffentlichen
+    nicht mehr verändert und dürfen nur gelesen werden.
+    """
+    stations: Tuple[Dict, ...]
+    updated_at: float  # Zeitpunkt der letzten erfolgreichen Aktualisierung (jüngste Station)
+    is_live: bool  # Alle Stationen aktuell (keine veralteten Daten)?
+    version: int  # Wird bei jeder Veröffentlichung erhöht
+
+
+EMPTY_SNAPSHOT = Snapshot(stations=(), updated_at=0.0, is_live=False, version=0)
+
+
+class RefreshScheduler:
+    """
+    Entscheidet pro Station, wann sie das nächste Mal abgefragt wird
+    
+    Stationen liegen mit ihrem Fälligkeitszeitpunkt in einer Prioritäts-
+    Warteschlange. Das Intervall richtet sich nach:
+    - dem Puffer zwischen nächster Abfahrt und Fußweg (knapp = oft)
+    - der Schwankung der Verspätungen seit dem letzten Abruf
+    - der Sichtbarkeit der Station auf dem Display
+    """
+    
+    def __init__(self, walking_times: List[int], base_interval: float,
+                 adaptive: bool = True, min_interval: float = DEFAULT_MIN_INTERVAL,
+                 max_interval: float = DEFAULT_MAX_INTERVAL, visible_count: Optional[int] = None):
+        """
+        Args:
+            walking_times: Fußweg in Minuten pro Station (Konfigurationsreihenfolge)
+            base_interval: Intervall ohne Daten bzw. ohne adaptive Steuerung
+            adaptive: False = alle Stationen im festen base_interval
+            min_interval: Kürzestes Intervall in Sekunden
+            max_interval: Längstes Intervall in Sekunden
+            visible_count: Anzahl der angezeigten Stationen (None = alle)
+        """
+        self.walking_times = walking_times
+        self.base_interval = base_interval
+        self.adaptive = adaptive
+        self.min_interval = min(min_interval, base_interval)
+        self.max_interval = max(max_interval, base_interval)
+        self.visible_count = len(walking_times) if visible_count is None else visible_count
+        
+        self.volatility = [0.0] * len(walking_times)  # Minuten Verspätungsänderung
+        self._last_delays: List[Dict[Tuple, int]] = [{} for _ in walking_times]
+        
+        # Alle Stationen sind sofort fällig
+        now = time.time()
+        self._queue = [(now, i) for i in range(len(walking_times))]
+        heapq.heapify(self._queue)
+    
+    def next_due(self) -> float:
+        """Zeitpunkt, an dem die nächste Station fällig ist"""
+        return self._queue[0][0] if self._queue else float('inf')
+    
+    def due_times(self) -> Dict[int, float]:
+        """Geplante Abfragezeitpunkte {Index: Zeitpunkt} (laufende Abrufe fehlen)"""
+        return {index: due for due, index in self._queue}
+    
+    def schedule_at(self, index: int, due: float):
+        """Legt den nächsten Abfragezeitpunkt einer Station fest"""
+        self._queue = [(when, i) for when, i in self._queue if i != index]
+        self._queue.append((due, index))
+        heapq.heapify(self._queue)
+    
+    def pop_due(self, now: float) -> List[int]:
+        """Entnimmt alle Stationen, die bis now fällig sind"""
+        due = []
+        while self._queue and self._queue[0][0] <= now:
+            due.append(heapq.heappop(self._queue)[1])
+        return sorted(due)
+    
+    def reschedule(self, index: int, station_data: Optional[Dict], now: float) -> float:
+        """
+        Plant die nächste Abfrage einer Station ein
+        
+        Args:
+            index: Index der Station
+            station_data: Ergebnis des letzten Abrufs (None = fehlgeschlagen)
+            now: Aktueller Zeitpunkt (time.time())
+        
+        Returns:
+            Gewähltes Intervall in Sekunden
+        """
+        interval = self.interval_for(index, station_data)
+        heapq.heappush(self._queue, (now + interval, index))
+        return interval
+    
+    def interval_for(self, index: int, station_data: Optional[Dict]) -> float:
+        """Berechnet das Intervall bis zur nächsten Abfrage einer Station"""
+        if not self.adaptive or station_data is None:
+            return self.base_interval
+        
+        departures = station_data.get('departures', [])
+        self._update_volatility(index, departures)
+        
+        # Puffer der nächsten noch erreichbaren Abfahrt gegenüber dem Fußweg
+        now = datetime.now()
+        walking_time = self.walking_times[index]
+        upcoming = [m for m in (minutes_until(d.when, now) for d in departures) if m >= walking_time]
+        if upcoming:
+            slack = upcoming[0] - walking_time
+            interval = self.min_interval + max(0, slack - URGENT_SLACK) * SLACK_INTERVAL_FACTOR
+        else:
+            interval = self.max_interval
+        
+        # Unruhige Stationen (schwankende Verspätungen) öfter abfragen
+        interval /= 1.0 + self.volatility[index]
+        
+        if index >= self.visible_count:
+            interval *= HIDDEN_FACTOR
+        
+        return max(self.min_interval, min(self.max_interval, interval))
+    
+    def _update_volatility(self, index: int, departures: List[Departure]):
+        """Misst, wie stark sich Verspätungen seit dem letzten Abruf geändert haben"""
+        delays = {}
+        for dep in departures:
+            planned = dep.when - timedelta(minutes=dep.delay)
+            delays[(dep.line, dep.direction, planned)] = dep.delay
+        
+        previous = self._last_delays[index]
+        changes = [abs(delay - previous[key]) for key, delay in delays.items() if key in previous]
+        if changes:
+            measured = sum(changes) / len(changes)
+            self.volatility[index] = (
+                VOLATILITY_SMOOTHING * measured
+                + (1 - VOLATILITY_SMOOTHING) * self.volatility[index]
+            )
+        self._last_delays[index] = delays
+
+
+class FetchWorker(threading.Thread):
+    """
+    Hintergrund-Thread, der fällige Stationen abfragt
+    
+    Die Render-Schleife liest mit latest() jeweils den zuletzt
+    veröffentlichten Snapshot; der Austausch erfolgt atomar.
+    """
+    
+    def __init__(self, fetch_fn: Callable[[List[int]], Dict[int, Optional[Dict]]],
+                 scheduler: RefreshScheduler, num_stations: int,
+                 on_publish: Optional[Callable[[Snapshot], None]] = None,
+                 on_change: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            fetch_fn: Holt die Daten der angegebenen Stations-Indizes und
+                liefert {index: Stations-Daten oder None bei Fehler}
+            scheduler: Entscheidet, wann welche Station fällig ist
+            num_stations: Anzahl der konfigurierten Stationen
+            on_publish: Wird nach jeder erfolgreichen Aktualisierung mit dem
+                neuen Snapshot aufgerufen (im Hintergrund-Thread)
+            on_change: Wird nach jeder Veröffentlichung aufgerufen, z.B. um
+                die Render-Schleife zu wecken (im Hintergrund-Thread)
+        """
+        super().__init__(name='bvg-fetcher', daemon=True)
+        self.fetch_fn = fetch_fn
+        self.scheduler = scheduler
+        self.on_publish = on_publish
+        self.on_change = on_change
+        self._stations: List[Optional[Dict]] = [None] * num_stations
+        self._fetched_at: List[float] = [0.0] * num_stations  # Letzter erfolgreicher Abruf
+        self._snapshot = EMPTY_SNAPSHOT
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+    
+    def latest(self) -> Snapshot:
+        """Gibt den zuletzt veröffentlichten Snapshot zurück"""
+        with self._lock:
+            return self._snapshot
+    
+    def restore(self, stations: Dict[int, Dict], updated_at: float):
+        """
+        Übernimmt wiederhergestellte Daten (Warmstart) als Offline-Snapshot
+        
+        Die Stationen gelten als veraltet, bis sie neu abgefragt wurden.
+        
+        Args:
+            stations: {index: Stations-Daten} aus dem gespeicherten Snapshot
+            updated_at: Zeitpunkt der damaligen Aktualisierung
+        """
+        for index, station_data in stations.items():
+            self._stations[index] = dict(station_data, stale=True)
+            self._fetched_at[index] = updated_at
+        self._update_snapshot()
+    
+    def publish(self, results: Dict[int, Optional[Dict]], updated_at: Optional[float] = None):
+        """
+        Übernimmt neue Stations-Daten und veröffentlicht einen Snapshot
+        
+        Args:
+            results: {index: Stations-Daten}; fehlgeschlagene Stationen (None)
+                behalten ihre bisherigen Daten und gelten bis zum nächsten
+                erfolgreichen Abruf als veraltet ('stale'), ebenso wie
+                veraltete Daten aus dem Client
+            updated_at: Zeitpunkt des Abrufs (Standard: jetzt)
+        """
+        fetched_at = updated_at or time.time()
+        for index, station_data in results.items():
+            if station_data is None:
+                previous = self._stations[index]
+                if previous is not None and not previous.get('stale', False):
+                    # Neues Dict - veröffentlichte Snapshots bleiben unverändert
+                    self._stations[index] = dict(previous, stale=True)
+                continue
+            self._stations[index] = station_data
+            if not station_data.get('stale', False):
+                self._fetched_at[index] = fetched_at
+        self._update_snapshot()
+    
+    def _update_snapshot(self):
+        """
+        Veröffentlicht den Stand aller Stationen
+        
+        Live ist der Snapshot nur, wenn keine angezeigte Station veraltete
+        Daten hat - unabhängig davon, welche Stationen zuletzt abgefragt
+        wurden.
+        """
+        stations = tuple(s for s in self._stations if s is not None)
+        with self._lock:
+            self._snapshot = Snapshot(
+                stations=stations,
+                updated_at=max(self._fetched_at, default=0.0),
+                is_live=bool(stations) and not any(s.get('stale', False) for s in stations),
+                version=self._snapshot.version + 1
+            )
+        self._notify_change()
+    
+    def _notify_change(self):
+        """Meldet einen neuen Snapshot an on_change"""
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.warning(f"Benachrichtigung über neue Daten fehlgeschlagen: {e}")
+    
+    def run(self):
+        """Abruf-Schleife (läuft bis stop() aufgerufen wird)"""
+        while not self._stop_event.is_set():
+            due = self.scheduler.pop_due(time.time())
+            
+            if due:
+                try:
+                    results = self.fetch_fn(due)
+                except Exception as e:
+                    logger.error(f"Fehler beim Abrufen im Hintergrund: {e}", exc_info=True)
+                    results = {i: None for i in due}
+                
+                self.publish(results)
+                if any(r is not None and not r.get('stale', False) for r in results.values()):
+                    logger.info(f"Daten erfolgreich aktualisiert ({len(due)} Stationen)")
+                    if self.on_publish is not None:
+                        self.on_publish(self.latest())
+                else:
+                    logger.warning("Konnte keine neuen Daten abrufen")
+                
+                now = time.time()
+                for index in due:
+                    station_data = results.get(index)
+                    if station_data is not None and station_data.get('stale', False):
+                        station_data = None
+                    interval = self.scheduler.reschedule(index, station_data, now)
+                    logger.debug(f"Station {index}: nächste Abfrage in {interval:.0f}s")
+            
+            wait_time = min(self.scheduler.next_due() - time.time(), DEFAULT_MAX_INTERVAL)
+            self._stop_event.wait(max(0.0, wait_time))
+    
+    def stop(self, timeout: Optional[float] = None):
+        """
+        Beendet den Thread nach dem laufenden Abruf
+        
+        Args:
+            timeout: So lange höchstens auf das Ende warten, z.B. vor dem
+                letzten Speichern (None = nicht warten)
+        """
+        self._stop_event.set()
+        self._join(timeout)
+    
+    def _join(self, timeout: Optional[float]):
+        if timeout is not None and self.is_alive() and self is not threading.current_thread():
+            self.join(timeout)
@@ -3,22 +3,16 @@
 Script zum Finden von BVG Stationscodes
 """
 import sys
-import requests
+
+from bvg_api import BVGClient
+from http_cache import open_cache
 
 
 def search_station(query: str):
     """Sucht nach Stationen"""
-    url = "https://v6.bvg.transport.rest/locations"
-    params = {
-        'query': query,
-        'results': 10
-    }
-    
     try:
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        locations = response.json()
+        # Wiederholte Suchen kommen aus dem lokalen Cache
+        locations = BVGClient(cache=open_cache()).search_locations(query, results=10)
         
         if not locations:
             print(f"❌ Keine Stationen gefunden für: '{query}'")
@@ -0,0 +1,162 @@
+"""
+Direkte Ausgabe auf ein Linux-Framebuffer-Device
+
+Alternative zu SDLs fbcon-Treiber: gezeichnet wird wie gewohnt mit pygame
+in eine Surface (SDL-Treiber "dummy"), geänderte Zeilen werden per mmap
+direkt in /dev/fbN geschrieben. Die Umrechnung RGB888 → RGB565 übernimmt
+ein Blit in eine 16-Bit-Surface (vektorisierter SDL-Blitter), ohne
+zusätzliche Abhängigkeiten.
+
+Als Ziel funktioniert auch eine normale Datei, z.B. zum Testen ohne Display.
+"""
+import mmap
+import os
+import pygame
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_FRAMEBUFFER = '/dev/fb0'
+DEFAULT_DEPTH = 16  # Bits pro Pixel, wenn das Ziel eine normale Datei ist
+SYSFS_GRAPHICS = '/sys/class/graphics'
+
+# Farbmasken pro Farbtiefe (Little Endian, wie beim Pi)
+PIXEL_MASKS = {
+    16: (0xF800, 0x07E0, 0x001F, 0),  # RGB565
+    32: (0xFF0000, 0x00FF00, 0x0000FF, 0),  # XRGB8888
+}
+
+
+def read_fb_geometry(path: str) -> Optional[Tuple[int, int, int, int]]:
+    """
+    Liest Auflösung, Farbtiefe und Zeilenlänge eines Framebuffers aus sysfs
+    
+    Returns:
+        (Breite, Höhe, Bits pro Pixel, Bytes pro Zeile) oder None, wenn
+        path kein Framebuffer-Device ist
+    """
+    name = os.path.basename(os.path.realpath(path))
+    sysfs = os.path.join(SYSFS_GRAPHICS, name)
+    if not name.startswith('fb') or not os.path.isdir(sysfs):
+        return None
+    
+    def read(attribute: str) -> str:
+        with open(os.path.join(sysfs, attribute), 'r', encoding='ascii') as f:
+            return f.read().strip()
+    
+    width, height = (int(value) for value in read('virtual_size').split(','))
+    depth = int(read('bits_per_pixel'))
+    stride = int(read('stride'))
+    return width, height, depth, stride
+
+
+class FramebufferOutput:
+    """
+    Schreibt geänderte Bereiche einer Surface in einen Framebuffer
+    
+    Wird vom DamageTracker statt pygame.display.update() aufgerufen.
+    """
+    
+    def __init__(self, source: pygame.Surface, path: str = DEFAULT_FRAMEBUFFER,
+                 depth: int = DEFAULT_DEPTH):
+        """
+        Args:
+            source: Surface, in die gezeichnet wird (Bildschirminhalt)
+            path: Framebuffer-Device oder normale Datei
+            depth: Farbtiefe für normale Dateien (16 oder 32)
+        
+        Raises:
+            OSError: Wenn das Ziel nicht geöffnet werden kann
+            ValueError: Bei nicht unterstützter Farbtiefe
+        """
+        self.source = source
+        self.path = path
+        
+        geometry = read_fb_geometry(path)
+        if geometry is None:
+            # Normale Datei: Geometrie der Surface übernehmen
+            width, height = source.get_size()
+            geometry = (width, height, depth, width * depth // 8)
+        self.width, self.height, self.depth, self.stride = geometry
+        
+        if self.depth not in PIXEL_MASKS:
+            raise ValueError(f"Nicht unterstützte Farbtiefe: {self.depth} Bit")
+        
+        # Nur der Bereich, den Framebuffer und Surface gemeinsam haben
+        self.rect = source.get_rect().clip(pygame.Rect(0, 0, self.width, self.height))
+        if self.rect.size != source.get_size():
+            logger.warning(
+                f"Framebuffer {self.width}x{self.height} passt nicht zur Anzeige "
+                f"{source.get_width()}x{source.get_height()}, Ausgabe wird beschnitten"
+            )
+        
+        # Konvertierungs-Surface im Pixelformat des Framebuffers
+        self.converted = pygame.Surface(source.get_size(), 0, self.depth, PIXEL_MASKS[self.depth])
+        self.bytes_per_pixel = self.depth // 8
+        
+        size = self.stride * self.height
+        self._file = open(path, 'r+b' if os.path.exists(path) else 'w+b')
+        if read_fb_geometry(path) is None and os.fstat(self._file.fileno()).st_size < size:
+            self._file.truncate(size)
+        self._map = mmap.mmap(self._file.fileno(), size, mmap.MAP_SHARED, mmap.PROT_WRITE | mmap.PROT_READ)
+        
+        logger.info(f"Framebuffer-Ausgabe: {path} ({self.width}x{self.height}, {self.depth} Bit)")
+    
+    def present(self, rects: Optional[List[pygame.Rect]] = None):
+        """
+        Überträgt geänderte Bereiche in den Framebuffer
+        
+        Es werden ganze Zeilen kopiert (zusammenhängend im Speicher).
+        
+        Args:
+            rects: Geänderte Bereiche (None = alles)
+        """
+        if rects is None:
+            rects = [self.rect]
+        
+        rows = []
+        for rect in rects:
+            rect = rect.clip(self.rect)
+            if not rect.width or not rect.height:
+                continue
+            # Farbumrechnung nur im geänderten Bereich
+            self.converted.blit(self.source, rect, rect)
+            rows.append((rect.top, rect.bottom))
+        
+        if not rows:
+            return
+        
+        pitch = self.converted.get_pitch()
+        row_bytes = self.rect.width * self.bytes_per_pixel
+        view = memoryview(self.converted.get_view('0'))
+        try:
+            for top, bottom in self._merge_rows(rows):
+                if pitch == self.stride and row_bytes == pitch:
+                    # Ein Block für alle Zeilen
+                    self._map[top * pitch:bottom * pitch] = view[top * pitch:bottom * pitch]
+                else:
+                    for y in range(top, bottom):
+                        start = y * self.stride
+                        self._map[start:start + row_bytes] = view[y * pitch:y * pitch + row_bytes]
+        finally:
+            view.release()
+    
+    @staticmethod
+    def _merge_rows(rows: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """Fasst überlappende Zeilenbereiche zusammen"""
+        merged = []
+        for top, bottom in sorted(rows):
+            if merged and top <= merged[-1][1]:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], bottom))
+            else:
+                merged.append((top, bottom))
+        return merged
+    
+    def close(self):
+        """Gibt die Speicherabbildung frei"""
+        try:
+            self._map.close()
+        finally:
+            self._file.close()
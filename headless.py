@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+"""
+Rendern ohne Display
+
+Zeichnet Frames mit dem echten DisplayManager auf dem SDL-Treiber "dummy"
+und einer vorgegebenen Uhrzeit statt der Systemzeit. Dadurch sind Frames
+reproduzierbar: sie können als PNG oder Rohdaten gespeichert und mit
+Referenzbildern (Golden Images) verglichen werden. Es werden keine
+Anfragen an die API gesendet.
+
+Aufruf:
+    python headless.py --scenario two --dump frame.png
+    python headless.py --scenario long --elapsed 5 --golden golden/long.png
+    python headless.py --scenario long --elapsed 5 --golden golden/long.png --update-golden
+
+Referenzbilder hängen von den installierten Schriften ab und sollten auf
+dem Rechner erzeugt werden, auf dem auch verglichen wird.
+"""
+import argparse
+import os
+import sys
+import logging
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+import pygame
+
+from bvg_api import Departure
+from display import DisplayManager
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_TIME = datetime(2026, 1, 15, 12, 0, 0)  # Feste Uhrzeit für reproduzierbare Frames
+RAW_SUFFIX = '.raw'  # Dateiendung für Rohdaten (RGB, 3 Bytes pro Pixel)
+
+LINES = [
+    ('U5', 'subway', 'S+U Hauptbahnhof'), ('M5', 'tram', 'S Hackescher Markt'),
+    ('142', 'bus', 'S+U Pankow'), ('S7', 'suburban', 'S Ahrensfelde'),
+    ('U8', 'subway', 'S+U Wittenau'),
+]
+LONG_LINES = [
+    ('142', 'bus', 'S+U Pankow über Rosenthaler Platz und Invalidenstraße'),
+    ('M10', 'tram', 'S+U Hauptbahnhof über Nordbahnhof, Bernauer Straße und Eberswalder Straße'),
+    ('RE1', 'regional', 'Frankfurt (Oder) über Erkner, Fürstenwalde (Spree) und Briesen (Mark)'),
+    ('S41', 'suburban', 'Ringbahn im Uhrzeigersinn über Gesundbrunnen und Westkreuz'),
+]
+
+
+def _station(index: int, name: str, lines: List, count: int, now: datetime,
+             disruption: Optional[str] = None) -> Dict:
+    """Eine Station mit count Abfahrten (eine davon "jetzt", einige verspätet)"""
+    departures = []
+    for i in range(count):
+        line, product, direction = lines[i % len(lines)]
+        when = now + timedelta(minutes=i * 3 + index, seconds=30)
+        departures.append(Departure(line, direction, product, when, i % 3))
+    return {
+        'id': str(900100003 + index),
+        'name': name,
+        'walkingTime': 4,
+        'departures': departures,
+        'disruptions': [{'type': 'warning', 'summary': disruption, 'text': ''}] if disruption else [],
+    }
+
+
+def one_station(now: datetime) -> List[Dict]:
+    """Eine Station über die volle Breite"""
+    return [_station(0, 'S+U Alexanderplatz', LINES, 8, now)]
+
+
+def two_stations(now: datetime) -> List[Dict]:
+    """Zwei Spalten, eine davon mit Störungsmeldung"""
+    return [
+        _station(0, 'S+U Alexanderplatz', LINES, 8, now),
+        _station(1, 'U Rosenthaler Platz', LINES, 8, now, 'Aufzug außer Betrieb'),
+    ]
+
+
+def long_directions(now: datetime) -> List[Dict]:
+    """Zwei Spalten, jede Richtung scrollt"""
+    return [
+        _station(0, 'S+U Alexanderplatz', LONG_LINES, 8, now),
+        _station(1, 'S+U Friedrichstraße', LONG_LINES, 8, now, 'Bauarbeiten zwischen Ostkreuz und Lichtenberg'),
+    ]
+
+
+SCENARIOS: Dict[str, Callable[[datetime], List[Dict]]] = {
+    'one': one_station,
+    'two': two_stations,
+    'long': long_directions,
+}
+
+
+class FakeClock:
+    """Zeitquelle für den DisplayManager, die nur auf Anweisung weiterläuft"""
+    
+    def __init__(self, start: datetime):
+        self.now = start.timestamp()
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def advance(self, seconds: float):
+        """Stellt die Uhr um seconds Sekunden vor"""
+        self.now += seconds
+
+
+class HeadlessRenderer:
+    """
+    DisplayManager ohne sichtbares Fenster mit eigener Uhr
+    
+    Die Daten gelten als zum Startzeitpunkt aktualisiert. Scroll-Positionen,
+    Blinken und Uhrzeit ergeben sich nur aus der Zeit seit dem Start.
+    """
+    
+    def __init__(self, width: int = 800, height: int = 480, start: datetime = DEFAULT_TIME):
+        """
+        Args:
+            width: Bildschirmbreite
+            height: Bildschirmhöhe
+            start: Uhrzeit des ersten Frames
+        """
+        self.clock = FakeClock(start)
+        self.display = DisplayManager(
+            width, height, fullscreen=False, test_mode=False,
+            output_backend='headless', clock=self.clock
+        )
+    
+    def render(self, stations: List[Dict]) -> pygame.Surface:
+        """
+        Zeichnet einen Frame zur aktuellen Uhrzeit
+        
+        Returns:
+            Bildschirminhalt (wird vom nächsten Frame überschrieben)
+        """
+        self.display.draw_departures(stations)
+        return self.display.screen
+    
+    def advance(self, seconds: float):
+        """Lässt die Zeit bis zum nächsten Frame vergehen"""
+        self.clock.advance(seconds)
+    
+    def close(self):
+        """Beendet pygame"""
+        self.display.quit()
+
+
+def dump_frame(surface: pygame.Surface, path: str):
+    """
+    Speichert einen Frame als Bild oder als Rohdaten
+    
+    Args:
+        surface: Frame
+        path: Zieldatei; bei Endung .raw RGB-Rohdaten, sonst Bildformat
+            nach Endung (PNG, BMP, ...)
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    if path.endswith(RAW_SUFFIX):
+        with open(path, 'wb') as f:
+            f.write(pygame.image.tobytes(surface, 'RGB'))
+    else:
+        pygame.image.save(surface, path)
+
+
+def compare_frame(surface: pygame.Surface, golden_path: str, tolerance: int = 0,
+                  diff_path: Optional[str] = None) -> int:
+    """
+    Vergleicht einen Frame mit einem Referenzbild
+    
+    Args:
+        surface: Frame
+        golden_path: Referenzbild (PNG)
+        tolerance: Erlaubte Abweichung pro Farbkanal
+        diff_path: Speichert abweichende Pixel als Maske (optional)
+    
+    Returns:
+        Anzahl abweichender Pixel
+    
+    Raises:
+        FileNotFoundError: Wenn es das Referenzbild nicht gibt
+        ValueError: Wenn die Größe nicht übereinstimmt
+    """
+    if not os.path.exists(golden_path):
+        raise FileNotFoundError(golden_path)
+    
+    golden = pygame.image.load(golden_path)
+    if golden.get_size() != surface.get_size():
+        raise ValueError(
+            f"Größe {surface.get_width()}x{surface.get_height()} passt nicht zum Referenzbild "
+            f"{golden.get_width()}x{golden.get_height()}"
+        )
+    golden = golden.convert(surface)
+    
+    # Bit gesetzt = Pixel stimmt (bis auf tolerance) überein
+    threshold = (tolerance + 1, tolerance + 1, tolerance + 1, 255)
+    mask = pygame.mask.from_threshold(surface, (0, 0, 0, 0), threshold, golden)
+    mask.invert()  # Bit gesetzt = Pixel weicht ab
+    different = mask.count()
+    
+    if different and diff_path:
+        dump_frame(mask.to_surface(setcolor=(255, 0, 0), unsetcolor=(0, 0, 0)), diff_path)
+    
+    return different
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Frames ohne Display rendern und vergleichen')
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS), default='two', help='Testdaten')
+    parser.add_argument('--at', type=datetime.fromisoformat, default=DEFAULT_TIME,
+                        help='Uhrzeit des ersten Frames (ISO 8601)')
+    parser.add_argument('--elapsed', type=float, default=0.0,
+                        help='Sekunden nach dem ersten Frame, zu denen verglichen wird')
+    parser.add_argument('--width', type=int, default=800)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--dump', help='Frame speichern (.png, .bmp oder .raw)')
+    parser.add_argument('--golden', help='Referenzbild zum Vergleichen')
+    parser.add_argument('--update-golden', action='store_true', help='Referenzbild neu schreiben')
+    parser.add_argument('--tolerance', type=int, default=0, help='Erlaubte Abweichung pro Farbkanal')
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s: %(message)s')
+    
+    renderer = HeadlessRenderer(args.width, args.height, args.at)
+    stations = SCENARIOS[args.scenario](args.at)
+    
+    # Erster Frame legt Scroll-Texte an, danach läuft die Zeit
+    frame = renderer.render(stations)
+    if args.elapsed:
+        renderer.advance(args.elapsed)
+        frame = renderer.render(stations)
+    
+    status = 0
+    if args.dump:
+        dump_frame(frame, args.dump)
+        print(f"Frame gespeichert: {args.dump}")
+    
+    if args.golden:
+        if args.update_golden:
+            dump_frame(frame, args.golden)
+            print(f"Referenzbild geschrieben: {args.golden}")
+        else:
+            diff_path = os.path.splitext(args.golden)[0] + '.diff.png'
+            try:
+                different = compare_frame(frame, args.golden, args.tolerance, diff_path)
+            except (FileNotFoundError, ValueError) as e:
+                print(f"❌ Vergleich nicht möglich: {e}")
+                status = 2
+            else:
+                if different:
+                    print(f"❌ {different} Pixel weichen ab (siehe {diff_path})")
+                    status = 1
+                else:
+                    print(f"✅ Stimmt mit {args.golden} überein")
+    
+    renderer.close()
+    sys.exit(status)
+
+
+if __name__ == '__main__':
+    main()
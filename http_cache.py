@@ -0,0 +1,217 @@
+"""
+Persistenter HTTP-Cache für die BVG REST API
+
+Speichert Antworten komprimiert in einer SQLite-Datei, damit Neustarts und
+wiederholte Stationssuchen keine Daten erneut laden, die schon vorliegen.
+Kurzlebige Antworten (Abfahrten) bleiben nur im RAM: nach einem Neustart
+sind sie ohnehin abgelaufen, und jeder Abruf wäre sonst ein Schreibvorgang
+auf der SD-Karte (den Warmstart übernimmt snapshot_store.py).
+Abgelaufene Einträge werden per ETag/Last-Modified beim Server
+revalidiert, sofern dieser das unterstützt.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+import logging
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'bvg_monitor', 'http_cache.sqlite')
+COMPRESSION_LEVEL = 6
+PERSIST_MIN_TTL = 3600  # Kürzer gültige Antworten werden nicht auf Disk geschrieben
+MAX_MEMORY_ENTRIES = 256  # Obergrenze der Einträge im RAM
+
+# Gültigkeitsdauer pro Endpunkt in Sekunden
+DEFAULT_TTLS = {
+    'departures': 10,  # /stops/{id}/departures - Echtzeitdaten
+    'stop': 24 * 3600,  # /stops/{id} - Stammdaten
+    'locations': 7 * 24 * 3600,  # /locations - Suchergebnisse
+}
+
+
+class CacheEntry(NamedTuple):
+    """Ein gespeicherter Antwort-Body mit Validierungs-Headern"""
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+
+
+class ResponseCache:
+    """
+    HTTP-Antwort-Cache mit TTL pro Endpunkt
+    
+    Schlüssel ist die URL inklusive sortierter Query-Parameter. Der Cache
+    ist thread-sicher und zählt Treffer, Fehlschläge und Revalidierungen.
+    """
+    
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttls: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            path: Pfad zur SQLite-Datei (':memory:' für reinen RAM-Cache)
+            ttls: Gültigkeitsdauer pro Endpunkt (überschreibt DEFAULT_TTLS)
+        """
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._memory: Dict[str, CacheEntry] = {}  # Kurzlebige Einträge (nur RAM)
+        
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' key TEXT PRIMARY KEY, body BLOB, etag TEXT, last_modified TEXT, stored_at REAL)'
+        )
+        self._prune()
+    
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Erzeugt den Cache-Schlüssel aus URL und Parametern"""
+        if not params:
+            return url
+        return f"{url}?{urlencode(sorted(params.items()))}"
+    
+    def ttl_for(self, url: str) -> float:
+        """Gültigkeitsdauer für eine URL anhand des Endpunkts"""
+        path = urlsplit(url).path.rstrip('/')
+        if path.endswith('/departures'):
+            return self.ttls['departures']
+        if path.endswith('/locations'):
+            return self.ttls['locations']
+        if '/stops/' in path:
+            return self.ttls['stop']
+        return 0
+    
+    def lookup(self, key: str, ttl: float) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Sucht einen Eintrag und zählt Treffer/Fehlschläge
+        
+        Args:
+            key: Cache-Schlüssel
+            ttl: Gültigkeitsdauer in Sekunden
+        
+        Returns:
+            (Eintrag oder None, True wenn der Eintrag noch frisch ist)
+        """
+        with self._lock:
+            if self._persistent(key):
+                row = self._db.execute(
+                    'SELECT body, etag, last_modified, stored_at FROM responses WHERE key = ?', (key,)
+                ).fetchone()
+                entry = None
+                if row is not None:
+                    body, etag, last_modified, stored_at = row
+                    entry = CacheEntry(zlib.decompress(body), etag, last_modified, stored_at)
+            else:
+                entry = self._memory.get(key)
+            
+            fresh = entry is not None and time.time() - entry.stored_at < ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        
+        if entry is None:
+            return None, False
+        return entry, fresh
+    
+    def store(self, key: str, body: bytes, headers: Dict[str, str]):
+        """
+        Speichert einen Antwort-Body
+        
+        Args:
+            key: Cache-Schlüssel
+            body: Roher Antwort-Body
+            headers: Antwort-Header (für ETag/Last-Modified)
+        """
+        with self._lock:
+            if not self._persistent(key):
+                self._memory.pop(key, None)
+                if len(self._memory) >= MAX_MEMORY_ENTRIES:
+                    del self._memory[next(iter(self._memory))]  # Ältester Eintrag
+                self._memory[key] = CacheEntry(
+                    body, headers.get('ETag'), headers.get('Last-Modified'), time.time()
+                )
+                return
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)',
+                (key, zlib.compress(body, COMPRESSION_LEVEL),
+                 headers.get('ETag'), headers.get('Last-Modified'), time.time())
+            )
+            self._db.commit()
+    
+    def touch(self, key: str):
+        """Markiert einen Eintrag nach erfolgreicher Revalidierung (304) als frisch"""
+        with self._lock:
+            self.revalidated += 1
+            if not self._persistent(key):
+                entry = self._memory.get(key)
+                if entry is not None:
+                    self._memory[key] = entry._replace(stored_at=time.time())
+                return
+            self._db.execute('UPDATE responses SET stored_at = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+    
+    def conditional_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Header für eine bedingte Anfrage (leer wenn nicht möglich)"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+    
+    def stats(self) -> Dict[str, int]:
+        """Trefferstatistik und Anzahl gespeicherter Einträge (Disk und RAM)"""
+        with self._lock:
+            entries, size = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses'
+            ).fetchone()
+            entries += len(self._memory)
+            size += sum(len(entry.body) for entry in self._memory.values())
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'revalidated': self.revalidated,
+            'entries': entries,
+            'bytes': size,
+        }
+    
+    def _persistent(self, key: str) -> bool:
+        """True, wenn Einträge zu diesem Schlüssel auf Disk gespeichert werden"""
+        return self.ttl_for(key) >= PERSIST_MIN_TTL
+    
+    def _prune(self):
+        """Entfernt Einträge, die länger als die größte TTL abgelaufen sind"""
+        cutoff = time.time() - 2 * max(self.ttls.values())
+        with self._lock:
+            self._db.execute('DELETE FROM responses WHERE stored_at < ?', (cutoff,))
+            self._db.commit()
+
+
+def open_cache(path: str = DEFAULT_CACHE_PATH) -> Optional[ResponseCache]:
+    """
+    Öffnet den Cache, ohne bei Problemen den Start zu verhindern
+    
+    Returns:
+        ResponseCache oder None (z.B. bei schreibgeschütztem Dateisystem)
+    """
+    try:
+        return ResponseCache(path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"HTTP-Cache nicht verfügbar ({path}): {e}")
+        return None
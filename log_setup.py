@@ -0,0 +1,258 @@
+"""
+Logging ohne Blockieren des Render-Loops
+
+logging.basicConfig schreibt synchron: jede Meldung ist ein write() auf
+die SD-Karte im aufrufenden Thread. Hier landen Meldungen stattdessen in
+einer begrenzten Warteschlange (QueueHandler) und werden von einem
+Hintergrund-Thread (LogListener) verarbeitet:
+
+- Ist die Warteschlange voll, wird verworfen statt gewartet; die Anzahl
+  verworfener Meldungen wird nachgereicht.
+- Gleiche Meldungen (z.B. "Hole Abfahrten für ..." bei jedem Abruf)
+  erscheinen nur einmal pro REPEAT_WINDOW, danach mit der Anzahl der
+  unterdrückten Wiederholungen.
+- Die Log-Datei wird über einen Ringpuffer im RAM gesammelt und in
+  Blöcken geschrieben (spätestens nach FLUSH_INTERVAL, bei Fehlern
+  sofort) und nach Größe rotiert.
+"""
+import logging
+import queue
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Konstanten
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+QUEUE_SIZE = 1000  # Meldungen in der Warteschlange, danach wird verworfen
+BUFFER_SIZE = 200  # Meldungen im RAM-Ringpuffer vor dem Schreiben
+FLUSH_INTERVAL = 30.0  # Sekunden, die Meldungen höchstens im RAM liegen
+DEFAULT_MAX_BYTES = 1024 * 1024  # Größe einer Log-Datei vor dem Rotieren
+DEFAULT_BACKUP_COUNT = 3  # Anzahl aufgehobener alter Log-Dateien
+REPEAT_WINDOW = 300.0  # Sekunden, in denen gleiche Meldungen zusammengefasst werden
+MAX_REPEAT_KEYS = 500  # Obergrenze gemerkter Meldungen
+
+_listener: Optional['LogListener'] = None
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler, der bei voller Warteschlange verwirft statt zu blockieren"""
+    
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0  # Ungefähr - wird ohne Lock aus mehreren Threads gezählt
+    
+    def enqueue(self, record: logging.LogRecord):
+        if self.dropped:
+            notice = logging.LogRecord(
+                __name__, logging.WARNING, __file__, 0,
+                f"{self.dropped} Log-Meldungen verworfen (Warteschlange voll)", None, None
+            )
+            try:
+                self.queue.put_nowait(notice)
+            except queue.Full:
+                self.dropped += 1
+                return
+            self.dropped = 0
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RepeatFilter(logging.Filter):
+    """
+    Fasst gleiche Meldungen zusammen
+    
+    Die erste Meldung geht durch, Wiederholungen innerhalb von window
+    Sekunden werden nur gezählt. Die erste Meldung nach Ablauf des Fensters
+    trägt die Anzahl der unterdrückten Wiederholungen.
+    """
+    
+    def __init__(self, window: float = REPEAT_WINDOW):
+        super().__init__()
+        self.window = window
+        self._seen: Dict[Tuple[str, int, str], List] = {}  # Schlüssel -> [Zeitpunkt, unterdrückt]
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.window <= 0:
+            return True
+        message = record.getMessage()
+        key = (record.name, record.levelno, message)
+        entry = self._seen.get(key)
+        if entry is not None and record.created - entry[0] < self.window:
+            entry[1] += 1
+            return False
+        
+        if entry is not None and entry[1]:
+            since = time.strftime('%H:%M:%S', time.localtime(entry[0]))
+            record.msg = f"{message} ({entry[1]}x wiederholt seit {since})"
+            record.args = None
+        self._seen.pop(key, None)
+        if len(self._seen) >= MAX_REPEAT_KEYS:
+            self._prune(record.created)
+        self._seen[key] = [record.created, 0]
+        return True
+    
+    def _prune(self, now: float):
+        """Vergisst abgelaufene Meldungen ohne Wiederholungen, notfalls die ältesten"""
+        cutoff = now - self.window
+        self._seen = {
+            key: entry for key, entry in self._seen.items()
+            if entry[0] >= cutoff or entry[1]
+        }
+        while len(self._seen) > MAX_REPEAT_KEYS // 2:
+            del self._seen[next(iter(self._seen))]
+
+
+class RingBufferHandler(logging.Handler):
+    """
+    Sammelt Meldungen im RAM und gibt sie blockweise an target weiter
+    
+    Geschrieben wird, wenn der Puffer voll ist, die älteste Meldung
+    FLUSH_INTERVAL alt ist oder eine Meldung ab flush_level kommt. Schlägt
+    das Schreiben fehl (Karte voll, schreibgeschützt), bleiben nur die
+    letzten capacity Meldungen erhalten.
+    """
+    
+    def __init__(self, target: logging.Handler, capacity: int = BUFFER_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, flush_level: int = logging.ERROR):
+        super().__init__()
+        self.target = target
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.flush_level = flush_level
+        self.buffer: deque = deque(maxlen=capacity)
+        self._oldest = 0.0
+    
+    def emit(self, record: logging.LogRecord):
+        if not self.buffer:
+            self._oldest = time.monotonic()
+        self.buffer.append(record)
+        if (len(self.buffer) >= self.capacity
+                or record.levelno >= self.flush_level
+                or time.monotonic() - self._oldest >= self.flush_interval):
+            self.flush()
+    
+    def flush(self):
+        """Schreibt alle gepufferten Meldungen in einem Block"""
+        with self.lock:
+            while self.buffer:
+                self.target.handle(self.buffer[0])
+                self.buffer.popleft()
+            self.target.flush()
+    
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.target.close()
+            super().close()
+
+
+class LogListener(QueueListener):
+    """
+    Hintergrund-Thread, der die Warteschlange abarbeitet
+    
+    Fasst Wiederholungen zusammen und leert die Puffer, sobald für
+    FLUSH_INTERVAL keine Meldung mehr kam.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, *handlers: logging.Handler,
+                 repeat_window: float = REPEAT_WINDOW, flush_interval: float = FLUSH_INTERVAL):
+        super().__init__(log_queue, *handlers, respect_handler_level=True)
+        self.repeats = RepeatFilter(repeat_window)
+        self.flush_interval = flush_interval
+    
+    def dequeue(self, block: bool):
+        while True:
+            try:
+                return self.queue.get(block, self.flush_interval)
+            except queue.Empty:
+                if not block:
+                    raise
+                for handler in self.handlers:
+                    handler.flush()
+    
+    def enqueue_sentinel(self):
+        # Blockierend, damit stop() auch bei voller Warteschlange ankommt
+        self.queue.put(self._sentinel)
+    
+    def handle(self, record: logging.LogRecord):
+        if self.repeats.filter(record):
+            super().handle(record)
+
+
+def setup_logging(log_file: Optional[str] = None, level: int = logging.INFO,
+                  console: bool = True, max_bytes: int = DEFAULT_MAX_BYTES,
+                  backup_count: int = DEFAULT_BACKUP_COUNT,
+                  repeat_window: float = REPEAT_WINDOW) -> LogListener:
+    """
+    Richtet das Root-Logging ein (ersetzt basicConfig und eine vorherige
+    Einrichtung)
+    
+    Args:
+        log_file: Log-Datei (rotierend, gepuffert), None = keine Datei
+        level: Mindest-Level
+        console: Zusätzlich auf stderr ausgeben (ungepuffert)
+        max_bytes: Größe, ab der die Log-Datei rotiert wird
+        backup_count: Anzahl aufgehobener alter Log-Dateien
+        repeat_window: Sekunden, in denen gleiche Meldungen zusammengefasst
+            werden (0 = aus)
+    
+    Returns:
+        Der laufende LogListener
+    """
+    global _listener
+    formatter = logging.Formatter(LOG_FORMAT)
+    handlers: List[logging.Handler] = []
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        handlers.append(stream_handler)
+    if log_file:
+        Path(log_file).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=max_bytes, backupCount=backup_count,
+            encoding='utf-8', delay=True
+        )
+        file_handler.setFormatter(formatter)
+        handlers.append(RingBufferHandler(file_handler))
+    
+    log_queue: queue.Queue = queue.Queue(QUEUE_SIZE)
+    listener = LogListener(log_queue, *handlers, repeat_window=repeat_window)
+    listener.start()
+    
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        if not isinstance(handler, QueueHandler):
+            handler.close()
+    root.addHandler(DroppingQueueHandler(log_queue))
+    root.setLevel(level)
+    
+    # Vorherigen Listener erst jetzt beenden, damit keine Meldung verloren geht
+    previous, _listener = _listener, listener
+    if previous is not None:
+        _stop_listener(previous)
+    return listener
+
+
+def shutdown_logging():
+    """Arbeitet die Warteschlange ab und schreibt alle Puffer (beim Beenden)"""
+    global _listener
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        if isinstance(handler, DroppingQueueHandler):
+            root.removeHandler(handler)
+    listener, _listener = _listener, None
+    _stop_listener(listener)
+
+
+def _stop_listener(listener: LogListener):
+    listener.stop()
+    for handler in listener.handlers:
+        handler.close()
@@ -8,23 +8,32 @@ import json
 import time
 import logging
 import sys
-from typing import Dict, List
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
 from pathlib import Path
 
-from bvg_api import BVGClient
-from display import DisplayManager
+from bvg_api import BVGClient, DepartureFilter
+from http_cache import open_cache, DEFAULT_CACHE_PATH
+from rate_limit import RequestGovernor, DEFAULT_REQUESTS_PER_MINUTE
+from display import DisplayManager, VISIBLE_STATIONS, IDLE_FPS, MAX_FPS, rows_per_station
+from framebuffer import DEFAULT_FRAMEBUFFER
+from tracing import tracer, span, DEFAULT_MAX_BYTES as DEFAULT_TRACE_MAX_BYTES, DEFAULT_BACKUP_COUNT
+from metrics import MonitorMetrics, serve_metrics, DEFAULT_METRICS_HOST
+from profiler import SamplingProfiler, install_signal_handler, DEFAULT_PROFILE_DIR, DEFAULT_DURATION
+from fetcher import FetchWorker, RefreshScheduler, Snapshot, DEFAULT_MAX_INTERVAL, STOP_TIMEOUT
+from fetch_daemon import DaemonSubscriber, resolve_socket_path
+from snapshot_store import SnapshotStore, DEFAULT_SNAPSHOT_PATH
+from snapshot_store import DEFAULT_MIN_INTERVAL as DEFAULT_SNAPSHOT_INTERVAL
+from log_setup import setup_logging, shutdown_logging
+from log_setup import DEFAULT_MAX_BYTES as DEFAULT_LOG_MAX_BYTES, DEFAULT_BACKUP_COUNT as DEFAULT_LOG_BACKUPS
 
-# Logging Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Logging Setup (nicht blockierend, siehe log_setup.py; eingerichtet in main())
 logger = logging.getLogger(__name__)
 
 # Konstanten
 DEFAULT_REFRESH_INTERVAL = 15  # Sekunden
 MAX_OFFLINE_TIME = 120  # Sekunden bis "Offline"-Status
-TARGET_FPS = 5  # Frames pro Sekunde (reicht für Textanzeige)
+MAX_FETCH_WORKERS = 8  # Parallele API-Anfragen beim Aktualisieren
 
 
 class AbfahrtMonitor:
@@ -36,7 +45,66 @@ class AbfahrtMonitor:
             config_path: Pfad zur Konfigurationsdatei
         """
         self.config = self._load_config(config_path)
-        self.bvg_client = BVGClient()
+        
+        # Log-Datei (optional), gepuffert und rotierend
+        if self.config.get('logFile') or 'logLevel' in self.config:
+            setup_logging(
+                self.config.get('logFile'),
+                logging.getLevelName(self.config.get('logLevel', 'INFO')),
+                max_bytes=self.config.get('logMaxBytes', DEFAULT_LOG_MAX_BYTES),
+                backup_count=self.config.get('logBackups', DEFAULT_LOG_BACKUPS)
+            )
+        
+        # Optionales Tracing (Chrome-Trace-Format), nur mit traceFile
+        if self.config.get('traceFile'):
+            try:
+                tracer.start(
+                    self.config['traceFile'],
+                    self.config.get('traceMaxBytes', DEFAULT_TRACE_MAX_BYTES),
+                    self.config.get('traceBackups', DEFAULT_BACKUP_COUNT)
+                )
+            except OSError as e:
+                logger.error(f"Tracing nicht möglich: {e}")
+        
+        # Profiler auf Abruf (SIGUSR1 startet/beendet eine Aufnahme)
+        self.profiler = SamplingProfiler(
+            self.config.get('profileDir', DEFAULT_PROFILE_DIR),
+            self.config.get('profileDuration', DEFAULT_DURATION)
+        )
+        install_signal_handler(self.profiler)
+        
+        # Optionale Laufzeit-Metriken (Prometheus), nur mit metricsPort
+        self.metrics: Optional[MonitorMetrics] = None
+        self.metrics_server = None
+        if self.config.get('metricsPort'):
+            self.metrics = MonitorMetrics()
+        
+        cache = None
+        if self.config.get('httpCache', True):
+            cache = open_cache(self.config.get('httpCachePath', DEFAULT_CACHE_PATH))
+        self.bvg_client = BVGClient(
+            RequestGovernor(
+                requests_per_minute=self.config.get('requestsPerMinute', DEFAULT_REQUESTS_PER_MINUTE)
+            ),
+            cache,
+            base_url=self.config.get('apiBaseUrl'),
+            on_request=self.metrics.observe_request if self.metrics else None,
+            on_parse=self.metrics.observe_parse if self.metrics else None
+        )
+        
+        # Filter pro Station: Produkte/Anzahl als API-Parameter, Linien und
+        # Richtungen vor dem Parsen; Anzahl passend zu den angezeigten Zeilen
+        rows = rows_per_station(len(self.config['stations']))
+        self.departure_filters = [
+            DepartureFilter.from_config(station, self.config, rows)
+            for station in self.config['stations']
+        ]
+        
+        # Thread-Pool für paralleles Abrufen (eine Anfrage pro Station)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, min(MAX_FETCH_WORKERS, len(self.config['stations']))),
+            thread_name_prefix='bvg-fetch'
+        )
         
         # Display-Einstellungen
         width = self.config.get('displayWidth', 800)
@@ -44,7 +112,30 @@ class AbfahrtMonitor:
         fullscreen = self.config.get('fullscreen', False)
         test_mode = self.config.get('testMode', False)
         
-        self.display = DisplayManager(width, height, fullscreen, test_mode)
+        self.display = DisplayManager(
+            width, height, fullscreen, test_mode,
+            output_backend=self.config.get('outputBackend', 'sdl'),
+            framebuffer_device=self.config.get('framebufferDevice', DEFAULT_FRAMEBUFFER),
+            on_frame=self.metrics.observe_frame if self.metrics else None
+        )
+        self.fetch_worker: Optional[FetchWorker] = None
+        
+        if self.metrics:
+            self.metrics.watch_display(self.display, IDLE_FPS, MAX_FPS)
+            self.metrics.watch_snapshot_age(lambda: self.display.last_update_time)
+            self.metrics_server = serve_metrics(
+                self.metrics.registry,
+                self.config['metricsPort'],
+                self.config.get('metricsHost', DEFAULT_METRICS_HOST)
+            )
+        
+        # Warmstart: letzter guter Stand auf der Festplatte
+        self.snapshot_store = None
+        if self.config.get('warmStart', True):
+            self.snapshot_store = SnapshotStore(
+                self.config.get('snapshotFile', DEFAULT_SNAPSHOT_PATH),
+                self.config.get('snapshotInterval', DEFAULT_SNAPSHOT_INTERVAL)
+            )
         self.running = True
         
     def _load_config(self, config_path: str) -> Dict:
@@ -77,68 +168,138 @@ class AbfahrtMonitor:
         Returns:
             Liste von Stations-Daten mit Abfahrten (leer bei Fehler)
         """
-        stations_data = []
-        display_lines = self.config.get('displayLines', [])
-        has_error = False
-        
-        for i, station in enumerate(self.config['stations']):
-            station_id = station['id']
-            station_name = station['name']
-            walking_time = station.get('walkingTime', 0)
-            
-            logger.info(f"Hole Abfahrten für {station_name} ({station_id})")
+        results = self.fetch_stations(range(len(self.config['stations'])))
+        return [data for data in results.values() if data is not None]
+    
+    def fetch_stations(self, indices) -> Dict[int, Optional[Dict]]:
+        """
+        Holt Abfahrten für ausgewählte Stationen
+        
+        Args:
+            indices: Indizes der Stationen in der Konfiguration
             
+        Returns:
+            {index: Stations-Daten} in Konfigurationsreihenfolge,
+            None für Stationen, deren Abruf fehlgeschlagen ist
+        """
+        with span('refresh', 'fetch', stations=len(indices)):
+            return self._fetch_stations(indices)
+    
+    def _fetch_stations(self, indices) -> Dict[int, Optional[Dict]]:
+        """Siehe fetch_stations"""
+        stations = [(i, self.config['stations'][i]) for i in indices]
+        
+        if self.config.get('concurrentFetch', True) and len(stations) > 0:
+            # Alle Stationen parallel anfragen (eine Anfrage pro Station)
+            requests_per_station = [
+                self.executor.submit(
+                    self.bvg_client.get_station_board, station['id'],
+                    departure_filter=self.departure_filters[i]
+                )
+                for i, station in stations
+            ]
+        else:
+            requests_per_station = [None] * len(stations)
+        
+        results = {}
+        
+        # Ergebnisse in Konfigurationsreihenfolge einsammeln
+        for (i, station), pending in zip(stations, requests_per_station):
             try:
-                departures = self.bvg_client.get_departures(station_id)
-                disruptions = self.bvg_client.get_disruptions(station_id)
-                
-                # Test-Modus: Füge künstliche Störungen hinzu
-                if self.config.get('testMode', False):
-                    if i == 0:  # Erste Station
-                        disruptions = [{
-                            'type': 'warning',
-                            'summary': 'Ersatzverkehr wegen Bauarbeiten',
-                            'text': 'SEV zwischen Station A und B'
-                        }]
-                    elif i == 1:  # Zweite Station
-                        disruptions = [{
-                            'type': 'status',
-                            'summary': 'Verspätungen möglich',
-                            'text': 'Aufgrund von Signalstörungen'
-                        }]
-                
-                # Filtere nach konfigurierten Linien (falls angegeben)
-                if display_lines:
-                    departures = [d for d in departures if d['line'] in display_lines]
-                
-                stations_data.append({
-                    'id': station_id,
-                    'name': station_name,
-                    'walkingTime': walking_time,
-                    'departures': departures,
-                    'disruptions': disruptions
-                })
+                results[i] = self._fetch_station(i, station, pending)
             except Exception as e:
-                logger.error(f"Fehler beim Abrufen für {station_name}: {e}")
-                has_error = True
+                logger.error(f"Fehler beim Abrufen für {station['name']}: {e}")
+                results[i] = None
+        
+        return results
+    
+    def _fetch_station(self, i: int, station: Dict,
+                       pending: Optional[Future] = None) -> Dict:
+        """
+        Holt bzw. sammelt die Daten einer einzelnen Station ein
+        
+        Args:
+            i: Index der Station in der Konfiguration
+            station: Stations-Konfiguration
+            pending: Bereits gestartete Anfrage oder None für sequentielles Abrufen
+        
+        Returns:
+            Stations-Daten mit Abfahrten und Störungen
+        """
+        station_id = station['id']
+        station_name = station['name']
+        walking_time = station.get('walkingTime', 0)
+        
+        logger.info(f"Hole Abfahrten für {station_name} ({station_id})")
+        
+        if pending is not None:
+            board = pending.result()
+        else:
+            board = self.bvg_client.get_station_board(station_id, departure_filter=self.departure_filters[i])
+        
+        departures = board['departures']
+        disruptions = board['disruptions']
         
-        # Gib leere Liste zurück wenn alle Anfragen fehlgeschlagen sind
-        if has_error and not stations_data:
-            return []
+        # Test-Modus: Füge künstliche Störungen hinzu
+        if self.config.get('testMode', False):
+            if i == 0:  # Erste Station
+                disruptions = [{
+                    'type': 'warning',
+                    'summary': 'Ersatzverkehr wegen Bauarbeiten',
+                    'text': 'SEV zwischen Station A und B'
+                }]
+            elif i == 1:  # Zweite Station
+                disruptions = [{
+                    'type': 'status',
+                    'summary': 'Verspätungen möglich',
+                    'text': 'Aufgrund von Signalstörungen'
+                }]
         
-        return stations_data
+        return {
+            'id': station_id,
+            'name': station_name,
+            'walkingTime': walking_time,
+            'departures': departures,
+            'disruptions': disruptions,
+            'stale': board.get('stale', False)
+        }
     
     def run(self):
         """
         Hauptschleife des Monitors
         
-        - Holt regelmäßig neue Daten von der BVG API
+        - Holt regelmäßig neue Daten von der BVG API (im Hintergrund-Thread)
         - Aktualisiert das Display kontinuierlich
         - Behandelt Fehler graceful
         """
         refresh_interval = self.config.get('refreshInterval', DEFAULT_REFRESH_INTERVAL)
-        last_update = 0
-        stations_data = []
+        stations_data = ()
+        snapshot_version = 0
+        
+        # Abruf läuft im Hintergrund, die Render-Schleife blockiert nie
+        stations = self.config['stations']
+        if self.config.get('fetchDaemon'):
+            # Daten kommen vom gemeinsamen Abruf-Dienst (fetch_daemon.py)
+            self.fetch_worker = DaemonSubscriber(
+                resolve_socket_path(self.config['fetchDaemon']), stations, self.config,
+                rows_per_station(len(stations)),
+                on_publish=self._save_snapshot, on_change=self.display.notify_new_data
+            )
+        else:
+            scheduler = RefreshScheduler(
+                [station.get('walkingTime', 0) for station in stations],
+                refresh_interval,
+                adaptive=self.config.get('adaptiveRefresh', True),
+                min_interval=self.config.get('minRefreshInterval', refresh_interval),
+                max_interval=self.config.get('maxRefreshInterval', DEFAULT_MAX_INTERVAL),
+                visible_count=VISIBLE_STATIONS
+            )
+            self.fetch_worker = FetchWorker(
+                self.fetch_stations, scheduler, len(stations),
+                on_publish=self._save_snapshot, on_change=self.display.notify_new_data
+            )
+        self._restore_snapshot()
+        self.fetch_worker.start()
         
         logger.info("Abfahrtsmonitor gestartet")
         
@@ -148,31 +309,28 @@ class AbfahrtMonitor:
                 if not self.display.handle_events():
                     break
                 
-                # Daten von API aktualisieren
-                current_time = time.time()
-                if current_time - last_update >= refresh_interval:
-                    new_data = self.fetch_departures_for_stations()
-                    if new_data:
-                        stations_data = new_data
-                        self.display.is_live = True
-                        self.display.last_update_time = current_time
-                        logger.info("Daten erfolgreich aktualisiert")
-                    else:
-                        # Keine neuen Daten, aber behalte alte
-                        self.display.is_live = False
-                        logger.warning("Konnte keine neuen Daten abrufen")
-                    last_update = current_time
+                # Neuesten Snapshot übernehmen (falls vorhanden)
+                snapshot = self.fetch_worker.latest()
+                if snapshot.version != snapshot_version:
+                    snapshot_version = snapshot.version
+                    stations_data = snapshot.stations
+                    tracer.instant('new_data', 'render', version=snapshot_version)
+                    self.display.is_live = snapshot.is_live
+                    if snapshot.updated_at:
+                        self.display.last_update_time = snapshot.updated_at
                 
                 # Prüfe ob Daten zu alt sind
+                current_time = time.time()
                 if current_time - self.display.last_update_time > MAX_OFFLINE_TIME:
                     self.display.is_live = False
                 
                 # Display aktualisieren (für Uhrzeit, Countdown, Animationen)
                 if stations_data:
                     self.display.draw_departures(stations_data)
-
-                self.display.tick(TARGET_FPS)
-
+                
+                # Schlafen bis sich etwas Sichtbares ändert (oder neue Daten kommen)
+                self.display.wait_for_next_frame()
+        
         except KeyboardInterrupt:
             logger.info("Abbruch durch Benutzer")
         except Exception as e:
@@ -180,9 +338,40 @@ class AbfahrtMonitor:
         finally:
             self.cleanup()
     
+    def _restore_snapshot(self):
+        """Zeigt sofort den zuletzt gespeicherten Stand an (Warmstart)"""
+        if self.snapshot_store is None:
+            return
+        
+        station_ids = [station['id'] for station in self.config['stations']]
+        restored = self.snapshot_store.load(station_ids)
+        if not restored:
+            return
+        
+        stations, updated_at = restored
+        by_id = {station['id']: station for station in stations}
+        self.fetch_worker.restore(
+            {i: by_id[station_id] for i, station_id in enumerate(station_ids) if station_id in by_id},
+            updated_at
+        )
+    
+    def _save_snapshot(self, snapshot: Snapshot, force: bool = False):
+        """Speichert den aktuellen Stand für den nächsten Start (gedrosselt)"""
+        if self.snapshot_store is not None and snapshot.is_live:
+            self.snapshot_store.save(list(snapshot.stations), snapshot.updated_at, force=force)
+    
     def cleanup(self):
         """Räumt Ressourcen auf"""
         logger.info("Beende Abfahrtsmonitor")
+        if self.fetch_worker:
+            # Erst nach dem Ende des Abruf-Threads speichern (gleiche .tmp-Datei)
+            self.fetch_worker.stop(STOP_TIMEOUT)
+            self._save_snapshot(self.fetch_worker.latest(), force=True)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.metrics_server:
+            self.metrics_server.stop()
+        self.profiler.stop(wait=True)
+        tracer.stop()
         self.display.quit()
 
 
@@ -190,8 +379,12 @@ def main():
     """Einstiegspunkt"""
     config_path = sys.argv[1] if len(sys.argv) > 1 else './config/config.json'
     
-    monitor = AbfahrtMonitor(config_path)
-    monitor.run()
+    setup_logging()
+    try:
+        monitor = AbfahrtMonitor(config_path)
+        monitor.run()
+    finally:
+        shutdown_logging()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,385 @@
+"""
+Laufzeit-Metriken im Prometheus-Textformat
+
+Optionaler HTTP-Endpunkt (Config "metricsPort"), der in einem eigenen
+Thread läuft und unter /metrics Abrufdauer und Statuscodes pro Station,
+Parse-Zeit, Frame-Zeiten, erreichte FPS, Cache-Größen, Alter der Daten
+und den Speicherverbrauch liefert. Ohne zusätzliche Abhängigkeiten
+(kein prometheus_client).
+"""
+import bisect
+import os
+import sys
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_METRICS_HOST = '127.0.0.1'  # Nur lokal erreichbar, sofern nicht anders konfiguriert
+FETCH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # Sekunden
+PARSE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1)
+FRAME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.033, 0.05, 0.1, 0.25)
+FPS_WINDOW = 5.0  # Sekunden, über die die erreichten FPS gemittelt werden
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    Gemeinsame Basis: Name, Hilfetext, Label-Namen und Lock
+    
+    Werte werden entweder im Prozess gepflegt oder beim Abruf über
+    collect() ermittelt (liefert einen Wert oder {Label-Tupel: Wert}).
+    """
+    
+    kind = 'untyped'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 collect: Optional[Callable[[], object]] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+    
+    def _key(self, labels: Dict[str, str]) -> Labels:
+        return tuple(str(labels[name]) for name in self.labelnames)
+    
+    def _current_values(self) -> Optional[Dict[Labels, float]]:
+        """Gepflegte oder per collect() ermittelte Werte (None = nicht verfügbar)"""
+        if self.collect is None:
+            with self._lock:
+                return dict(self._values)
+        try:
+            collected = self.collect()
+        except Exception as e:
+            logger.debug(f"Metrik {self.name} nicht verfügbar: {e}")
+            return None
+        if collected is None:
+            return None
+        return collected if isinstance(collected, dict) else {(): collected}
+    
+    def samples(self) -> Iterable[str]:
+        values = self._current_values()
+        if values is None:
+            return
+        for key, value in sorted(values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+    
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(Metric):
+    """
+    Monoton steigender Zähler
+    
+    Per inc() gezählt oder per collect() aus einem fremden Zähler gelesen
+    (z.B. Treffer eines Caches).
+    """
+    
+    kind = 'counter'
+    
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    Momentaufnahme eines Wertes
+    
+    Entweder per set() gesetzt oder beim Abruf über collect() ermittelt.
+    """
+    
+    kind = 'gauge'
+    
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Verteilung mit festen Bucket-Grenzen"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = FETCH_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Label-Tupel -> [Zähler pro Bucket (nicht kumuliert) + Inf, Summe]
+        self._values: Dict[Labels, list] = {}
+    
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+    
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f'{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}'
+            labels = _format_labels(self.labelnames, key)
+            yield f'{self.name}_sum{labels} {_format_value(total)}'
+            yield f'{self.name}_count{labels} {cumulative}'
+
+
+class MetricsRegistry:
+    """Sammlung von Metriken, die gemeinsam ausgegeben werden"""
+    
+    def __init__(self):
+        self._metrics: List[Metric] = []
+    
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+    
+    def counter(self, *args, **kwargs) -> Counter:
+        return self.register(Counter(*args, **kwargs))
+    
+    def gauge(self, *args, **kwargs) -> Gauge:
+        return self.register(Gauge(*args, **kwargs))
+    
+    def histogram(self, *args, **kwargs) -> Histogram:
+        return self.register(Histogram(*args, **kwargs))
+    
+    def render(self) -> str:
+        """Alle Metriken im Prometheus-Textformat"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Aktueller RSS (Linux), sonst höchster RSS bisher, oder None"""
+    try:
+        with open('/proc/self/statm', 'r', encoding='ascii') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def station_from_url(url: str) -> Tuple[str, str]:
+    """
+    Ordnet eine API-URL einem Endpunkt und ggf. einer Station zu
+    
+    Returns:
+        (Endpunkt, Stations-ID oder '')
+    """
+    parts = urlsplit(url).path.strip('/').split('/')
+    if len(parts) >= 2 and parts[0] == 'stops':
+        return ('departures' if parts[-1] == 'departures' else 'stop'), parts[1]
+    return (parts[-1] or 'other'), ''
+
+
+class MonitorMetrics:
+    """
+    Metriken des Abfahrtsmonitors
+    
+    Die observe_*-Methoden werden als Callbacks an BVGClient und
+    DisplayManager übergeben und dürfen aus beliebigen Threads kommen.
+    """
+    
+    def __init__(self, registry: Optional[MetricsRegistry] = None):
+        self.registry = registry or MetricsRegistry()
+        r = self.registry
+        
+        self.fetch_duration = r.histogram(
+            'bvg_fetch_duration_seconds', 'Dauer der API-Anfragen', ('endpoint', 'station'), FETCH_BUCKETS
+        )
+        self.fetch_responses = r.counter(
+            'bvg_fetch_responses_total',
+            'API-Antworten nach Status (HTTP-Code, timeout, error, cached, circuit_open, no_budget)',
+            ('endpoint', 'station', 'status')
+        )
+        self.parse_duration = r.histogram(
+            'bvg_parse_duration_seconds', 'Dauer der Dekodierung einer Abfahrtstafel', (), PARSE_BUCKETS
+        )
+        self.frame_duration = r.histogram(
+            'bvg_frame_duration_seconds', 'Renderzeit pro Frame', (), FRAME_BUCKETS
+        )
+        self.frames = r.counter('bvg_frames_total', 'Gezeichnete Frames')
+        self.fps = r.gauge('bvg_fps', f'Erreichte Frames pro Sekunde (Mittel über {FPS_WINDOW:.0f}s)')
+        self.fps_limit = r.gauge('bvg_fps_limit', 'Frame-Rate-Grenzen der Anzeige', ('bound',))
+        self.cache_bytes = r.gauge('bvg_cache_bytes', 'Belegter Speicher der Surface-Caches', ('cache',))
+        self.cache_entries = r.gauge('bvg_cache_entries', 'Einträge der Surface-Caches', ('cache',))
+        self.cache_events = r.counter(
+            'bvg_cache_events_total', 'Treffer, Fehlschläge und Verdrängungen der Surface-Caches',
+            ('cache', 'event')
+        )
+        self.damaged_ratio = r.gauge(
+            'bvg_damaged_ratio', 'Durchschnittlich ausgegebener Anteil des Bildschirms pro Frame'
+        )
+        self.snapshot_age = r.gauge('bvg_snapshot_age_seconds', 'Alter der angezeigten Daten')
+        self.rss = r.gauge(
+            'process_resident_memory_bytes', 'Speicherverbrauch des Prozesses (RSS)',
+            collect=resident_memory_bytes
+        )
+        
+        self._fps_lock = threading.Lock()
+        self._fps_window_start = time.monotonic()
+        self._fps_window_frames = 0
+    
+    def observe_request(self, url: str, status: str, seconds: Optional[float]):
+        """
+        Eine API-Anfrage (Callback von BVGClient)
+        
+        Args:
+            url: Angefragte URL
+            status: HTTP-Code oder timeout/error/cached/circuit_open/no_budget
+            seconds: Dauer, None wenn keine Anfrage gesendet wurde
+        """
+        endpoint, station = station_from_url(url)
+        self.fetch_responses.inc(endpoint=endpoint, station=station, status=status)
+        if seconds is not None:
+            self.fetch_duration.observe(seconds, endpoint=endpoint, station=station)
+    
+    def observe_parse(self, seconds: float):
+        """Dekodierung einer Abfahrtstafel (Callback von BVGClient)"""
+        self.parse_duration.observe(seconds)
+    
+    def observe_frame(self, seconds: float):
+        """Ein gezeichneter Frame (Callback von DisplayManager)"""
+        self.frame_duration.observe(seconds)
+        self.frames.inc()
+        
+        now = time.monotonic()
+        with self._fps_lock:
+            self._fps_window_frames += 1
+            elapsed = now - self._fps_window_start
+            if elapsed >= FPS_WINDOW:
+                self.fps.set(self._fps_window_frames / elapsed)
+                self._fps_window_start = now
+                self._fps_window_frames = 0
+    
+    def watch_display(self, display, idle_fps: float, max_fps: float):
+        """Liest Cache- und Damage-Statistik des DisplayManagers beim Abruf"""
+        self.fps_limit.set(idle_fps, bound='idle')
+        self.fps_limit.set(max_fps, bound='max')
+        
+        def cache_values(field: str) -> Callable[[], Dict[Labels, float]]:
+            return lambda: {(name,): stats[field] for name, stats in display.cache_stats().items()}
+        
+        def cache_events() -> Dict[Labels, float]:
+            return {
+                (name, event): stats[event]
+                for name, stats in display.cache_stats().items()
+                for event in ('hits', 'misses', 'evictions')
+            }
+        
+        self.cache_bytes.collect = cache_values('bytes')
+        self.cache_entries.collect = cache_values('entries')
+        self.cache_events.collect = cache_events
+        self.damaged_ratio.collect = lambda: display.damage.stats()['avg_damaged_ratio']
+    
+    def watch_snapshot_age(self, updated_at: Callable[[], Optional[float]]):
+        """
+        Args:
+            updated_at: Liefert den Zeitpunkt der letzten Aktualisierung
+                (time.time()) oder None, solange es keine Daten gibt
+        """
+        def age() -> Optional[float]:
+            timestamp = updated_at()
+            return None if timestamp is None else max(0.0, time.time() - timestamp)
+        
+        self.snapshot_age.collect = age
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Liefert /metrics aus"""
+    
+    def do_GET(self):
+        if urlsplit(self.path).path not in ('/metrics', '/'):
+            self.send_error(404)
+            return
+        body = self.server.registry.render().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP-Server für /metrics in einem Hintergrund-Thread"""
+    
+    daemon_threads = True
+    
+    def __init__(self, registry: MetricsRegistry, port: int, host: str = DEFAULT_METRICS_HOST):
+        super().__init__((host, port), _MetricsHandler)
+        self.registry = registry
+        self._thread = threading.Thread(target=self.serve_forever, name='metrics', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def serve_metrics(registry: MetricsRegistry, port: int,
+                  host: str = DEFAULT_METRICS_HOST) -> Optional[MetricsServer]:
+    """
+    Startet den Metrik-Endpunkt
+    
+    Returns:
+        Laufender Server oder None, wenn der Port nicht belegt werden kann
+    """
+    try:
+        server = MetricsServer(registry, port, host)
+    except OSError as e:
+        logger.error(f"Metrik-Endpunkt auf {host}:{port} nicht verfügbar: {e}")
+        return None
+    logger.info(f"Metriken unter http://{host}:{port}/metrics")
+    return server
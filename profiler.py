@@ -0,0 +1,186 @@
+"""
+Profiler auf Abruf per Signal
+
+Ein laufender Monitor lässt sich ohne Neustart profilieren:
+
+    kill -USR1 <pid>    # Aufnahme starten (endet nach profileDuration)
+    kill -USR1 <pid>    # vorzeitig beenden
+
+Alle Threads (Haupt-Schleife, Abruf-Worker, Snapshot-Speicher) werden in
+festen Abständen abgetastet. Das Ergebnis wird als "collapsed stacks"
+gespeichert (eine Zeile pro Stack mit Anzahl), direkt lesbar mit
+flamegraph.pl, speedscope.app oder inferno:
+
+    flamegraph.pl profiles/profile-20240101-120000.folded > flame.svg
+
+cProfile wäre hier ungeeignet: es erfasst nur den Thread, in dem es
+gestartet wurde, und bremst jeden Funktionsaufruf.
+"""
+import os
+import signal
+import sys
+import threading
+import time
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_PROFILE_DIR = 'profiles'  # Zielverzeichnis der Profile
+DEFAULT_DURATION = 30.0  # Sekunden, danach endet die Aufnahme von selbst
+MAX_DURATION = 600.0  # Obergrenze für profileDuration
+SAMPLE_INTERVAL = 0.01  # Sekunden zwischen zwei Stichproben (100 Hz)
+MAX_STACK_DEPTH = 64  # Tiefere Stacks werden unten abgeschnitten
+PROFILE_SIGNAL = getattr(signal, 'SIGUSR1', None)  # Nicht auf Windows
+
+
+class SamplingProfiler:
+    """
+    Tastet die Stacks aller Threads ab, solange eine Aufnahme läuft
+    
+    Die Aufnahme läuft in einem eigenen Thread; der Signal-Handler startet
+    oder beendet sie nur und kehrt sofort zurück.
+    """
+    
+    def __init__(self, directory: str = DEFAULT_PROFILE_DIR,
+                 duration: float = DEFAULT_DURATION,
+                 interval: float = SAMPLE_INTERVAL):
+        """
+        Args:
+            directory: Verzeichnis für die Profil-Dateien
+            duration: Maximale Dauer einer Aufnahme in Sekunden
+            interval: Abstand der Stichproben in Sekunden
+        """
+        self.directory = Path(directory)
+        self.duration = min(duration, MAX_DURATION)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def active(self) -> bool:
+        """True, solange eine Aufnahme läuft"""
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> bool:
+        """
+        Startet eine Aufnahme
+        
+        Returns:
+            False, wenn bereits eine Aufnahme läuft
+        """
+        with self._lock:
+            if self.active:
+                return False
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='profiler', daemon=True)
+            self._thread.start()
+            return True
+    
+    def stop(self, wait: bool = False):
+        """
+        Beendet eine laufende Aufnahme vorzeitig (das Profil wird geschrieben)
+        
+        Args:
+            wait: Auf das Schreiben der Datei warten
+        """
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=5)
+    
+    def toggle(self):
+        """Startet eine Aufnahme oder beendet die laufende"""
+        if not self.start():
+            logger.info("Profiler: Aufnahme wird vorzeitig beendet")
+            self.stop()
+    
+    def _run(self):
+        """Aufnahme-Schleife (eigener Thread)"""
+        logger.info(f"Profiler: Aufnahme gestartet (max. {self.duration:.0f}s)")
+        own_id = threading.get_ident()
+        stacks: Counter = Counter()
+        samples = 0
+        started = time.monotonic()
+        deadline = started + self.duration
+        
+        while not self._stop.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stacks[_collapse(names.get(thread_id, str(thread_id)), frame)] += 1
+            samples += 1
+            self._stop.wait(self.interval)
+        
+        elapsed = time.monotonic() - started
+        try:
+            path = self._write(stacks)
+            logger.info(
+                f"Profiler: {samples} Stichproben in {elapsed:.1f}s nach {path} geschrieben"
+            )
+        except OSError as e:
+            logger.error(f"Profiler: Profil konnte nicht geschrieben werden: {e}")
+    
+    def _write(self, stacks: Counter) -> Path:
+        """Schreibt die Stacks atomar (temporäre Datei, dann umbenennen)"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"profile-{datetime.now():%Y%m%d-%H%M%S}.folded"
+        temp_path = path.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        os.replace(temp_path, path)
+        return path
+
+
+def _collapse(thread_name: str, frame) -> str:
+    """
+    Wandelt einen Stack in eine Zeile im collapsed-Format
+    
+    Wurzel ist der Thread-Name, danach die Funktionen von außen nach innen
+    als "datei:funktion". Semikolons und Leerzeichen trennen im Format
+    Ebenen bzw. Anzahl und werden daher ersetzt.
+    """
+    parts = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    parts.append(thread_name)
+    parts.reverse()
+    return ';'.join(part.replace(';', ',').replace(' ', '_') for part in parts)
+
+
+def install_signal_handler(profiler: SamplingProfiler, signum: Optional[int] = PROFILE_SIGNAL) -> bool:
+    """
+    Verknüpft das Signal mit profiler.toggle()
+    
+    Muss im Haupt-Thread aufgerufen werden.
+    
+    Args:
+        profiler: Profiler, der gestartet/beendet wird
+        signum: Signal (Standard: SIGUSR1)
+    
+    Returns:
+        False, wenn das Signal auf dieser Plattform nicht verfügbar ist
+    """
+    if signum is None:
+        logger.info("Profiler: kein SIGUSR1 auf dieser Plattform, Aufnahme per Signal nicht möglich")
+        return False
+    try:
+        signal.signal(signum, lambda received, frame: profiler.toggle())
+    except ValueError as e:
+        # Nicht im Haupt-Thread
+        logger.warning(f"Profiler: Signal-Handler nicht installiert: {e}")
+        return False
+    logger.info(
+        f"Profiler bereit: kill -{signal.Signals(signum).name[3:]} {os.getpid()} "
+        f"startet eine Aufnahme nach {profiler.directory}/"
+    )
+    return True
@@ -0,0 +1,168 @@
+"""
+Request-Budget für die BVG REST API
+
+Token-Bucket, der das Rate-Limit der API (pro IP) über alle Threads und
+alle Prozesse auf demselben Rechner einhält. Der Zustand liegt in einer
+kleinen Datei, die per Datei-Lock geschützt wird.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: nur prozessweite Koordination
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_REQUESTS_PER_MINUTE = 100  # Rate-Limit von transport.rest
+DEFAULT_BURST = 20  # Maximal angesparte Anfragen
+DEFAULT_STATE_FILE = os.path.join(tempfile.gettempdir(), 'bvg_request_budget.json')
+SEARCH_RESERVE = 0.25  # Anteil des Budgets, der für Abfahrten reserviert bleibt
+
+# Prioritäten (kleiner = wichtiger)
+PRIORITY_DEPARTURES = 0
+PRIORITY_SEARCH = 1
+
+
+class RequestGovernor:
+    """
+    Token-Bucket mit Prioritäten
+    
+    Abfahrten dürfen das komplette Budget nutzen, Stationssuchen nur den
+    Teil oberhalb der Reserve. So verdrängt eine Suche im TUI nie die
+    Aktualisierung der Anzeige.
+    """
+    
+    def __init__(self, requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+                 burst: int = DEFAULT_BURST, state_file: Optional[str] = DEFAULT_STATE_FILE):
+        """
+        Args:
+            requests_per_minute: Erlaubte Anfragen pro Minute (für alle Prozesse)
+            burst: Größe des Buckets
+            state_file: Gemeinsame Zustandsdatei (None = nur dieser Prozess)
+        """
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(burst)
+        self.state_file = state_file if fcntl is not None else None
+        self._lock = threading.Lock()
+        self._local_state = {'tokens': self.capacity, 'updated': time.time()}
+    
+    def acquire(self, priority: int = PRIORITY_DEPARTURES, timeout: float = 10.0) -> bool:
+        """
+        Wartet auf ein freies Token
+        
+        Args:
+            priority: PRIORITY_DEPARTURES oder PRIORITY_SEARCH
+            timeout: Maximale Wartezeit in Sekunden
+        
+        Returns:
+            True wenn die Anfrage gesendet werden darf
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._try_acquire(priority)
+            if wait <= 0:
+                return True
+            
+            # Reicht die Zeit nicht (z.B. nach einer 429-Sperre), nicht
+            # vergeblich bis zum Timeout schlafen
+            remaining_time = deadline - time.monotonic()
+            if wait > remaining_time:
+                logger.warning(f"Request-Budget erschöpft (Priorität {priority})")
+                return False
+            time.sleep(wait)
+    
+    def remaining(self) -> float:
+        """Aktuell verfügbare Anfragen (für alle Prozesse)"""
+        with self._state(write=False) as state:
+            return max(0.0, self._available(state))
+    
+    def penalize(self, seconds: float):
+        """
+        Sperrt das Budget nach einer 429-Antwort für alle Prozesse
+        
+        Args:
+            seconds: Wartezeit laut Retry-After
+        """
+        with self._state() as state:
+            self._refill(state)
+            state['tokens'] = min(state['tokens'], 0.0) - seconds * self.rate
+        logger.warning(f"Rate-Limit erreicht, pausiere Anfragen für {seconds:.0f}s")
+    
+    def _try_acquire(self, priority: int) -> float:
+        """Nimmt ein Token oder gibt die Wartezeit bis zum nächsten zurück"""
+        reserve = self.capacity * SEARCH_RESERVE if priority >= PRIORITY_SEARCH else 0.0
+        
+        with self._state() as state:
+            self._refill(state)
+            if state['tokens'] - 1.0 >= reserve:
+                state['tokens'] -= 1.0
+                return 0.0
+            missing = reserve + 1.0 - state['tokens']
+        
+        return missing / self.rate
+    
+    def _available(self, state: Dict, now: Optional[float] = None) -> float:
+        """Tokens zum Zeitpunkt now (ohne den Zustand zu ändern)"""
+        elapsed = max(0.0, (now or time.time()) - state['updated'])
+        return min(self.capacity, state['tokens'] + elapsed * self.rate)
+    
+    def _refill(self, state: Dict):
+        """Füllt den Bucket entsprechend der vergangenen Zeit auf"""
+        now = time.time()
+        state['tokens'] = self._available(state, now)
+        state['updated'] = now
+    
+    @contextmanager
+    def _state(self, write: bool = True) -> Iterator[Dict]:
+        """
+        Liest (und schreibt) den gemeinsamen Zustand unter Lock
+        
+        Args:
+            write: False = nur lesen (geteilter Lock, die Datei bleibt
+                unverändert; Änderungen am Zustand werden verworfen)
+        """
+        with self._lock:
+            if self.state_file is None:
+                yield self._local_state if write else dict(self._local_state)
+                return
+            
+            try:
+                f = open(self.state_file, 'a+' if write else 'r', encoding='utf-8')
+            except FileNotFoundError:
+                # Noch keine Anfrage auf diesem Rechner: voller Bucket
+                yield {'tokens': self.capacity, 'updated': time.time()}
+                return
+            except OSError as e:
+                logger.warning(f"Budget-Datei nicht nutzbar, nur lokal: {e}")
+                self.state_file = None
+                yield self._local_state if write else dict(self._local_state)
+                return
+            
+            with f:
+                fcntl.flock(f, fcntl.LOCK_EX if write else fcntl.LOCK_SH)
+                try:
+                    f.seek(0)
+                    try:
+                        state = json.loads(f.read())
+                    except ValueError:
+                        state = {'tokens': self.capacity, 'updated': time.time()}
+                    
+                    yield state
+                    
+                    if write:
+                        f.seek(0)
+                        f.truncate()
+                        f.write(json.dumps(state))
+                        f.flush()
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,164 @@
+"""
+Warmstart-Snapshot der Abfahrtsdaten
+
+Speichert den letzten erfolgreichen Stand kompakt auf der Festplatte, damit
+nach einem Neustart sofort etwas angezeigt werden kann - noch bevor das
+Netzwerk verfügbar ist. Schreibvorgänge werden gedrosselt, um die SD-Karte
+zu schonen.
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+import logging
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from bvg_api import Departure, minutes_until
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+SNAPSHOT_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'bvg_monitor')
+DEFAULT_SNAPSHOT_PATH = os.path.join(SNAPSHOT_DIR, 'snapshot.bin')
+DEFAULT_MIN_INTERVAL = 60  # Sekunden zwischen zwei Schreibvorgängen
+MAGIC = b'BVGS'
+FORMAT_VERSION = 2
+HEADER = struct.Struct('<4sBd')  # Magic, Version, updated_at
+
+
+def encode_snapshot(stations: List[Dict], updated_at: float) -> bytes:
+    """
+    Kodiert Stations-Daten in das kompakte Binärformat
+    
+    Header (Magic, Version, Zeitstempel) gefolgt von zlib-komprimiertem
+    JSON; Abfahrten werden als Listen mit Unix-Zeitstempel abgelegt.
+    """
+    payload = []
+    for station in stations:
+        station = dict(station)
+        station['departures'] = [
+            [dep.line, dep.direction, dep.product, dep.when.timestamp(), dep.delay]
+            for dep in station.get('departures', [])
+        ]
+        payload.append(station)
+    
+    body = zlib.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'), 9)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, updated_at) + body
+
+
+def decode_snapshot(data: bytes) -> Tuple[List[Dict], float]:
+    """
+    Dekodiert einen Snapshot (Gegenstück zu encode_snapshot)
+    
+    Raises:
+        ValueError: Bei unbekanntem Format oder beschädigten Daten
+    """
+    magic, version, updated_at = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Unbekanntes Snapshot-Format ({magic!r}, v{version})")
+    
+    stations = json.loads(zlib.decompress(data[HEADER.size:]))
+    for station in stations:
+        station['departures'] = [
+            Departure(line, direction, product, datetime.fromtimestamp(when), delay)
+            for line, direction, product, when, delay in station['departures']
+        ]
+    return stations, updated_at
+
+
+class SnapshotStore:
+    """Speichert und lädt den letzten guten Stand der Abfahrtsdaten"""
+    
+    def __init__(self, path: str = DEFAULT_SNAPSHOT_PATH, min_interval: float = DEFAULT_MIN_INTERVAL):
+        """
+        Args:
+            path: Zieldatei
+            min_interval: Mindestabstand zwischen zwei Schreibvorgängen in Sekunden
+        """
+        self.path = path
+        self.min_interval = min_interval
+        self._last_write = 0.0
+        self._last_digest = None
+        self._lock = threading.Lock()  # Abruf-Thread und Beenden schreiben dieselbe .tmp-Datei
+    
+    def save(self, stations: List[Dict], updated_at: float, force: bool = False) -> bool:
+        """
+        Schreibt einen Snapshot (gedrosselt, nur bei geänderten Daten)
+        
+        Args:
+            stations: Stations-Daten
+            updated_at: Zeitpunkt der Aktualisierung
+            force: Drosselung ignorieren (z.B. beim Beenden)
+        
+        Returns:
+            True wenn geschrieben wurde
+        """
+        with self._lock:
+            return self._save(stations, updated_at, force)
+    
+    def _save(self, stations: List[Dict], updated_at: float, force: bool) -> bool:
+        now = time.time()
+        if not stations or (not force and now - self._last_write < self.min_interval):
+            return False
+        
+        try:
+            data = encode_snapshot(stations, updated_at)
+            digest = hashlib.sha1(data[HEADER.size:]).digest()
+            if digest == self._last_digest:
+                return False
+            
+            # Atomar ersetzen, damit ein Stromausfall keine halbe Datei hinterlässt
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+            
+            self._last_write = now
+            self._last_digest = digest
+            logger.debug(f"Snapshot gespeichert ({len(data)} Bytes)")
+            return True
+        
+        except (OSError, AttributeError, TypeError, ValueError) as e:
+            logger.warning(f"Snapshot konnte nicht gespeichert werden: {e}")
+            return False
+    
+    def load(self, station_ids: Optional[List[str]] = None) -> Optional[Tuple[List[Dict], float]]:
+        """
+        Lädt den letzten Snapshot
+        
+        Bereits abgefahrene Verbindungen werden verworfen, die Stationen
+        sind als veraltet ('stale') markiert.
+        
+        Args:
+            station_ids: Nur diese Stationen übernehmen (None = alle)
+        
+        Returns:
+            (Stations-Daten, updated_at) oder None wenn kein Snapshot vorliegt
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                stations, updated_at = decode_snapshot(f.read())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError, struct.error, zlib.error) as e:
+            logger.warning(f"Snapshot konnte nicht geladen werden: {e}")
+            return None
+        
+        now = datetime.now()
+        restored = []
+        for station in stations:
+            if station_ids is not None and station.get('id') not in station_ids:
+                continue
+            station['departures'] = [
+                dep for dep in station['departures'] if minutes_until(dep.when, now) >= 0
+            ]
+            station['stale'] = True
+            restored.append(station)
+        
+        logger.info(f"Snapshot geladen: {len(restored)} Stationen")
+        return restored, updated_at
@@ -0,0 +1,153 @@
+"""
+Sprite-Atlas für das Display
+
+Hält vorgerenderte Surfaces für alles, was sich von Frame zu Frame ändert,
+aber aus wenigen Bausteinen besteht: Linien-Badges, Minutenangaben
+(0-99 plus "jetzt") in allen Statusfarben, Verspätungen sowie die Ziffern
+von Uhr und Aktualisierungsalter. Ein Frame besteht damit nur noch aus
+Blits, ohne Schrift-Rasterisierung.
+"""
+import pygame
+import logging
+from typing import Callable, Dict, Iterable, Tuple
+
+logger = logging.getLogger(__name__)
+
+Color = Tuple[int, int, int]
+
+# Konstanten
+MAX_NUMERAL = 99  # Minutenangaben 0..99 werden vorab gerendert
+BADGE_RADIUS = 8  # Eckenradius der Linien-Badges
+CLOCK_CHARSET = '0123456789:'
+AGE_CHARSET = '0123456789vors '  # "vor 15s"
+
+
+class GlyphStrip:
+    """
+    Einzeln vorgerenderte Zeichen einer Schrift in einer Farbe
+    
+    Texte aus diesen Zeichen (Uhrzeit, "vor 15s") werden Zeichen für
+    Zeichen geblittet statt jedes Mal komplett gerendert.
+    """
+    
+    def __init__(self, font: pygame.font.Font, color: Color, charset: str):
+        self.height = font.get_height()
+        self.glyphs = {char: font.render(char, True, color).convert_alpha() for char in charset}
+    
+    def width(self, text: str) -> int:
+        """Breite eines Textes in Pixeln"""
+        return sum(self.glyphs[char].get_width() for char in text)
+    
+    def blit(self, surface: pygame.Surface, text: str, pos: Tuple[int, int]) -> pygame.Rect:
+        """
+        Zeichnet einen Text aus den vorgerenderten Zeichen
+        
+        Returns:
+            Bereich, der gezeichnet wurde
+        """
+        x, y = pos
+        for char in text:
+            glyph = self.glyphs[char]
+            surface.blit(glyph, (x, y))
+            x += glyph.get_width()
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+class SpriteAtlas:
+    """
+    Vorgerenderte Bausteine für Abfahrtszeilen und Statusanzeige
+    
+    Minutenangaben und Uhrziffern werden beim Start gerendert, Badges und
+    Verspätungen beim ersten Auftreten (die Menge ist durch Linien bzw.
+    Minuten begrenzt). Alle Surfaces liegen im Pixelformat des Displays.
+    """
+    
+    def __init__(self, fonts: Dict[str, pygame.font.Font], numeral_colors: Iterable[Color],
+                 text_color: Color, clock_color: Color, age_color: Color,
+                 product_icon: Callable[[str], Tuple[str, Color]]):
+        """
+        Args:
+            fonts: Schriften 'numeral', 'badge_line', 'badge_icon', 'delay',
+                'clock' und 'age'
+            numeral_colors: Farben, in denen Minutenangaben vorkommen
+            text_color: Schriftfarbe in den Badges
+            clock_color: Farbe der Uhrzeit
+            age_color: Farbe des Aktualisierungsalters
+            product_icon: Liefert (Beschriftung, Farbe) für einen Produkttyp
+        """
+        self.fonts = fonts
+        self.text_color = text_color
+        self.product_icon = product_icon
+        
+        self._numerals: Dict[Tuple[str, Color], pygame.Surface] = {}
+        self._badges: Dict[Tuple[str, str, int], pygame.Surface] = {}
+        self._delays: Dict[Tuple[str, Color], pygame.Surface] = {}
+        
+        for color in numeral_colors:
+            self._numerals[('jetzt', color)] = self._render(fonts['numeral'], 'jetzt', color)
+            for minutes in range(MAX_NUMERAL + 1):
+                label = f"{minutes}'"
+                self._numerals[(label, color)] = self._render(fonts['numeral'], label, color)
+        
+        self.clock = GlyphStrip(fonts['clock'], clock_color, CLOCK_CHARSET)
+        self.age = GlyphStrip(fonts['age'], age_color, AGE_CHARSET)
+        
+        logger.debug(f"Sprite-Atlas: {len(self._numerals)} Minutenangaben vorgerendert")
+    
+    @staticmethod
+    def _render(font: pygame.font.Font, text: str, color: Color) -> pygame.Surface:
+        """Rendert einen Text im Pixelformat des Displays"""
+        return font.render(text, True, color).convert_alpha()
+    
+    def countdown(self, label: str, color: Color) -> pygame.Surface:
+        """
+        Minutenangabe ("5'" oder "jetzt")
+        
+        Angaben außerhalb von 0..99 werden beim ersten Auftreten ergänzt.
+        """
+        key = (label, color)
+        surface = self._numerals.get(key)
+        if surface is None:
+            surface = self._numerals[key] = self._render(self.fonts['numeral'], label, color)
+        return surface
+    
+    def delay(self, label: str, color: Color) -> pygame.Surface:
+        """Verspätungsangabe (z.B. "(+3)")"""
+        key = (label, color)
+        surface = self._delays.get(key)
+        if surface is None:
+            surface = self._delays[key] = self._render(self.fonts['delay'], label, color)
+        return surface
+    
+    def badge(self, product: str, line: str, size: int) -> pygame.Surface:
+        """
+        Produkt-Badge (Icon + Linie) mit abgerundeten Ecken
+        
+        Args:
+            product: Produkttyp (subway, bus, etc.)
+            line: Liniennummer
+            size: Kantenlänge in Pixeln
+        """
+        key = (product, line, size)
+        badge = self._badges.get(key)
+        if badge is None:
+            badge = self._badges[key] = self._build_badge(product, line, size)
+        return badge
+    
+    def _build_badge(self, product: str, line: str, size: int) -> pygame.Surface:
+        """Rendert ein Badge (transparente Ecken)"""
+        icon_text, color = self.product_icon(product)
+        badge = pygame.Surface((size, size), pygame.SRCALPHA)
+        
+        # Badge-Hintergrund
+        pygame.draw.rect(badge, color, badge.get_rect(), border_radius=BADGE_RADIUS)
+        
+        # Icon (oben im Badge)
+        icon_surface = self.fonts['badge_icon'].render(icon_text, True, self.text_color)
+        badge.blit(icon_surface, icon_surface.get_rect(centerx=size // 2, top=4))
+        
+        # Liniennummer (unten im Badge)
+        line_surface = self.fonts['badge_line'].render(line, True, self.text_color)
+        badge.blit(line_surface, line_surface.get_rect(centerx=size // 2, bottom=size - 4))
+        
+        return badge.convert_alpha()
@@ -0,0 +1,604 @@
+#!/usr/bin/env python3
+"""
+Lokaler Ersatz für die BVG REST API
+
+Beantwortet die Endpunkte, die der Monitor benutzt (/stops/{id}/departures,
+/stops/{id} und /locations), ohne Netzwerkzugriff:
+
+- Synthetisch: realistische Abfahrtstafeln in konfigurierbarer Größe
+  (innerhalb einer Minute pro Station stabil, danach neu gewürfelt)
+- Aufnahme: leitet Anfragen an die echte API weiter und speichert die
+  Antworten in einem Verzeichnis
+- Wiedergabe: liefert gespeicherte Antworten aus, Abfahrtszeiten werden
+  dabei auf die aktuelle Zeit verschoben
+
+Zusätzlich lassen sich Latenz, Jitter, 429, 5xx und Timeouts einstreuen.
+Unter /_stats gibt es Zähler für alle Anfragen.
+
+Aufruf:
+    python stub_server.py --port 3000 --departures 60 --latency 80 --jitter 40 --error-rate 0.05
+    python stub_server.py --record recordings/ --upstream https://v6.bvg.transport.rest
+    python stub_server.py --replay recordings/
+
+Monitor gegen den Server starten:
+    BVG_API_BASE_URL=http://127.0.0.1:3000 python main.py
+    (oder "apiBaseUrl": "http://127.0.0.1:3000" in der Config)
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import logging
+import urllib.error
+import urllib.request
+from collections import Counter
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from bvg_api import API_BASE_URL, API_TIMEOUT, PRODUCTS
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_PORT = 3000
+DEFAULT_BOARD_SIZE = 60  # Abfahrten pro Tafel (vor 'results')
+DEFAULT_RETRY_AFTER = 5  # Sekunden im Retry-After-Header bei 429
+SERVER_ERRORS = (500, 502, 503)
+IGNORED_PARAMS = ('pretty',)  # Für den Aufnahme-Schlüssel ohne Bedeutung
+
+# Bekannte Haltestellen (für Namen und /locations)
+STOPS = {
+    '900100003': 'S+U Alexanderplatz',
+    '900003201': 'S+U Berlin Hauptbahnhof',
+    '900100001': 'S+U Friedrichstr.',
+    '900120003': 'S Ostkreuz',
+    '900023201': 'S+U Zoologischer Garten',
+    '900007102': 'S+U Gesundbrunnen',
+    '900100023': 'U Rosenthaler Platz',
+    '900110001': 'S+U Schönhauser Allee',
+}
+
+# (Linie, Produkt, Richtungen)
+LINES = [
+    ('U2', 'subway', ['S+U Pankow', 'U Ruhleben']),
+    ('U5', 'subway', ['S+U Hauptbahnhof', 'U Hönow']),
+    ('U8', 'subway', ['S+U Wittenau', 'U Hermannstr.']),
+    ('S5', 'suburban', ['S Strausberg Nord', 'S Westkreuz']),
+    ('S7', 'suburban', ['S Ahrensfelde', 'S Potsdam Hauptbahnhof']),
+    ('S41', 'suburban', ['Ringbahn S 41']),
+    ('M2', 'tram', ['S+U Hackescher Markt', 'Am Steinberg']),
+    ('M10', 'tram', ['S+U Hauptbahnhof', 'S+U Warschauer Str.']),
+    ('142', 'bus', ['S Ostbahnhof', 'Leopoldplatz']),
+    ('200', 'bus', ['S+U Zoologischer Garten', 'Michelangelostr.']),
+    ('N5', 'bus', ['S+U Hauptbahnhof', 'U Hönow']),
+    ('RE1', 'regional', ['Frankfurt (Oder)', 'Magdeburg Hbf']),
+]
+
+# Zwischenhalte für lange Richtungsangaben (siehe BoardSynthesizer)
+VIA_STOPS = [
+    'Nordbahnhof', 'Bernauer Str.', 'Eberswalder Str.', 'Prenzlauer Allee',
+    'Greifswalder Str.', 'Landsberger Allee', 'Storkower Str.', 'Frankfurter Allee',
+]
+
+STATION_WARNINGS = [
+    'Aufzug außer Betrieb',
+    'Bauarbeiten: Ersatzverkehr mit Bussen',
+    'Verspätungen wegen eines Polizeieinsatzes',
+]
+
+
+class BoardSynthesizer:
+    """
+    Erzeugt Antworten im Format der BVG REST API v6
+    
+    Jede Station bekommt (abhängig von ihrer ID) feste Linien und ggf. eine
+    Störungsmeldung. Die Abfahrten werden pro Minute neu gewürfelt.
+    """
+    
+    def __init__(self, board_size: int = DEFAULT_BOARD_SIZE, seed: int = 0,
+                 direction_length: int = 0):
+        """
+        Args:
+            board_size: Abfahrten pro Tafel (begrenzt durch 'results')
+            seed: Startwert für den Zufallsgenerator
+            direction_length: Richtungen mindestens so lang machen
+                ("... über A, B, C"), z.B. um Scrollen zu testen
+        """
+        self.board_size = board_size
+        self.seed = seed
+        self.direction_length = direction_length
+    
+    def _station_random(self, station_id: str, *salt) -> random.Random:
+        """Zufallsgenerator, der nur von Station (und salt) abhängt"""
+        digest = hashlib.sha1(repr((self.seed, station_id) + salt).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+    
+    def _station_lines(self, station_id: str) -> List[Tuple[str, str, List[str]]]:
+        return self._station_random(station_id).sample(LINES, 5)
+    
+    def _station_warning(self, station_id: str) -> Optional[Dict]:
+        rng = self._station_random(station_id, 'warning')
+        if rng.random() >= 0.3:
+            return None
+        summary = rng.choice(STATION_WARNINGS)
+        return {
+            'id': f'{station_id}-{rng.randrange(10 ** 6)}',
+            'type': 'warning',
+            'summary': summary,
+            'text': f'{summary}. Bitte planen Sie mehr Zeit ein.',
+        }
+    
+    def departures(self, station_id: str, duration: int, results: int,
+                   excluded_products: frozenset = frozenset()) -> Dict:
+        """Antwort von /stops/{id}/departures (ohne Produkte mit <produkt>=false)"""
+        now = datetime.now().astimezone().replace(microsecond=0)
+        minute = now.replace(second=0)
+        rng = self._station_random(station_id, minute.isoformat())
+        lines = [line for line in self._station_lines(station_id) if line[1] not in excluded_products]
+        warning = self._station_warning(station_id)
+        stop = self._stop_reference(station_id)
+        
+        departures = []
+        for _ in range(min(self.board_size, results) if lines else 0):
+            name, product, directions = rng.choice(lines)
+            planned = minute + timedelta(seconds=rng.randrange(max(1, duration) * 60))
+            roll = rng.random()
+            if roll < 0.1:
+                delay = None  # Keine Echtzeitdaten
+            elif roll < 0.7:
+                delay = 0
+            else:
+                delay = rng.choice((60, 120, 180, 300, 600, -60))
+            when = planned + timedelta(seconds=delay or 0)
+            
+            remarks = [{'type': 'hint', 'code': 'bf', 'text': 'barrierefrei'}]
+            if warning:
+                remarks.append(warning)
+            
+            departures.append({
+                'tripId': f'1|{rng.randrange(10 ** 5)}|0|86|{minute:%d%m%Y}',
+                'stop': stop,
+                'when': when.isoformat(),
+                'plannedWhen': planned.isoformat(),
+                'delay': delay,
+                'platform': None,
+                'plannedPlatform': None,
+                'direction': self._direction(rng.choice(directions)),
+                'line': {
+                    'type': 'line', 'id': name.lower(), 'fahrtNr': str(rng.randrange(10 ** 5)),
+                    'name': name, 'public': True, 'mode': 'bus' if product == 'bus' else 'train',
+                    'product': product,
+                    'operator': {'type': 'operator', 'id': 'berliner-verkehrsbetriebe', 'name': 'BVG'},
+                },
+                'remarks': remarks,
+            })
+        
+        departures.sort(key=lambda dep: dep['when'])
+        return {'departures': departures, 'realtimeDataUpdatedAt': int(now.timestamp())}
+    
+    def _direction(self, direction: str) -> str:
+        """Verlängert eine Richtung um Zwischenhalte bis direction_length"""
+        if len(direction) >= self.direction_length:
+            return direction
+        via = []
+        while len(f"{direction} über {', '.join(via)}") < self.direction_length:
+            via.append(VIA_STOPS[len(via) % len(VIA_STOPS)])
+        return f"{direction} über {', '.join(via)}"
+    
+    def stop(self, station_id: str) -> Dict:
+        """Antwort von /stops/{id}"""
+        stop = dict(self._stop_reference(station_id))
+        warning = self._station_warning(station_id)
+        stop['remarks'] = [warning] if warning else []
+        return stop
+    
+    def locations(self, query: str, results: int) -> List[Dict]:
+        """Antwort von /locations"""
+        query = query.lower()
+        matches = [
+            self._stop_reference(station_id)
+            for station_id, name in STOPS.items()
+            if query in name.lower()
+        ]
+        return matches[:results]
+    
+    def _stop_reference(self, station_id: str) -> Dict:
+        products = {line[1] for line in self._station_lines(station_id)}
+        return {
+            'type': 'stop',
+            'id': station_id,
+            'name': STOPS.get(station_id, f'Haltestelle {station_id}'),
+            'location': {'type': 'location', 'id': station_id, 'latitude': 52.52, 'longitude': 13.41},
+            'products': {
+                product: product in products
+                for product in ('suburban', 'subway', 'tram', 'bus', 'ferry', 'express', 'regional')
+            },
+        }
+
+
+class Recordings:
+    """
+    Verzeichnis mit aufgenommenen Antworten
+    
+    Pro Anfrage (Pfad + sortierte Parameter) eine JSON-Datei mit Status,
+    Zeitpunkt der Aufnahme und Body.
+    """
+    
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    @staticmethod
+    def _prefix(path: str) -> str:
+        return path.strip('/').replace('/', '_') or 'root'
+    
+    def _filename(self, path: str, params: Dict[str, str]) -> str:
+        query = urlencode(sorted((k, v) for k, v in params.items() if k not in IGNORED_PARAMS))
+        digest = hashlib.sha1(query.encode('utf-8')).hexdigest()[:10]
+        return os.path.join(self.directory, f'{self._prefix(path)}-{digest}.json')
+    
+    def save(self, path: str, params: Dict[str, str], status: int, body: bytes):
+        """Speichert eine Antwort"""
+        record = {
+            'path': path,
+            'params': params,
+            'status': status,
+            'recordedAt': time.time(),
+            'body': json.loads(body),
+        }
+        filename = self._filename(path, params)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False)
+        logger.info(f"Aufgenommen: {path} -> {os.path.basename(filename)}")
+    
+    def load(self, path: str, params: Dict[str, str]) -> Optional[Dict]:
+        """
+        Sucht die passende Aufnahme
+        
+        Gibt es keine mit genau diesen Parametern, wird die jüngste
+        Aufnahme für denselben Pfad verwendet.
+        
+        Returns:
+            Aufnahme (status, recordedAt, body) oder None
+        """
+        filename = self._filename(path, params)
+        if not os.path.exists(filename):
+            candidates = glob.glob(os.path.join(glob.escape(self.directory), f'{self._prefix(path)}-*.json'))
+            if not candidates:
+                return None
+            filename = max(candidates, key=os.path.getmtime)
+        
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Aufnahme {filename} nicht lesbar: {e}")
+            return None
+
+
+def shift_departures(body: Dict, seconds: float) -> Dict:
+    """
+    Verschiebt when/plannedWhen aller Abfahrten um seconds Sekunden
+    
+    Aufgenommene Tafeln wären sonst bei der Wiedergabe schon abgefahren.
+    """
+    delta = timedelta(seconds=int(seconds))
+    for dep in body.get('departures', []):
+        for field in ('when', 'plannedWhen'):
+            if dep.get(field):
+                dep[field] = (datetime.fromisoformat(dep[field]) + delta).isoformat()
+    return body
+
+
+class FaultInjector:
+    """Würfelt pro Anfrage Verzögerung und Fehler aus"""
+    
+    def __init__(self, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 timeout_rate: float = 0.0, timeout_delay: float = API_TIMEOUT + 5,
+                 retry_after: int = DEFAULT_RETRY_AFTER, seed: Optional[int] = None):
+        """
+        Args:
+            latency_ms: Grundlatenz pro Anfrage
+            jitter_ms: Zufällige Abweichung (±) von der Grundlatenz
+            error_rate: Anteil der Anfragen mit 500/502/503
+            rate_limit_rate: Anteil der Anfragen mit 429
+            timeout_rate: Anteil der Anfragen ohne Antwort
+            timeout_delay: So lange bleibt eine Anfrage ohne Antwort offen
+            retry_after: Retry-After-Header bei 429 (Sekunden)
+            seed: Startwert für den Zufallsgenerator
+        """
+        self.latency = latency_ms / 1000
+        self.jitter = jitter_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.timeout_rate = timeout_rate
+        self.timeout_delay = timeout_delay
+        self.retry_after = retry_after
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def delay(self) -> float:
+        """Verzögerung für die nächste Antwort in Sekunden"""
+        with self._lock:
+            return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+    
+    def pick(self) -> Optional[str]:
+        """
+        Returns:
+            'timeout', 'rate_limit', 'error' oder None (normale Antwort)
+        """
+        with self._lock:
+            roll = self._random.random()
+        for fault, rate in (('timeout', self.timeout_rate),
+                            ('rate_limit', self.rate_limit_rate),
+                            ('error', self.error_rate)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+    
+    def error_status(self) -> int:
+        with self._lock:
+            return self._random.choice(SERVER_ERRORS)
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP-Server mit Synthese, Aufnahme/Wiedergabe und Fehlerinjektion"""
+    
+    daemon_threads = True
+    
+    def __init__(self, address: Tuple[str, int] = ('127.0.0.1', DEFAULT_PORT),
+                 synthesizer: Optional[BoardSynthesizer] = None,
+                 faults: Optional[FaultInjector] = None,
+                 recordings: Optional[Recordings] = None,
+                 upstream: Optional[str] = None,
+                 shift_times: bool = True):
+        """
+        Args:
+            address: (Host, Port); Port 0 wählt einen freien Port
+            synthesizer: Erzeugt Antworten, wenn es keine Aufnahme gibt
+            faults: Fehlerinjektion (None = keine)
+            recordings: Aufnahme-Verzeichnis (Wiedergabe bzw. Ziel der Aufnahme)
+            upstream: Echte API, an die weitergeleitet und aufgenommen wird
+            shift_times: Abfahrtszeiten bei der Wiedergabe auf jetzt verschieben
+        """
+        super().__init__(address, StubRequestHandler)
+        self.synthesizer = synthesizer or BoardSynthesizer()
+        self.faults = faults or FaultInjector()
+        self.recordings = recordings
+        self.upstream = upstream.rstrip('/') if upstream else None
+        self.shift_times = shift_times
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+    
+    @property
+    def url(self) -> str:
+        """Basis-URL für BVGClient(base_url=...)"""
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+    
+    def start(self) -> 'StubServer':
+        """Startet den Server in einem Hintergrund-Thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name='stub-server', daemon=True)
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        """Beendet den Server"""
+        self.shutdown()
+        self.server_close()
+    
+    def respond(self, path: str, params: Dict[str, str]) -> Tuple[int, object]:
+        """
+        Liefert (Status, JSON-Body) für eine Anfrage
+        
+        Reihenfolge: Weiterleitung (Aufnahme), Wiedergabe, Synthese.
+        """
+        if self.upstream:
+            return self._forward(path, params)
+        
+        if self.recordings is not None:
+            record = self.recordings.load(path, params)
+            if record is not None:
+                self.count('replayed')
+                body = record['body']
+                if self.shift_times and isinstance(body, dict):
+                    body = shift_departures(body, time.time() - record['recordedAt'])
+                return record['status'], body
+            self.count('replay_misses')
+        
+        return self._synthesize(path, params)
+    
+    def _synthesize(self, path: str, params: Dict[str, str]) -> Tuple[int, object]:
+        parts = path.strip('/').split('/')
+        try:
+            results = int(params.get('results', 10 if parts == ['locations'] else 20))
+            duration = int(params.get('duration', 10))
+        except ValueError:
+            return 400, {'message': 'invalid results/duration'}
+        
+        if parts == ['locations']:
+            return 200, self.synthesizer.locations(params.get('query', ''), results)
+        if len(parts) in (2, 3) and parts[0] == 'stops':
+            if not parts[1].isdigit():
+                return 400, {'message': f'invalid stop ID "{parts[1]}"'}
+            if len(parts) == 2:
+                return 200, self.synthesizer.stop(parts[1])
+            if parts[2] == 'departures':
+                excluded = frozenset(
+                    product for product in PRODUCTS if params.get(product) == 'false'
+                )
+                return 200, self.synthesizer.departures(parts[1], duration, results, excluded)
+        return 404, {'message': f'{path} not found'}
+    
+    def _forward(self, path: str, params: Dict[str, str]) -> Tuple[int, object]:
+        url = f'{self.upstream}{path}?{urlencode(params)}'
+        request = urllib.request.Request(url, headers={'User-Agent': 'BVG-Abfahrt-Monitor/1.0 (stub)'})
+        try:
+            with urllib.request.urlopen(request, timeout=API_TIMEOUT) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, e.read()
+        except OSError as e:
+            logger.error(f"Weiterleitung an {self.upstream} fehlgeschlagen: {e}")
+            return 502, {'message': str(e)}
+        
+        self.count('forwarded')
+        if status == 200 and self.recordings is not None:
+            self.recordings.save(path, params, status, body)
+        try:
+            return status, json.loads(body)
+        except ValueError:
+            return 502, {'message': 'invalid upstream response'}
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """Ein Request an den StubServer"""
+    
+    server: StubServer
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # Header und Body sonst mit 40ms Verzögerung (Delayed ACK)
+    
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = dict(parse_qsl(url.query))
+        server = self.server
+        
+        if url.path == '/_stats':
+            with server._stats_lock:
+                self._send(200, dict(server.stats))
+            return
+        
+        server.count('requests')
+        server.count(f'endpoint:{self._endpoint(url.path)}')
+        
+        time.sleep(server.faults.delay())
+        
+        fault = server.faults.pick()
+        if fault == 'timeout':
+            server.count('timeouts')
+            time.sleep(server.faults.timeout_delay)
+            self.close_connection = True
+            return
+        if fault == 'rate_limit':
+            server.count('rate_limited')
+            self._send(429, {'message': 'Too Many Requests'},
+                       {'Retry-After': str(server.faults.retry_after)})
+            return
+        if fault == 'error':
+            status = server.faults.error_status()
+            server.count(f'status:{status}')
+            self._send(status, {'message': 'injected error'})
+            return
+        
+        status, body = server.respond(url.path, params)
+        server.count(f'status:{status}')
+        self._send(status, body, pretty=params.get('pretty', 'true') != 'false')
+    
+    @staticmethod
+    def _endpoint(path: str) -> str:
+        if path.endswith('/departures'):
+            return 'departures'
+        if path.startswith('/stops/'):
+            return 'stop'
+        if path == '/locations':
+            return 'locations'
+        return 'other'
+    
+    def _send(self, status: int, body: object, headers: Optional[Dict[str, str]] = None,
+              pretty: bool = False):
+        """Sendet eine JSON-Antwort (mit ETag, beantwortet If-None-Match mit 304)"""
+        data = json.dumps(body, ensure_ascii=False, indent=2 if pretty else None).encode('utf-8')
+        etag = f'"{hashlib.sha1(data).hexdigest()[:16]}"'
+        
+        if status == 200 and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        if status == 200:
+            self.send_header('ETag', etag)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokaler Ersatz für die BVG REST API')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--departures', type=int, default=DEFAULT_BOARD_SIZE, help='Abfahrten pro Tafel')
+    parser.add_argument('--seed', type=int, default=0, help='Startwert für Tafeln und Fehler')
+    parser.add_argument('--direction-length', type=int, default=0, help='Mindestlänge der Richtungen')
+    parser.add_argument('--record', metavar='DIR', help='Antworten der echten API aufnehmen')
+    parser.add_argument('--upstream', default=API_BASE_URL, help='Echte API für --record')
+    parser.add_argument('--replay', metavar='DIR', help='Aufgenommene Antworten ausliefern')
+    parser.add_argument('--no-shift', action='store_true', help='Abfahrtszeiten nicht auf jetzt verschieben')
+    parser.add_argument('--latency', type=float, default=0, help='Latenz in ms')
+    parser.add_argument('--jitter', type=float, default=0, help='Jitter in ms (±)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Anteil 5xx-Antworten (0..1)')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Anteil 429-Antworten (0..1)')
+    parser.add_argument('--retry-after', type=int, default=DEFAULT_RETRY_AFTER, help='Retry-After bei 429')
+    parser.add_argument('--timeout-rate', type=float, default=0.0, help='Anteil unbeantworteter Anfragen (0..1)')
+    parser.add_argument('--timeout-delay', type=float, default=API_TIMEOUT + 5,
+                        help='Sekunden, die eine unbeantwortete Anfrage offen bleibt')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Jede Anfrage loggen')
+    args = parser.parse_args()
+    
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
+    if args.record and args.replay:
+        parser.error('--record und --replay schließen sich aus')
+    
+    directory = args.record or args.replay
+    server = StubServer(
+        (args.host, args.port),
+        synthesizer=BoardSynthesizer(args.departures, args.seed, args.direction_length),
+        faults=FaultInjector(
+            args.latency, args.jitter, args.error_rate, args.rate_limit_rate,
+            args.timeout_rate, args.timeout_delay, args.retry_after, args.seed
+        ),
+        recordings=Recordings(directory) if directory else None,
+        upstream=args.upstream if args.record else None,
+        shift_times=not args.no_shift,
+    )
+    
+    mode = 'Aufnahme' if args.record else 'Wiedergabe' if args.replay else 'Synthese'
+    logger.info(f"Stub-API ({mode}) auf {server.url}")
+    print(f"Monitor starten mit: BVG_API_BASE_URL={server.url} python main.py")
+    
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        logger.info(f"Anfragen: {dict(server.stats)}")
+
+
+if __name__ == '__main__':
+    main()
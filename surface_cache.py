@@ -0,0 +1,134 @@
+"""
+Begrenzter Cache für gerenderte Surfaces
+
+Ersetzt die unbegrenzten Dictionaries im DisplayManager: Einträge werden
+nach Größe in Bytes begrenzt (am längsten nicht benutzte zuerst verdrängt)
+und nach einem Datenwechsel entfernt, wenn der neue Stand sie nicht mehr
+braucht. So bleibt der Speicher im Dauerbetrieb konstant.
+"""
+import pygame
+import logging
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def surface_bytes(surface: pygame.Surface) -> int:
+    """Speicherbedarf der Pixeldaten einer Surface"""
+    return surface.get_pitch() * surface.get_height()
+
+
+class SurfaceCache:
+    """
+    LRU-Cache mit Byte-Grenze und Generationen
+    
+    Jeder Zugriff markiert den Eintrag mit der aktuellen Generation. Nach
+    einem neuen Snapshot startet der DisplayManager eine neue Generation
+    und entfernt nach dem ersten Frame alle Einträge, die dabei nicht
+    benutzt wurden (evict_unused).
+    """
+    
+    def __init__(self, name: str, max_bytes: int,
+                 size_of: Callable[[object], int] = surface_bytes):
+        """
+        Args:
+            name: Bezeichnung für Log und Statistik
+            max_bytes: Obergrenze für die Summe aller Einträge
+            size_of: Berechnet die Größe eines Eintrags in Bytes
+        """
+        self.name = name
+        self.max_bytes = max_bytes
+        self.size_of = size_of
+        self.generation = 0
+        self.bytes = 0
+        
+        # key -> [Wert, Größe, Generation]; Reihenfolge = zuletzt benutzt am Ende
+        self._entries: 'OrderedDict[Hashable, list]' = OrderedDict()
+        
+        # Statistik
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+    
+    def get(self, key: Hashable) -> Optional[object]:
+        """Liefert einen Eintrag (None wenn nicht vorhanden)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        
+        self.hits += 1
+        entry[2] = self.generation
+        self._entries.move_to_end(key)
+        return entry[0]
+    
+    def put(self, key: Hashable, value: object):
+        """Speichert einen Eintrag und verdrängt bei Bedarf alte"""
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.bytes -= old[1]
+        
+        size = self.size_of(value)
+        self._entries[key] = [value, size, self.generation]
+        self.bytes += size
+        self._shrink()
+    
+    def get_or_create(self, key: Hashable, factory: Callable[[], object]) -> object:
+        """Liefert einen Eintrag oder erzeugt ihn mit factory()"""
+        value = self.get(key)
+        if value is None:
+            value = factory()
+            self.put(key, value)
+        return value
+    
+    def next_generation(self):
+        """Beginnt eine neue Generation (neuer Datenstand)"""
+        self.generation += 1
+    
+    def evict_unused(self) -> int:
+        """
+        Entfernt alle Einträge, die in der aktuellen Generation nicht
+        benutzt wurden
+        
+        Returns:
+            Anzahl entfernter Einträge
+        """
+        stale = [key for key, entry in self._entries.items() if entry[2] != self.generation]
+        for key in stale:
+            self._evict(key)
+        return len(stale)
+    
+    def clear(self):
+        """Leert den Cache"""
+        self._entries.clear()
+        self.bytes = 0
+    
+    def stats(self) -> Dict[str, int]:
+        """Treffer, Fehlschläge, Verdrängungen und belegter Speicher"""
+        return {
+            'entries': len(self._entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+    
+    def _shrink(self):
+        """Verdrängt die am längsten nicht benutzten Einträge bis unter max_bytes"""
+        # Der zuletzt eingefügte Eintrag bleibt immer erhalten
+        while self.bytes > self.max_bytes and len(self._entries) > 1:
+            self._evict(next(iter(self._entries)))
+    
+    def _evict(self, key: Hashable):
+        """Entfernt einen Eintrag"""
+        value, size, _ = self._entries.pop(key)
+        self.bytes -= size
+        self.evictions += 1
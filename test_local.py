@@ -7,8 +7,11 @@ import sys
 import os
 import platform
 
-# Setze Display-Modus für lokales Testen
-if platform.system() == 'Darwin':  # macOS
+# Setze Display-Modus für lokales Testen (SDL_VIDEODRIVER=dummy: ohne Fenster,
+# für reproduzierbare Frames und Benchmarks siehe headless.py)
+if os.environ.get('SDL_VIDEODRIVER'):
+    pass
+elif platform.system() == 'Darwin':  # macOS
     os.environ['SDL_VIDEODRIVER'] = 'cocoa'
 elif platform.system() == 'Windows':
     os.environ['SDL_VIDEODRIVER'] = 'windows'
@@ -16,6 +19,7 @@ else:  # Linux
     os.environ['SDL_VIDEODRIVER'] = 'x11'
 
 from main import AbfahrtMonitor
+from log_setup import setup_logging, shutdown_logging
 
 def main():
     print("🧪 Test-Modus - Startet Monitor im Fenster")
@@ -29,8 +33,12 @@ def main():
         print("⚠️  Keine config.json gefunden. Bitte erstelle eine!")
         sys.exit(1)
     
-    monitor = AbfahrtMonitor(config_path=config_path)
-    monitor.run()
+    setup_logging()
+    try:
+        monitor = AbfahrtMonitor(config_path=config_path)
+        monitor.run()
+    finally:
+        shutdown_logging()
 
 
 if __name__ == '__main__':
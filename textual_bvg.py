@@ -3,12 +3,14 @@ BVG Abfahrtsmonitor - Textual UI Version
 
 Terminal-basierter Echtzeit-Abfahrtsmonitor mit Textual
 """
+import asyncio
 import json
 import logging
 import sys
+import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, NamedTuple, Optional
 
 import requests
 from textual.app import App, ComposeResult
@@ -20,23 +22,57 @@ from textual.timer import Timer
 from textual.screen import ModalScreen
 from textual.containers import Center
 
-# Für den Import der bestehenden Module
+from http_cache import open_cache, DEFAULT_CACHE_PATH
+from metrics import MonitorMetrics, MetricsServer, serve_metrics, DEFAULT_METRICS_HOST
+from log_setup import setup_logging, shutdown_logging
+from profiler import SamplingProfiler, install_signal_handler, DEFAULT_PROFILE_DIR, DEFAULT_DURATION
+from rate_limit import RequestGovernor, DEFAULT_REQUESTS_PER_MINUTE
+
+# Für den Import der bestehenden Module (alles, was bvg_api benötigt)
 try:
-    from bvg_api import BVGClient
+    from bvg_api import BVGClient, Departure, DepartureFilter, minutes_until, walking_state
+    from fetch_daemon import DaemonSubscriber, resolve_socket_path
+    from snapshot_store import SnapshotStore, SNAPSHOT_DIR
 except ImportError:
+    # Ohne Warmstart und Abruf-Dienst
+    DaemonSubscriber = resolve_socket_path = SnapshotStore = None
+    
     # Fallback für Demo/Testing
     class BVGClient:
-        def get_departures(self, station_id):
+        def __init__(self, governor=None, cache=None, base_url=None, **kwargs):
+            pass
+        def get_departures(self, station_id, departure_filter=None):
             return []
         def get_disruptions(self, station_id):
             return []
+        def get_station_board(self, station_id, departure_filter=None):
+            return {'departures': [], 'disruptions': [], 'stale': False}
+        def search_locations(self, query, results=10):
+            return []
+    
+    class DepartureFilter:
+        @classmethod
+        def from_config(cls, station, config, rows=None):
+            return None
+    
+    def minutes_until(when, now=None):
+        return int((when - (now or datetime.now())).total_seconds() / 60)
+    
+    def walking_state(minutes, walking_time):
+        if minutes < walking_time:
+            return 'red'
+        return 'yellow' if minutes == walking_time else 'green'
+    
+    class Departure(NamedTuple):
+        line: str
+        direction: str
+        product: str
+        when: datetime
+        delay: int
 
-# Logging Setup
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='bvg_monitor.log'
-)
+# Logging Setup (nicht blockierend, siehe log_setup.py; eingerichtet in main())
+LOG_FILE = 'bvg_monitor.log'
+BUDGET_INTERVAL = 10  # Sekunden zwischen Aktualisierungen der Budget-Anzeige
 logger = logging.getLogger(__name__)
 
 
@@ -138,17 +174,9 @@ class AddStationModal(ModalScreen):
         status_label = self.query_one("#status-label", Label)
         status_label.update("🔍 Suche...")
         
-        url = "https://v6.bvg.transport.rest/locations"
-        params = {
-            'query': query,
-            'results': 10
-        }
-        
         try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            
-            locations = response.json()
+            # Über den gemeinsamen Client (Request-Budget), ohne die UI zu blockieren
+            locations = await asyncio.to_thread(self.app.bvg_client.search_locations, query, 10)
             
             # Filtere nur Stationen/Haltestellen
             stations = [
@@ -242,10 +270,18 @@ class DisruptionWidget(Static):
 class DepartureTable(Static):
     """Widget für Abfahrtstabelle einer Station"""
     
+    # Rich-Farben für den Fußweg-Status (siehe bvg_api.walking_state)
+    STATE_COLORS = {
+        'red': "red",
+        'yellow': "yellow",
+        'green': "green",
+    }
+    
     def __init__(self, station_data: Dict, station_index: int, **kwargs):
         super().__init__(**kwargs)
         self.station_data = station_data
         self.station_index = station_index
+        self._rows: List[tuple] = []
     
     def compose(self) -> ComposeResult:
         station_name = self.station_data['name']
@@ -274,57 +310,75 @@ class DepartureTable(Static):
         if not departures:
             yield Label("Keine Abfahrten verfügbar", classes="no-data")
         else:
-            for dep in departures[:8]:  # Maximal 8 Abfahrten
-                line = dep.get('line', '?')
-                direction = dep.get('direction', 'Unbekannt')
-                when = dep.get('when', '')
-                delay = dep.get('delay', 0)
-                
-                # Zeitberechnung
-                try:
-                    # Handle both datetime objects and ISO strings
-                    if isinstance(when, datetime):
-                        dep_time = when
-                    else:
-                        dep_time = datetime.fromisoformat(when.replace('Z', '+00:00'))
-                    
-                    now = datetime.now(dep_time.tzinfo) if dep_time.tzinfo else datetime.now()
-                    minutes = int((dep_time - now).total_seconds() / 60)
-                    
-                    if minutes <= 0:
-                        time_str = "Jetzt"
-                    elif minutes == 1:
-                        time_str = "1 min"
-                    else:
-                        time_str = f"{minutes} min"
-                except Exception as e:
-                    # Fallback: try to display 'minutes' field if available
-                    if 'minutes' in dep:
-                        minutes = dep['minutes']
-                        time_str = f"{minutes} min" if minutes > 1 else "1 min"
-                    else:
-                        time_str = str(when)[:5] if when else "?"
-                
-                # Verspätung
-                if delay and delay > 0:
-                    delay_str = f"+{delay // 60} min"
-                    delay_class = "delay"
-                else:
-                    delay_str = "pünktlich"
-                    delay_class = "on-time"
-                
-                # Kürze lange Richtungsnamen
-                if len(direction) > 40:
-                    direction = direction[:39] + "..."
-                
-                table.add_row(
-                    f"[bold cyan]{line}[/]",
-                    direction,
-                    f"[yellow]{time_str}[/]",
-                    f"[{delay_class}]{delay_str}[/]"
-                )
+            self._rows = self._build_rows()
+            for row in self._rows:
+                table.add_row(*row)
             
             yield table
+    
+    def update_countdowns(self) -> None:
+        """Berechnet die Minuten neu und aktualisiert die Tabelle bei Änderungen"""
+        rows = self._build_rows()
+        if rows == self._rows:
+            return
+        
+        self._rows = rows
+        for table in self.query(DataTable):
+            table.clear()
+            for row in rows:
+                table.add_row(*row)
+    
+    def _build_rows(self) -> List[tuple]:
+        """
+        Erzeugt die Tabellenzeilen mit aktuellen Minuten bis Abfahrt
+        
+        Die Minuten werden gegen die aktuelle Uhrzeit gerechnet,
+        bereits abgefahrene Verbindungen fallen heraus.
+        """
+        walking_time = self.station_data.get('walkingTime', 0)
+        now = datetime.now()
+        rows = []
+        
+        for dep in self.station_data.get('departures', []):
+            if len(rows) >= 8:  # Maximal 8 Abfahrten
+                break
+            
+            direction = dep.direction
+            
+            # Zeitberechnung
+            minutes = minutes_until(dep.when, now)
+            if minutes < 0:
+                continue
+            
+            time_color = self.STATE_COLORS[walking_state(minutes, walking_time)]
+            if minutes == 0:
+                time_str = "Jetzt"
+            elif minutes == 1:
+                time_str = "1 min"
+            else:
+                time_str = f"{minutes} min"
+            
+            # Verspätung (in Minuten)
+            delay = dep.delay
+            if delay > 0:
+                delay_str = f"+{delay} min"
+                delay_class = "delay"
+            else:
+                delay_str = "pünktlich"
+                delay_class = "on-time"
+            
+            # Kürze lange Richtungsnamen
+            if len(direction) > 40:
+                direction = direction[:39] + "..."
+            
+            rows.append((
+                f"[bold cyan]{dep.line}[/]",
+                direction,
+                f"[{time_color}]{time_str}[/]",
+                f"[{delay_class}]{delay_str}[/]"
+            ))
+        
+        return rows
 
 
 class AddStationButton(Static):
@@ -357,6 +411,7 @@ class StatusBar(Static):
     current_time = reactive("")
     last_update = reactive("")
     has_unsaved_changes = reactive(False)
+    budget = reactive(-1)
     
     def compose(self) -> ComposeResult:
         yield Label(id="status-content")
@@ -373,6 +428,9 @@ class StatusBar(Static):
     def watch_has_unsaved_changes(self, has_changes: bool) -> None:
         self.update_status()
     
+    def watch_budget(self, budget: int) -> None:
+        self.update_status()
+    
     def update_status(self) -> None:
         status_label = self.query_one("#status-content", Label)
         
@@ -382,6 +440,8 @@ class StatusBar(Static):
         content = f"{status_icon} {status_text} | 🕐 {self.current_time}"
         if self.last_update:
             content += f" | Aktualisiert: {self.last_update}"
+        if self.budget >= 0:
+            content += f" | API-Budget: {self.budget}"
         if self.has_unsaved_changes:
             content += " | ⚠️ Ungespeicherte Änderungen"
         
@@ -485,6 +545,11 @@ class BVGMonitorApp(App):
         self.bvg_client = BVGClient()
         self.stations_data = []
         self.update_timer: Timer | None = None
+        self.snapshot_store: SnapshotStore | None = None
+        self.metrics_server: MetricsServer | None = None
+        self.profiler: SamplingProfiler | None = None
+        self.subscriber: DaemonSubscriber | None = None  # Nur mit "fetchDaemon"
+        self.last_update_time: float | None = None  # time.time() der angezeigten Daten
         
     def compose(self) -> ComposeResult:
         yield Header(show_clock=True)
@@ -502,6 +567,47 @@ class BVGMonitorApp(App):
             self.exit(message="Fehler beim Laden der Konfiguration")
             return
         
+        # Optionale Laufzeit-Metriken (Prometheus)
+        if self.config.get('metricsPort'):
+            metrics = MonitorMetrics()
+            self.bvg_client.on_request = metrics.observe_request
+            self.bvg_client.on_parse = metrics.observe_parse
+            metrics.watch_snapshot_age(lambda: self.last_update_time)
+            self.metrics_server = serve_metrics(
+                metrics.registry,
+                self.config['metricsPort'],
+                self.config.get('metricsHost', DEFAULT_METRICS_HOST)
+            )
+        
+        # Profiler auf Abruf (SIGUSR1 startet/beendet eine Aufnahme)
+        self.profiler = SamplingProfiler(
+            self.config.get('profileDir', DEFAULT_PROFILE_DIR),
+            self.config.get('profileDuration', DEFAULT_DURATION)
+        )
+        install_signal_handler(self.profiler)
+        
+        # Antwort-Cache (Stationssuche, Stammdaten)
+        if self.config.get('httpCache', True):
+            self.bvg_client.cache = open_cache(self.config.get('httpCachePath', DEFAULT_CACHE_PATH))
+        
+        # Warmstart: letzten Stand sofort anzeigen (eigene Datei, da der
+        # Monitor parallel laufen kann)
+        if self.config.get('warmStart', True) and SnapshotStore is not None:
+            self.snapshot_store = SnapshotStore(
+                str(Path(SNAPSHOT_DIR) / 'snapshot_tui.bin'),
+                self.config.get('snapshotInterval', 60)
+            )
+            self._restore_snapshot()
+        
+        # Gemeinsamer Abruf-Dienst: neue Snapshots lösen refresh_data aus
+        if self.config.get('fetchDaemon') and DaemonSubscriber is not None:
+            self.subscriber = DaemonSubscriber(
+                resolve_socket_path(self.config['fetchDaemon']),
+                self.config['stations'], self.config,
+                on_change=lambda: self.call_from_thread(self.refresh_data)
+            )
+            self.subscriber.start()
+        
         # Erste Daten laden
         self.refresh_data()
         
@@ -511,6 +617,8 @@ class BVGMonitorApp(App):
         
         # Uhrzeit-Timer
         self.set_interval(1, self.update_clock)
+        self.update_budget()
+        self.set_interval(BUDGET_INTERVAL, self.update_budget)
     
     def _load_config(self) -> bool:
         """Lädt die Konfiguration"""
@@ -524,6 +632,14 @@ class BVGMonitorApp(App):
             if 'stations' not in self.config:
                 self.config['stations'] = []
             
+            # Gleiches Budget wie main.py und fetch_daemon.py (requestsPerMinute)
+            self.bvg_client = BVGClient(
+                RequestGovernor(
+                    requests_per_minute=self.config.get('requestsPerMinute', DEFAULT_REQUESTS_PER_MINUTE)
+                ),
+                base_url=self.config.get('apiBaseUrl')
+            )
+            
             logger.info(f"Konfiguration geladen: {len(self.config['stations'])} Stationen")
             return True
             
@@ -619,51 +735,88 @@ class BVGMonitorApp(App):
     
     @work(exclusive=True)
     async def refresh_data(self) -> None:
-        """Holt neue Daten von der API"""
+        """Holt neue Daten von der API (bzw. vom Abruf-Dienst)"""
         stations_data = []
-        display_lines = self.config.get('displayLines', [])
-        
-        for i, station in enumerate(self.config['stations']):
-            station_id = station['id']
-            station_name = station['name']
-            walking_time = station.get('walkingTime', 0)
-            
-            try:
-                departures = self.bvg_client.get_departures(station_id)
-                disruptions = self.bvg_client.get_disruptions(station_id)
+        all_fresh = True  # Live nur, wenn keine Station veraltet ist oder fehlt
+        updated_at = time.time()
+        
+        if self.subscriber is not None:
+            # Stationen geändert (hinzugefügt/gelöscht): beim Dienst neu anmelden
+            if self.subscriber.stations != self.config['stations']:
+                self.subscriber.set_stations(self.config['stations'])
+            snapshot = self.subscriber.latest()
+            if not snapshot.version:
+                return  # Noch nichts vom Dienst - Warmstart-Stand bleibt stehen
+            stations_data = list(snapshot.stations)
+            all_fresh = snapshot.is_live
+            updated_at = snapshot.updated_at or updated_at
+        else:
+            for i, station in enumerate(self.config['stations']):
+                station_id = station['id']
+                station_name = station['name']
+                walking_time = station.get('walkingTime', 0)
                 
-                # Test-Modus: Künstliche Daten
-                if self.config.get('testMode', False):
-                    departures = self._generate_test_departures(i)
-                    if i == 0:
-                        disruptions = [{
-                            'type': 'warning',
-                            'summary': 'Ersatzverkehr wegen Bauarbeiten',
-                            'text': 'SEV zwischen Station A und B'
-                        }]
+                try:
+                    # Linien, Richtungen und Produkte pro Station (bzw. displayLines)
+                    departure_filter = DepartureFilter.from_config(station, self.config)
+                    # Im Thread: wartet das Budget (z.B. nach 429), bleibt die TUI bedienbar
+                    board = await asyncio.to_thread(
+                        self.bvg_client.get_station_board, station_id, departure_filter=departure_filter
+                    )
+                    departures = board['departures']
+                    disruptions = board['disruptions']
+                    all_fresh = all_fresh and not board.get('stale', False)
                 
-                # Filtere nach konfigurierten Linien
-                if display_lines:
-                    departures = [d for d in departures if d['line'] in display_lines]
+                    # Test-Modus: Künstliche Daten
+                    if self.config.get('testMode', False):
+                        departures = self._generate_test_departures(i)
+                        if i == 0:
+                            disruptions = [{
+                                'type': 'warning',
+                                'summary': 'Ersatzverkehr wegen Bauarbeiten',
+                                'text': 'SEV zwischen Station A und B'
+                            }]
                 
-                stations_data.append({
-                    'id': station_id,
-                    'name': station_name,
-                    'walkingTime': walking_time,
-                    'departures': departures,
-                    'disruptions': disruptions
-                })
-            except Exception as e:
-                logger.error(f"Fehler beim Abrufen für {station_name}: {e}")
+                    stations_data.append({
+                        'id': station_id,
+                        'name': station_name,
+                        'walkingTime': walking_time,
+                        'departures': departures,
+                        'disruptions': disruptions
+                    })
+                except Exception as e:
+                    all_fresh = False
+                    logger.error(f"Fehler beim Abrufen für {station_name}: {e}")
         
         self.stations_data = stations_data
         self.update_display()
         
         status_bar = self.query_one(StatusBar)
-        status_bar.is_live = True
-        status_bar.last_update = datetime.now().strftime("%H:%M:%S")
+        status_bar.is_live = all_fresh if stations_data else not self.config['stations']
+        if status_bar.is_live:
+            self.last_update_time = updated_at
+            status_bar.last_update = datetime.fromtimestamp(updated_at).strftime("%H:%M:%S")
+        
+        if all_fresh and stations_data and self.snapshot_store and not self.config.get('testMode', False):
+            await asyncio.to_thread(self.snapshot_store.save, stations_data, updated_at)
+    
+    def _restore_snapshot(self) -> None:
+        """Zeigt den zuletzt gespeicherten Stand bis zum ersten Abruf an"""
+        station_ids = [station['id'] for station in self.config['stations']]
+        restored = self.snapshot_store.load(station_ids)
+        if not restored:
+            return
+        
+        stations, updated_at = restored
+        self.stations_data = stations
+        self.last_update_time = updated_at
+        self.update_display()
+        
+        status_bar = self.query_one(StatusBar)
+        status_bar.is_live = False
+        status_bar.last_update = datetime.fromtimestamp(updated_at).strftime("%H:%M:%S")
     
-    def _generate_test_departures(self, station_index: int) -> List[Dict]:
+    def _generate_test_departures(self, station_index: int) -> List[Departure]:
         """Generiert Test-Abfahrten"""
         from datetime import timedelta
         
@@ -678,14 +831,9 @@ class BVGMonitorApp(App):
         
         for i, (line, direction) in enumerate(lines):
             dep_time = now + timedelta(minutes=2 + i * 3 + station_index * 2)
-            delay = 60 if i % 3 == 0 else 0  # Jede dritte Linie verspätet
+            delay = 1 if i % 3 == 0 else 0  # Jede dritte Linie verspätet
             
-            departures.append({
-                'line': line,
-                'direction': direction,
-                'when': dep_time.isoformat(),
-                'delay': delay
-            })
+            departures.append(Departure(line, direction, 'bus', dep_time, delay))
         
         return departures
     
@@ -706,9 +854,19 @@ class BVGMonitorApp(App):
         container.mount(AddStationButton())
     
     def update_clock(self) -> None:
-        """Aktualisiert die Uhrzeit in der Statusleiste"""
+        """Aktualisiert die Uhrzeit in der Statusleiste und die Countdowns"""
         status_bar = self.query_one(StatusBar)
         status_bar.current_time = datetime.now().strftime("%H:%M:%S")
+        
+        # Minuten bis Abfahrt laufen zwischen den API-Abfragen weiter
+        for table in self.query(DepartureTable):
+            table.update_countdowns()
+    
+    def update_budget(self) -> None:
+        """Zeigt die verbleibenden Anfragen an (gemeinsam mit anderen Prozessen)"""
+        governor = getattr(self.bvg_client, 'governor', None)
+        if governor is not None:
+            self.query_one(StatusBar).budget = int(governor.remaining())
     
     def action_refresh(self) -> None:
         """Manuelles Aktualisieren"""
@@ -727,6 +885,12 @@ class BVGMonitorApp(App):
         if self._has_unsaved_changes():
             # Warnung bei ungespeicherten Änderungen
             self.notify("Warnung: Ungespeicherte Änderungen gehen verloren!", severity="warning")
+        if self.metrics_server:
+            self.metrics_server.stop()
+        if self.profiler:
+            self.profiler.stop(wait=True)
+        if self.subscriber:
+            self.subscriber.stop()
         self.exit()
 
 
@@ -734,8 +898,13 @@ def main():
     """Einstiegspunkt"""
     config_path = sys.argv[1] if len(sys.argv) > 1 else './config/config.json'
     
-    app = BVGMonitorApp(config_path)
-    app.run()
+    # Nur in die Datei - Ausgaben auf stderr würden die TUI stören
+    setup_logging(LOG_FILE, console=False)
+    try:
+        app = BVGMonitorApp(config_path)
+        app.run()
+    finally:
+        shutdown_logging()
 
 
 if __name__ == '__main__':
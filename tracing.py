@@ -0,0 +1,260 @@
+"""
+Zeitleiste im Chrome-Trace-Format
+
+Optionales Tracing (Config "traceFile"): Abrufe pro Station, Parsen,
+Linienfilter, die Phasen jedes Frames und die Ausgabe werden als Spans
+aufgezeichnet und in eine rotierende JSON-Datei geschrieben. Die Datei
+lässt sich in chrome://tracing oder https://ui.perfetto.dev öffnen und
+zeigt, ob Abrufe und Rendering sich überlappen.
+
+Ist das Tracing aus, liefert span() ein gemeinsames leeres Objekt - die
+Kosten sind ein Attribut-Zugriff pro Span. Geschrieben wird in einem
+eigenen Thread, nicht im Render- oder Abruf-Thread.
+"""
+import json
+import os
+import queue
+import threading
+import time
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Konstanten
+DEFAULT_MAX_BYTES = 10 * 1024 * 1024  # Größe einer Trace-Datei vor dem Rotieren
+DEFAULT_BACKUP_COUNT = 3  # Anzahl aufgehobener alter Dateien (trace.json.1, ...)
+FLUSH_INTERVAL = 1.0  # Sekunden zwischen zwei Schreibvorgängen
+_STOP = object()  # Signal an den Schreib-Thread
+
+
+class _NullSpan:
+    """Span, der nichts tut (Tracing aus)"""
+    
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    """Misst einen Abschnitt und übergibt ihn beim Verlassen dem Tracer"""
+    
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start')
+    
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+    
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        tracer = self.tracer
+        event = {
+            'name': self.name,
+            'cat': self.category,
+            'ph': 'X',
+            'ts': round((self.start - tracer.origin) * 1e6, 1),
+            'dur': round((end - self.start) * 1e6, 1),
+        }
+        if self.args:
+            event['args'] = self.args
+        tracer.record(event)
+        return False
+
+
+class Tracer:
+    """
+    Sammelt Trace-Events und schreibt sie im Hintergrund
+    
+    Es gibt eine Instanz pro Prozess (tracer), die per start() aktiviert
+    wird. Zeitstempel sind Mikrosekunden seit dem Start.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self._queue: 'queue.SimpleQueue' = queue.SimpleQueue()
+        self._thread_names: Dict[int, str] = {}
+        self._writer: Optional[threading.Thread] = None
+    
+    def start(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+              backup_count: int = DEFAULT_BACKUP_COUNT):
+        """
+        Aktiviert das Tracing
+        
+        Args:
+            path: Trace-Datei (wird beim Start überschrieben)
+            max_bytes: Größe, ab der rotiert wird
+            backup_count: Anzahl aufgehobener alter Dateien
+        
+        Raises:
+            OSError: Wenn die Datei nicht angelegt werden kann
+        """
+        if self.enabled:
+            return
+        writer = _TraceWriter(path, max_bytes, backup_count, self._queue, self._thread_names)
+        self._writer = threading.Thread(target=writer.run, name='trace-writer', daemon=True)
+        self.origin = time.perf_counter()
+        self.pid = os.getpid()
+        self._thread_names.clear()
+        self.enabled = True
+        self._writer.start()
+        logger.info(f"Tracing aktiv: {path}")
+    
+    def stop(self):
+        """Beendet das Tracing und schreibt ausstehende Events"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        self._queue.put(_STOP)
+        self._writer.join(timeout=5)
+        self._writer = None
+    
+    def span(self, name: str, category: str = 'app', **args):
+        """
+        Kontext-Manager, der einen Abschnitt als Span aufzeichnet
+        
+        Args:
+            name: Bezeichnung in der Zeitleiste
+            category: Kategorie (fetch, parse, render, ...)
+            **args: Zusätzliche Angaben (z.B. station=...)
+        """
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+    
+    def instant(self, name: str, category: str = 'app', **args):
+        """Zeichnet ein Ereignis ohne Dauer auf (z.B. neue Daten)"""
+        if not self.enabled:
+            return
+        event = {
+            'name': name, 'cat': category, 'ph': 'i', 's': 't',
+            'ts': round((time.perf_counter() - self.origin) * 1e6, 1),
+        }
+        if args:
+            event['args'] = args
+        self.record(event)
+    
+    def record(self, event: Dict):
+        """Ergänzt Prozess und Thread und reiht das Event zum Schreiben ein"""
+        tid = threading.get_ident()
+        if tid not in self._thread_names:
+            name = threading.current_thread().name
+            self._thread_names[tid] = name
+            self._queue.put(_thread_name_event(self.pid, tid, name))
+        event['pid'] = self.pid
+        event['tid'] = tid
+        self._queue.put(event)
+
+
+def _thread_name_event(pid: int, tid: int, name: str) -> Dict:
+    """Metadaten-Event, damit der Viewer Thread-Namen anzeigt"""
+    return {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+
+
+class _TraceWriter:
+    """Schreibt Events als JSON-Array und rotiert nach Größe"""
+    
+    def __init__(self, path: str, max_bytes: int, backup_count: int,
+                 events: 'queue.SimpleQueue', thread_names: Dict[int, str]):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.events = events
+        self.thread_names = thread_names
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = None
+        self._open()
+    
+    def run(self):
+        """Schreib-Schleife (eigener Thread)"""
+        try:
+            while True:
+                batch = self._collect()
+                stop = batch and batch[-1] is _STOP
+                if stop:
+                    batch.pop()
+                self._write(batch)
+                if stop:
+                    break
+        except OSError as e:
+            logger.error(f"Trace-Datei {self.path} nicht beschreibbar, Tracing beendet: {e}")
+        finally:
+            self._close()
+    
+    def _collect(self) -> List:
+        """Wartet auf Events und sammelt alles, was bis dahin anliegt"""
+        try:
+            batch = [self.events.get(timeout=FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+        while batch[-1] is not _STOP:
+            try:
+                batch.append(self.events.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+    
+    def _write(self, batch: List[Dict]):
+        if not batch:
+            return
+        for event in batch:
+            self._file.write(self._separator + json.dumps(event, separators=(',', ':')))
+            self._separator = ',\n'
+        self._file.flush()
+        if self._file.tell() >= self.max_bytes:
+            self._rotate()
+    
+    def _open(self):
+        # JSON-Array-Format: die schließende Klammer ist optional, eine
+        # abgebrochene Datei bleibt damit lesbar
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._file.write('[\n')
+        self._separator = ''
+        self._write([
+            _thread_name_event(os.getpid(), tid, name)
+            for tid, name in list(self.thread_names.items())
+        ])
+    
+    def _close(self):
+        if self._file is not None:
+            self._file.write('\n]\n')
+            self._file.close()
+            self._file = None
+    
+    def _rotate(self):
+        """trace.json -> trace.json.1 -> trace.json.2 ... (wie RotatingFileHandler)"""
+        self._close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f'{self.path}.{i}'
+                if os.path.exists(source):
+                    os.replace(source, f'{self.path}.{i + 1}')
+            os.replace(self.path, f'{self.path}.1')
+        self._open()
+
+
+tracer = Tracer()
+
+
+def span(name: str, category: str = 'app', **args):
+    """Span auf dem prozessweiten Tracer (siehe Tracer.span)"""
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, category, args)
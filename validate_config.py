@@ -6,6 +6,8 @@ import json
 import sys
 from pathlib import Path
 
+from bvg_api import PRODUCTS
+
 
 def validate_config(config_path='config.json'):
     """Validiert die Konfiguration"""
@@ -40,6 +42,21 @@ def validate_config(config_path='config.json'):
                 warnings.append(f"Station {i}: 'name' fehlt (empfohlen)")
             if 'walkingTime' not in station:
                 warnings.append(f"Station {i}: 'walkingTime' fehlt (Standard: 0)")
+            
+            # Filter pro Station (optional)
+            for key in ['products', 'lines', 'directions']:
+                if key in station and (not isinstance(station[key], list)
+                                       or not all(isinstance(v, str) for v in station[key])):
+                    errors.append(f"Station {i}: '{key}' muss eine Liste von Texten sein")
+            if isinstance(station.get('products'), list):
+                unknown = set(station['products']) - set(PRODUCTS)
+                if unknown:
+                    errors.append(f"Station {i}: unbekannte Produkte {sorted(unknown)} "
+                                  f"(erlaubt: {', '.join(PRODUCTS)})")
+            for key in ['results', 'duration']:
+                if key in station and (not isinstance(station[key], int)
+                                       or isinstance(station[key], bool) or station[key] < 1):
+                    errors.append(f"Station {i}: '{key}' muss eine positive ganze Zahl sein")
     
     # refreshInterval prüfen
     if 'refreshInterval' in config:
@@ -47,6 +64,94 @@ def validate_config(config_path='config.json'):
         if not isinstance(interval, (int, float)) or interval < 5:
             warnings.append(f"refreshInterval sollte >= 5 sein (aktuell: {interval})")
     
+    # concurrentFetch / adaptiveRefresh prüfen
+    for key in ['concurrentFetch', 'adaptiveRefresh', 'httpCache', 'warmStart']:
+        if key in config and not isinstance(config[key], bool):
+            errors.append(f"'{key}' muss true oder false sein")
+    
+    # requestsPerMinute prüfen (Rate-Limit der API: 100/min pro IP)
+    if 'requestsPerMinute' in config:
+        rpm = config['requestsPerMinute']
+        if not isinstance(rpm, (int, float)) or rpm <= 0:
+            errors.append("'requestsPerMinute' muss eine positive Zahl sein")
+        elif rpm > 100:
+            warnings.append(f"requestsPerMinute über dem API-Limit von 100 (aktuell: {rpm})")
+    
+    # Metrik-Endpunkt (optional)
+    if 'metricsPort' in config:
+        port = config['metricsPort']
+        if port is not None and (not isinstance(port, int) or isinstance(port, bool) or not 0 <= port <= 65535):
+            errors.append("'metricsPort' muss ein Port zwischen 1 und 65535 sein (0/null = aus)")
+    if 'metricsHost' in config:
+        host = config['metricsHost']
+        if not isinstance(host, str) or not host:
+            errors.append("'metricsHost' muss eine Adresse sein")
+        elif host not in ('127.0.0.1', 'localhost', '::1'):
+            warnings.append(f"Metriken sind im Netzwerk erreichbar ({host})")
+    
+    # Tracing (optional)
+    if config.get('traceFile') is not None and not isinstance(config['traceFile'], str):
+        errors.append("'traceFile' muss ein Pfad sein")
+    for key, minimum in (('traceMaxBytes', 1), ('traceBackups', 0)):
+        if key in config and (not isinstance(config[key], int) or config[key] < minimum):
+            errors.append(f"'{key}' muss eine ganze Zahl >= {minimum} sein")
+    
+    # Log-Datei (optional)
+    if config.get('logFile') is not None and not isinstance(config['logFile'], str):
+        errors.append("'logFile' muss ein Pfad sein")
+    if 'logLevel' in config and config['logLevel'] not in ('DEBUG', 'INFO', 'WARNING', 'ERROR'):
+        errors.append("'logLevel' muss DEBUG, INFO, WARNING oder ERROR sein")
+    for key, minimum in (('logMaxBytes', 1), ('logBackups', 0)):
+        if key in config and (not isinstance(config[key], int) or config[key] < minimum):
+            errors.append(f"'{key}' muss eine ganze Zahl >= {minimum} sein")
+    
+    # Profiler auf Abruf (SIGUSR1)
+    if 'profileDir' in config and (not isinstance(config['profileDir'], str) or not config['profileDir']):
+        errors.append("'profileDir' muss ein Verzeichnis sein")
+    if 'profileDuration' in config:
+        duration = config['profileDuration']
+        if not isinstance(duration, (int, float)) or isinstance(duration, bool) or duration <= 0:
+            errors.append("'profileDuration' muss eine positive Zahl (Sekunden) sein")
+        elif duration > 600:
+            warnings.append("'profileDuration' wird auf 600s begrenzt")
+    
+    # Gemeinsamer Abruf-Dienst (fetch_daemon.py)
+    if 'fetchDaemon' in config:
+        fetch_daemon = config['fetchDaemon']
+        if not isinstance(fetch_daemon, bool) and not (isinstance(fetch_daemon, str) and fetch_daemon):
+            errors.append("'fetchDaemon' muss true/false oder der Pfad des Sockets sein")
+    
+    # Alternative API-Adresse (z.B. stub_server.py)
+    if 'apiBaseUrl' in config:
+        base_url = config['apiBaseUrl']
+        if not isinstance(base_url, str) or not base_url.startswith(('http://', 'https://')):
+            errors.append("'apiBaseUrl' muss mit http:// oder https:// beginnen")
+        else:
+            warnings.append(f"Es wird nicht die öffentliche API verwendet: {base_url}")
+    
+    # Grenzen der adaptiven Aktualisierung prüfen
+    for key in ['minRefreshInterval', 'maxRefreshInterval']:
+        if key in config and (not isinstance(config[key], (int, float)) or config[key] < 5):
+            warnings.append(f"{key} sollte >= 5 sein (aktuell: {config[key]})")
+    
+    # Schreibintervall des Warmstart-Snapshots prüfen (SD-Karte schonen)
+    if 'snapshotInterval' in config:
+        interval = config['snapshotInterval']
+        if not isinstance(interval, (int, float)) or interval < 0:
+            errors.append("'snapshotInterval' muss eine Zahl >= 0 sein")
+        elif interval < 30:
+            warnings.append(f"snapshotInterval unter 30s belastet die SD-Karte (aktuell: {interval})")
+    
+    # Ausgabe-Backend prüfen
+    if config.get('outputBackend', 'sdl') not in ('sdl', 'framebuffer', 'headless'):
+        errors.append("'outputBackend' muss 'sdl', 'framebuffer' oder 'headless' sein")
+    elif config.get('outputBackend') == 'framebuffer':
+        device = config.get('framebufferDevice', '/dev/fb0')
+        if not isinstance(device, str) or not device:
+            errors.append("'framebufferDevice' muss ein Pfad sein")
+        elif not Path(device).exists():
+            warnings.append(f"Framebuffer {device} existiert nicht (wird als Datei angelegt)")
+    
     # displayLines prüfen
     if 'displayLines' in config:
         if not isinstance(config['displayLines'], list):